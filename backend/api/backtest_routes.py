@@ -1,38 +1,80 @@
 from pathlib import Path
-import pandas as pd
+from typing import List, Optional
+
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi import Query as QParam
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from backend.backtesting.batch import get_pool, run_batch_backtest
+from backend.backtesting.monte_carlo import run_monte_carlo, trade_pnls
+from backend.backtesting.portfolio import PortfolioLeg, check_settings, run_portfolio_backtest
+from backend.data_providers.data_manager import data_manager
 from backend.database.database import get_db
 from backend.database.models import BacktestSession, Trade as TradeModel, PerformanceMetrics as PerfModel
+from backend.market_data.candle_array import as_candle_array
 from backend.market_data.csv_dataset_loader import load_dataset_candles
+from backend.market_data.multi_timeframe import TimeframeContext
 from backend.setups.trade_setup_store import build_trade_setups, store_trade_setups
 from backend.strategy_engine import run_strategy
 from backend.utils.helpers import clean_data
 
 router = APIRouter(tags=["backtesting"])
 
+MAX_BATCH_JOBS = 200
+MAX_SIMULATIONS = 100_000
+
 class BacktestRequest(BaseModel):
     symbol: str
     timeframe: str = "raw"
     config: dict
 
+class BatchBacktestRequest(BaseModel):
+    dataset_ids: List[str]
+    timeframes: List[str] = ["raw"]
+    config: dict
+    include_candles: bool = False
+
+class PortfolioLegRequest(BaseModel):
+    dataset_id: str
+    timeframe: Optional[str] = None
+    config: Optional[dict] = None
+
+class PortfolioBacktestRequest(BaseModel):
+    dataset_ids: List[str] = []
+    legs: List[PortfolioLegRequest] = []
+    timeframe: str = "raw"
+    config: dict = {}
+    initial_capital: float = 10_000.0
+    sizing: str = "equal"
+    position_size: Optional[float] = None
+    max_positions: int = 5
+    max_points: Optional[int] = 2000
+
+class MonteCarloRequest(BaseModel):
+    trades: list[dict]
+    simulations: int = 10_000
+    method: str = "bootstrap"
+    block_size: Optional[int] = None
+    ruin_level: float = 0.5
+    seed: Optional[int] = None
+    parallel: bool = False
+
 @router.post("/run-strategy")
 @router.post("/run-backtest")
 async def run_backtest(payload: BacktestRequest):
     try:
         datasets_dir = Path(__file__).resolve().parent.parent / "datasets"
-        candles = load_dataset_candles(payload.symbol, datasets_dir, timeframe=payload.timeframe or "1m")
+        candles = as_candle_array(load_dataset_candles(payload.symbol, datasets_dir, timeframe=payload.timeframe or "1m"))
         if not candles:
             raise ValueError(f"No market data available for dataset {payload.symbol}")
     except Exception as e:
         raise HTTPException(400, f"Data fetch error: {str(e)}")
 
     try:
-        df = pd.DataFrame(candles)
-        result = run_strategy(df, payload.config)
+        # Higher-timeframe references reuse the dataset's resample cache.
+        context = TimeframeContext.for_dataset(candles.time, payload.symbol, datasets_dir)
+        result = run_strategy(candles.to_dataframe(), payload.config, context)
         result = clean_data(result)
     except ValueError as e:
         raise HTTPException(400, f"Strategy Error: {str(e)}")
@@ -40,7 +82,7 @@ async def run_backtest(payload: BacktestRequest):
         raise HTTPException(500, f"Strategy Error: {str(e)}")
 
     response_payload = {
-        "candles":      candles,
+        "candles":      candles.to_candles(),
         "buy_signals":  result.get("buy_signals",  []),
         "sell_signals": result.get("sell_signals", []),
         "trades":       result.get("trades",       []),
@@ -104,6 +146,79 @@ async def run_backtest(payload: BacktestRequest):
 
     return response_payload
 
+@router.post("/run-backtest/batch")
+def run_backtest_batch(payload: BatchBacktestRequest):
+    """Same config over every dataset_id x timeframe, run in parallel; candles are omitted unless requested."""
+    dataset_ids = list(dict.fromkeys(d for d in payload.dataset_ids if d and d.strip()))
+    timeframes = list(dict.fromkeys(tf or "raw" for tf in payload.timeframes)) or ["raw"]
+    if not dataset_ids:
+        raise HTTPException(400, "dataset_ids must contain at least one dataset")
+    jobs = [(dataset_id, timeframe) for dataset_id in dataset_ids for timeframe in timeframes]
+    if len(jobs) > MAX_BATCH_JOBS:
+        raise HTTPException(400, f"Batch too large: {len(jobs)} runs (max {MAX_BATCH_JOBS})")
+
+    try:
+        return clean_data(run_batch_backtest(
+            payload.config,
+            jobs,
+            share=data_manager.share_candles,
+            include_candles=payload.include_candles,
+        ))
+    except Exception as e:
+        raise HTTPException(500, f"Batch Backtest Error: {str(e)}")
+
+@router.post("/run-backtest/portfolio")
+def run_backtest_portfolio(payload: PortfolioBacktestRequest):
+    """Legs (explicit, plus one per dataset_id with the shared config) traded from one cash balance."""
+    legs = [
+        PortfolioLeg(leg.dataset_id, leg.timeframe or payload.timeframe, leg.config or payload.config)
+        for leg in payload.legs if leg.dataset_id.strip()
+    ] + [
+        PortfolioLeg(dataset_id, payload.timeframe, payload.config)
+        for dataset_id in dict.fromkeys(d for d in payload.dataset_ids if d and d.strip())
+    ]
+    if not legs:
+        raise HTTPException(400, "Portfolio needs at least one dataset")
+    if len(legs) > MAX_BATCH_JOBS:
+        raise HTTPException(400, f"Portfolio too large: {len(legs)} legs (max {MAX_BATCH_JOBS})")
+    try:
+        check_settings(payload.initial_capital, payload.sizing, payload.position_size, payload.max_positions)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    try:
+        return clean_data(run_portfolio_backtest(
+            legs,
+            share=data_manager.share_candles,
+            initial_capital=payload.initial_capital,
+            sizing=payload.sizing,
+            position_size=payload.position_size,
+            max_positions=payload.max_positions,
+            max_points=payload.max_points,
+        ))
+    except Exception as e:
+        raise HTTPException(500, f"Portfolio Backtest Error: {str(e)}")
+
+@router.post("/monte-carlo")
+def monte_carlo(payload: MonteCarloRequest):
+    """Percentiles of final equity and max drawdown, and probability of ruin, over re-sampled trade sequences."""
+    if not 1 <= payload.simulations <= MAX_SIMULATIONS:
+        raise HTTPException(400, f"simulations must be between 1 and {MAX_SIMULATIONS}")
+    try:
+        return run_monte_carlo(
+            trade_pnls(payload.trades),
+            simulations=payload.simulations,
+            method=payload.method,
+            block_size=payload.block_size,
+            ruin_level=payload.ruin_level,
+            seed=payload.seed,
+            pool=get_pool() if payload.parallel else None,
+        )
+    except ValueError as e:
+        raise HTTPException(400, f"Monte Carlo Error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(500, f"Monte Carlo Error: {str(e)}")
+
 @router.get("/backtests")
 def list_backtests(limit: int = QParam(50, ge=1, le=500), db: Session = Depends(get_db)):
     try:
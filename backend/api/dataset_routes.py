@@ -1,20 +1,26 @@
 """
 dataset_routes.py
 -----------------
-Endpoints for uploading and retrieving CSV datasets.
+Endpoints for uploading and retrieving datasets (CSV, Parquet, Feather).
 """
 from __future__ import annotations
 
 import logging
 import os
-import shutil
 import uuid
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+import pandas as pd
+from fastapi import APIRouter, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse
 
-from backend.market_data.csv_dataset_loader import load_dataset_candles, load_dataset_summary
-from backend.market_data.dataset_normalizer import get_dataset_csv_path
+from backend.market_data.csv_dataset_loader import (
+    load_dataset_candle_page,
+    load_dataset_candles,
+    load_dataset_summary,
+)
+from backend.market_data.dataset_ingest import create_ingestor
+from backend.market_data.pagination import is_paginated_request
 
 router = APIRouter(tags=["datasets"])
 DATASETS_DIR = os.path.join(os.path.dirname(__file__), "..", "datasets")
@@ -22,29 +28,55 @@ os.makedirs(DATASETS_DIR, exist_ok=True)
 logger = logging.getLogger(__name__)
 
 
-@router.post("/upload-dataset")
-async def upload_dataset(file: UploadFile = File(...)):
-    filename = file.filename or ""
-    if not filename.lower().endswith(".csv"):
-        raise HTTPException(status_code=400, detail="Only CSV files are allowed.")
+UPLOAD_CHUNK_BYTES = 1024 * 1024
 
-    dataset_id = str(uuid.uuid4())
-    csv_path = get_dataset_csv_path(dataset_id, DATASETS_DIR)
 
+async def _ingest_upload(chunks: AsyncIterator[bytes], filename: str) -> dict:
+    dataset_id = str(uuid.uuid4())
+    ingestor = create_ingestor(dataset_id, DATASETS_DIR, filename)
     try:
-        with csv_path.open("wb") as destination:
-            shutil.copyfileobj(file.file, destination)
-
-        logger.info("Dataset uploaded dataset_id=%s filename=%s", dataset_id, filename)
-        return {
-            "id": dataset_id,
-            "dataset_id": dataset_id,
-            "filename": filename,
-            "status": "uploaded",
-        }
+        async for chunk in chunks:
+            ingestor.feed(chunk)
+        summary = ingestor.finish()
+    except HTTPException:
+        ingestor.abort()
+        raise
+    except (ValueError, pd.errors.ParserError) as exc:
+        ingestor.abort()
+        raise HTTPException(status_code=400, detail=f"Invalid dataset: {exc}")
     except Exception as exc:
+        ingestor.abort()
         logger.exception("Dataset upload failed dataset_id=%s filename=%s error=%s", dataset_id, filename, exc)
-        raise HTTPException(status_code=500, detail="Failed to save CSV dataset.")
+        raise HTTPException(status_code=500, detail="Failed to save dataset.")
+
+    logger.info(
+        "Dataset uploaded dataset_id=%s filename=%s rows=%s",
+        dataset_id,
+        filename,
+        summary["rows"],
+    )
+    return {**summary, "filename": filename}
+
+
+@router.post("/upload-dataset")
+async def upload_dataset(file: UploadFile = File(...)):
+    filename = file.filename or ""
+
+    async def read_chunks() -> AsyncIterator[bytes]:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            yield chunk
+
+    return await _ingest_upload(read_chunks(), filename)
+
+
+@router.post("/upload-dataset/stream")
+async def upload_dataset_stream(request: Request, filename: str = Query(...)):
+    """
+    Raw-body upload; the format is taken from ``filename``. Unlike the multipart
+    endpoint, whose body is spooled by the server before the handler runs, CSV
+    rows here are parsed and validated while the bytes are still arriving.
+    """
+    return await _ingest_upload(request.stream(), filename)
 
 
 @router.get("/dataset/{dataset_id}")
@@ -67,16 +99,40 @@ def get_dataset_candles(
     start: Optional[str] = Query(None),
     end: Optional[str] = Query(None),
     limit: Optional[int] = Query(None),
+    before: Optional[int] = Query(None, description="Return bars strictly before this epoch-seconds cursor."),
+    after: Optional[int] = Query(None, description="Return bars strictly after this epoch-seconds cursor."),
+    count: Optional[int] = Query(None, description="Page size for cursor pagination."),
+    window_start: Optional[int] = Query(None, description="Visible range start (epoch seconds)."),
+    window_end: Optional[int] = Query(None, description="Visible range end (epoch seconds)."),
+    prefetch: Optional[int] = Query(None, description="Extra bars returned on each side of the visible range."),
+    max_points: Optional[int] = Query(None, ge=3, description="Aggregate OHLC bars so at most this many are returned."),
 ):
     try:
-        return load_dataset_candles(
+        if is_paginated_request(before, after, count, window_start, window_end):
+            return load_dataset_candle_page(
+                dataset_id,
+                DATASETS_DIR,
+                timeframe=timeframe or "1m",
+                start=start,
+                end=end,
+                before=before,
+                after=after,
+                count=count,
+                window_start=window_start,
+                window_end=window_end,
+                prefetch=prefetch,
+                max_points=max_points,
+            )
+        candles = load_dataset_candles(
             dataset_id,
             DATASETS_DIR,
             timeframe=timeframe or "1m",
             start=start,
             end=end,
             limit=limit,
+            max_points=max_points,
         )
+        return JSONResponse(content=candles.to_candles())
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
     except HTTPException:
@@ -87,9 +143,33 @@ def get_dataset_candles(
 
 
 @router.get("/dataset/{dataset_id}/{timeframe}")
-def get_dataset_timeframe(dataset_id: str, timeframe: str):
+def get_dataset_timeframe(
+    dataset_id: str,
+    timeframe: str,
+    before: Optional[int] = Query(None),
+    after: Optional[int] = Query(None),
+    count: Optional[int] = Query(None),
+    window_start: Optional[int] = Query(None),
+    window_end: Optional[int] = Query(None),
+    prefetch: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=3),
+):
     try:
-        return load_dataset_candles(dataset_id, DATASETS_DIR, timeframe=timeframe)
+        if is_paginated_request(before, after, count, window_start, window_end):
+            return load_dataset_candle_page(
+                dataset_id,
+                DATASETS_DIR,
+                timeframe=timeframe,
+                before=before,
+                after=after,
+                count=count,
+                window_start=window_start,
+                window_end=window_end,
+                prefetch=prefetch,
+                max_points=max_points,
+            )
+        candles = load_dataset_candles(dataset_id, DATASETS_DIR, timeframe=timeframe, max_points=max_points)
+        return JSONResponse(content=candles.to_candles())
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
     except HTTPException:
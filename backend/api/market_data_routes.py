@@ -5,35 +5,55 @@ Serves metadata and indicators.
 Broker endpoints have been removed per the dataset migration plan.
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
 from backend.data_providers.data_manager import data_manager
-import pandas as pd
+from backend.indicators.indicators import (
+    DEFAULT_INDICATORS,
+    INDICATOR_SPECS,
+    compute_indicator_arrays,
+    indicator_cache,
+    parse_indicator_request,
+)
+from backend.market_data.candle_store import candle_store
+from backend.market_data.csv_dataset_loader import timestamps_to_epoch_seconds
+from backend.market_data.dataset_metadata import list_dataset_files, read_dataset_metadata
+from backend.market_data.downsampling import LINE_METHODS, decimate_line, downsample_candles
+from backend.market_data.pagination import is_paginated_request, paginate_candles
 import numpy as np
 import os
 
 router = APIRouter(tags=["market_data"])
 
+INDICATOR_LAYOUTS = {"records", "columns"}
+ASSET_METADATA_FIELDS = ("rows", "start", "end", "step_seconds", "gaps", "price_range", "format")
+
 DATASETS_DIR = os.path.join(os.path.dirname(__file__), "..", "datasets")
 
 @router.get("/assets")
 def get_assets():
-    """Returns uploaded datasets instead of broker assets."""
+    """
+    Returns uploaded datasets instead of broker assets. Row counts, ranges and
+    intervals come from each dataset's metadata sidecar; no data file is read.
+    """
     assets = []
-    seen = set()
-    if os.path.exists(DATASETS_DIR):
-        for f in os.listdir(DATASETS_DIR):
-            if f.endswith(".csv"):
-                dataset_id = f.rsplit(".", 1)[0]
-                if dataset_id in seen:
-                    continue
-                seen.add(dataset_id)
-                assets.append({
-                    "symbol": dataset_id,
-                    "market": "Uploaded Datasets",
-                    "broker": "local", 
-                    "name": dataset_id
-                })
+    for dataset_id, path in list_dataset_files(DATASETS_DIR):
+        asset = {
+            "symbol": dataset_id,
+            "market": "Uploaded Datasets",
+            "broker": "local",
+            "name": dataset_id,
+        }
+        metadata = read_dataset_metadata(dataset_id, DATASETS_DIR, path)
+        if metadata is not None:
+            asset.update({key: metadata.get(key) for key in ASSET_METADATA_FIELDS})
+        assets.append(asset)
     return {"forex": {"datasets": assets}}
 
+@router.get("/cache-stats")
+def get_cache_stats():
+    """Hit rates and sizes of the process-wide candle store and indicator cache."""
+    return {"candles": candle_store.stats(), "indicators": indicator_cache.stats()}
+
 @router.get("/markets")
 def get_markets():
     return {"markets": ["datasets"]}
@@ -67,6 +87,13 @@ def get_market_data(
     tf: str = Query(None),
     start: str = Query(None),
     end: str = Query(None),
+    before: int = Query(None),
+    after: int = Query(None),
+    count: int = Query(None),
+    window_start: int = Query(None),
+    window_end: int = Query(None),
+    prefetch: int = Query(None),
+    max_points: int = Query(None, ge=3),
 ):
     resolved_tf = timeframe or tf or "1h"
     if not symbol or not symbol.strip():
@@ -82,9 +109,26 @@ def get_market_data(
             from datetime import datetime
             start_ts = int(datetime.fromisoformat(start.replace("Z", "+00:00")).timestamp()) if start else 0
             end_ts   = int(datetime.fromisoformat(end.replace("Z", "+00:00")).timestamp())   if end else 9_999_999_999
-            candles = [c for c in candles if start_ts <= c["time"] <= end_ts]
-            
-        return candles
+            candles = candles.between(start_ts, end_ts)
+
+        if is_paginated_request(before, after, count, window_start, window_end):
+            try:
+                page = paginate_candles(
+                    candles,
+                    before=before,
+                    after=after,
+                    count=count,
+                    window_start=window_start,
+                    window_end=window_end,
+                    prefetch=prefetch,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            page["candles"] = downsample_candles(page["candles"], max_points)
+            return JSONResponse(content=page)
+        return JSONResponse(content=downsample_candles(candles, max_points))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -94,50 +138,69 @@ def get_indicators(
     symbol: str,
     broker: str = Query(None),
     timeframe: str = Query("1h"),
+    indicators: str = Query(
+        None,
+        description="Comma-separated [alias=]name[:param...] list, e.g. 'sma:20,fast=ema:12,macd:12:26:9'. "
+                    f"Defaults to '{DEFAULT_INDICATORS}'.",
+    ),
+    max_points: int = Query(None, ge=3),
+    decimation: str = Query("lttb"),
+    layout: str = Query("records", description="'records' (list of points) or 'columns' (parallel arrays)."),
 ):
+    if decimation not in LINE_METHODS:
+        raise HTTPException(status_code=400, detail=f"decimation must be one of: {sorted(LINE_METHODS)}")
+    if layout not in INDICATOR_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"layout must be one of: {sorted(INDICATOR_LAYOUTS)}")
     try:
-        from backend.data_providers.data_manager import data_manager
-        candles = data_manager.load_candles(symbol, timeframe, broker)
-        if not candles:
-            return {"sma": [], "ema": [], "rsi": [], "macd": [], "bbands": []}
-
-        df = pd.DataFrame(candles)
-        times = df["time"].tolist()
-        close = df["close"]
-
-        from backend.indicators.indicators import (
-            calculate_sma, calculate_ema, calculate_rsi,
-            calculate_macd, calculate_bbands,
-        )
-
-        sma_20 = calculate_sma(close, 20)
-        ema_50 = calculate_ema(close, 50)
-        rsi_14 = calculate_rsi(close, 14)
-        macd, signal, histogram = calculate_macd(close, 12, 26, 9)
-        upper_bb, lower_bb, middle_bb = calculate_bbands(close, 20, 2)
-
-        def fmt(series):
-            return [{"time": t, "value": v} for t, v in zip(times, series) if not pd.isna(v)]
-
-        def fmt_macd(m, s, h):
-            return [
-                {"time": times[i], "macd": m.iloc[i], "signal": s.iloc[i], "histogram": h.iloc[i]}
-                for i in range(len(times))
-                if not pd.isna(m.iloc[i]) and not pd.isna(s.iloc[i])
-            ]
-
-        def fmt_bb(u, l, mid):
-            return [
-                {"time": times[i], "upper": u.iloc[i], "lower": l.iloc[i], "middle": mid.iloc[i]}
-                for i in range(len(times)) if not pd.isna(u.iloc[i])
-            ]
-
-        return {
-            "sma":    fmt(sma_20),
-            "ema":    fmt(ema_50),
-            "rsi":    fmt(rsi_14),
-            "macd":   fmt_macd(macd, signal, histogram),
-            "bbands": fmt_bb(upper_bb, lower_bb, middle_bb),
-        }
+        requested = parse_indicator_request(indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        frame = data_manager.load_frame(symbol, timeframe, broker)
+        if frame.empty:
+            return {alias: [] for alias, _, _ in requested}
+
+        times = timestamps_to_epoch_seconds(frame["timestamp"])
+        close = frame["close"].astype("float64").reset_index(drop=True)
+
+        version = data_manager.dataset_version(symbol)
+        response = {}
+        for alias, name, params in requested:
+            if version is None:
+                arrays = compute_indicator_arrays(close, name, params)
+            else:
+                arrays = indicator_cache.get((symbol, timeframe, version), name, params, close)
+            response[alias] = _format_indicator(
+                times, arrays, INDICATOR_SPECS[name]["primary"], max_points, decimation, layout,
+            )
+        # Already plain lists of Python scalars; skip FastAPI's recursive re-encoding.
+        return JSONResponse(content=response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _format_indicator(
+    times: np.ndarray,
+    arrays: dict,
+    primary: str,
+    max_points,
+    decimation: str,
+    layout: str,
+):
+    # A point is emitted only when every output line is defined (matches the
+    # warm-up masking of the individual indicators).
+    valid = np.ones(len(times), dtype=bool)
+    for values in arrays.values():
+        valid &= ~np.isnan(values)
+    kept = np.flatnonzero(valid)
+    kept = kept[decimate_line(times[kept].astype("float64"), arrays[primary][kept], max_points, decimation)]
+
+    columns = {"time": times[kept].tolist()}
+    for key, values in arrays.items():
+        columns[key] = values[kept].tolist()
+
+    if layout == "columns":
+        return columns
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
@@ -19,6 +19,8 @@ from datetime import datetime
 from backend.database.database import get_db
 from backend.database.models import TradingSession, SessionTrade
 from backend.data_providers.data_manager import data_manager
+from backend.market_data.downsampling import downsample_candles
+from backend.market_data.pagination import is_paginated_request, paginate_candles
 
 router = APIRouter(prefix="", tags=["Sessions"])
 
@@ -101,11 +103,20 @@ def get_session(session_id: int, db: DBSession = Depends(get_db)):
 def get_session_candles(
     session_id: int,
     timeframe: str = Query("1h"),
+    before: Optional[int] = Query(None),
+    after: Optional[int] = Query(None),
+    count: Optional[int] = Query(None),
+    window_start: Optional[int] = Query(None),
+    window_end: Optional[int] = Query(None),
+    prefetch: Optional[int] = Query(None),
+    max_points: Optional[int] = Query(None, ge=3),
     db: DBSession = Depends(get_db),
 ):
     """
     Load dataset for (broker, symbol), aggregate to timeframe,
     slice to [start_date, end_date], and return OHLCV records.
+    Cursor (before/after/count) or visible-window parameters return a single page
+    plus the cursors needed to fetch the neighbouring pages.
     """
     sess = db.query(TradingSession).filter(TradingSession.id == session_id).first()
     if not sess:
@@ -120,12 +131,32 @@ def get_session_candles(
     if sess.start_date or sess.end_date:
         start_ts = int(sess.start_date.timestamp()) if sess.start_date else 0
         end_ts   = int(sess.end_date.timestamp())   if sess.end_date   else 9_999_999_999
-        candles  = [c for c in candles if start_ts <= c["time"] <= end_ts]
+        candles  = candles.between(start_ts, end_ts)
+
+    if is_paginated_request(before, after, count, window_start, window_end):
+        try:
+            page = paginate_candles(
+                candles,
+                before=before,
+                after=after,
+                count=count,
+                window_start=window_start,
+                window_end=window_end,
+                prefetch=prefetch,
+            )
+        except ValueError as e:
+            raise HTTPException(400, str(e))
+        page["candles"] = downsample_candles(page["candles"], max_points)
+        return {
+            "session":  _session_dict(sess),
+            "timeframe": timeframe,
+            **page,
+        }
 
     return {
         "session":  _session_dict(sess),
         "timeframe": timeframe,
-        "candles":   candles,
+        "candles":   downsample_candles(candles, max_points),
     }
 
 
@@ -3,11 +3,11 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict
 
-import pandas as pd
 from fastapi import APIRouter, HTTPException
 from fastapi import Query as QParam
 from pydantic import BaseModel, Field
 
+from backend.market_data.candle_array import CandleArray
 from backend.market_data.csv_dataset_loader import load_dataset_candles
 from backend.setups.setup_registry import build_setup_config, get_setup, list_setups
 from backend.setups.trade_setup_store import (
@@ -30,7 +30,7 @@ class RunSetupRequest(BaseModel):
     pine_script: str = ""
 
 
-def _load_candles(symbol: str, timeframe: str) -> list[dict]:
+def _load_candles(symbol: str, timeframe: str) -> CandleArray:
     datasets_dir = Path(__file__).resolve().parent.parent / "datasets"
     candles = load_dataset_candles(symbol, datasets_dir, timeframe=timeframe or "1m")
     if not candles:
@@ -64,13 +64,12 @@ async def run_setup(setup_id: str, payload: RunSetupRequest):
         raise HTTPException(400, f"Setup data error: {str(exc)}")
 
     try:
-        df = pd.DataFrame(candles)
         config = build_setup_config(
             setup_id,
             parameters=payload.parameters,
             pine_script=payload.pine_script,
         )
-        result = clean_data(run_strategy(df, config))
+        result = clean_data(run_strategy(candles.to_dataframe(), config))
     except ValueError as exc:
         raise HTTPException(400, f"Setup strategy error: {str(exc)}")
     except Exception as exc:
@@ -86,7 +85,7 @@ async def run_setup(setup_id: str, payload: RunSetupRequest):
     return {
         "setup_id": setup["id"],
         "setup_name": setup["name"],
-        "candles": candles,
+        "candles": candles.to_candles(),
         "buy_signals": result.get("buy_signals", []),
         "sell_signals": result.get("sell_signals", []),
         "trades": result.get("trades", []),
@@ -1,10 +1,12 @@
 import json
+import logging
 import shutil
 import tempfile
+import threading
 from pathlib import Path
 import pandas as pd
-from typing import Any
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile, Depends
+from typing import Any, Optional
+from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile, Depends
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -14,6 +16,7 @@ from backend.data_providers.data_manager import data_manager
 from backend.utils.helpers import clean_data
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # ── CRUD Strategy Endpoints ───────────────────────────────────────────────────
 class StrategyCreate(BaseModel):
@@ -99,9 +102,17 @@ async def detect_regime(body: RegimeRequest):
         raise HTTPException(400, f"Data fetch error: {str(e)}")
 
     try:
-        df = pd.DataFrame(candles)
+        df = candles.to_dataframe()
+        from backend.ml.prediction_models import ModelNotTrainedError, offline_models, predict_regime
         from backend.ml.regime_detection import detect_market_regime
-        result = detect_market_regime(df)
+        version = data_manager.dataset_version(body.symbol)
+        try:
+            # A model trained offline on exactly this data only needs inference.
+            if version is not None and offline_models.regime_dataset_version(body.symbol, body.timeframe) == version:
+                return clean_data(predict_regime(df, body.symbol, body.timeframe))
+        except ModelNotTrainedError:
+            pass
+        result = detect_market_regime(df, cache_key=f"{body.symbol}@{body.timeframe}", version=version)
         return clean_data(result)
     except Exception as e:
         raise HTTPException(500, f"Regime Detection Error: {str(e)}")
@@ -153,6 +164,103 @@ async def strategy_insights_endpoint(body: InsightsRequest):
     except Exception as e:
         raise HTTPException(500, f"Strategy Insights Error: {str(e)}")
 
+# ── Offline ML Models ─────────────────────────────────────────────────────────
+class TrainModelsRequest(BaseModel):
+    dataset_ids: Optional[list[str]] = None
+    timeframes: list[str] = ["5m"]
+    trade_config: Optional[dict] = None
+
+class PredictTradeScoresRequest(BaseModel):
+    candles: list[dict]
+    trades:  list[dict]
+    config:  Optional[dict] = None
+
+# Training normally runs from the CLI (python -m backend.ml.prediction_models); this
+# trigger starts one run in the background and refuses a second until it finishes.
+_training_lock = threading.Lock()
+_training_status: dict[str, Any] = {"running": None, "last": None}
+
+def _run_training(body: TrainModelsRequest, version: int) -> None:
+    from backend.ml import prediction_models
+    try:
+        manifest = prediction_models.train_models(
+            body.dataset_ids, body.timeframes, body.trade_config,
+            root=prediction_models.OFFLINE_DIR, version=version,
+        )
+        failed = [job for job in manifest["jobs"] if job.get("status") != "ok"]
+        _training_status["last"] = {
+            "version": version,
+            "status": "ok",
+            "trained_at": manifest["trained_at"],
+            "elapsed_ms": manifest["elapsed_ms"],
+            "failed_jobs": len(failed),
+        }
+    except Exception as e:
+        logger.exception("Model training failed version=%s error=%s", version, e)
+        _training_status["last"] = {"version": version, "status": "error", "error": str(e)}
+    finally:
+        _training_status["running"] = None
+        _training_lock.release()
+
+@router.post("/ml/train", status_code=202)
+def train_ml_models(body: TrainModelsRequest, background_tasks: BackgroundTasks):
+    if body.dataset_ids is not None and not body.dataset_ids:
+        raise HTTPException(400, "dataset_ids must not be empty")
+    if not body.timeframes:
+        raise HTTPException(400, "timeframes must not be empty")
+    if not _training_lock.acquire(blocking=False):
+        raise HTTPException(409, f"Model training is already running (version {_training_status['running']})")
+    try:
+        from backend.ml import prediction_models
+        version = prediction_models.reserve_version(prediction_models.OFFLINE_DIR)
+    except Exception as e:
+        _training_lock.release()
+        raise HTTPException(500, f"Model Training Error: {str(e)}")
+    _training_status["running"] = version
+    background_tasks.add_task(_run_training, body, version)
+    return {"status": "training", "version": version}
+
+@router.get("/ml/train")
+async def training_status():
+    return dict(_training_status)
+
+@router.get("/ml/models")
+async def list_ml_models():
+    from backend.ml.prediction_models import ModelNotTrainedError, offline_models
+    try:
+        manifest = offline_models.manifest()
+    except ModelNotTrainedError as e:
+        raise HTTPException(404, str(e))
+    return {key: manifest[key] for key in ("version", "trained_at", "regime", "trade_quality")}
+
+@router.post("/ml/predict/regime")
+async def predict_regime_endpoint(body: RegimeRequest):
+    from backend.ml.prediction_models import ModelNotTrainedError, predict_regime
+    try:
+        candles = data_manager.load_candles(body.symbol, body.timeframe)
+        if not candles:
+            raise ValueError(f"No market data available for {body.symbol} {body.timeframe}")
+    except Exception as e:
+        raise HTTPException(400, f"Data fetch error: {str(e)}")
+
+    try:
+        return clean_data(predict_regime(candles.to_dataframe(), body.symbol, body.timeframe))
+    except ModelNotTrainedError as e:
+        raise HTTPException(404, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Regime Prediction Error: {str(e)}")
+
+@router.post("/ml/predict/trade_scores")
+async def predict_trade_scores_endpoint(body: PredictTradeScoresRequest):
+    from backend.ml.prediction_models import ModelNotTrainedError, predict_trade_scores
+    try:
+        scored = predict_trade_scores(pd.DataFrame(body.candles), body.trades, body.config)
+        return clean_data({"scored_trades": scored})
+    except ModelNotTrainedError as e:
+        raise HTTPException(404, str(e))
+    except Exception as e:
+        raise HTTPException(500, f"Trade Scoring Error: {str(e)}")
+
 class OptimizeRequest(BaseModel):
     symbol: str
     timeframe: str
@@ -170,7 +278,7 @@ async def optimize_strategy(payload: OptimizeRequest):
         raise HTTPException(400, f"Data fetch error: {str(e)}")
 
     try:
-        df = pd.DataFrame(candles)
+        df = candles.to_dataframe()
         from backend.backtesting.optimizer import run_optimization
         opt_results = run_optimization(df, payload.config, payload.param_ranges, n_trials=payload.trials)
         return clean_data(opt_results)
@@ -0,0 +1,171 @@
+"""
+batch.py
+--------
+Runs one strategy config over many (dataset, timeframe) pairs in a process pool.
+
+The parent only resolves each pair to a memory-mapped ``SharedCandles`` handle
+(see backend/market_data/shared_candles.py); workers map the candles, run
+``run_strategy`` and send back metrics. A full-universe run therefore costs
+about one backtest per core instead of one HTTP round-trip per dataset.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.core.settings import BACKTEST_WORKERS
+from backend.market_data.shared_candles import SharedCandles
+from backend.strategy_engine import run_strategy
+from backend.utils.helpers import clean_data
+
+AGGREGATE_METRICS = (
+    "total_return",
+    "win_rate",
+    "sharpe_ratio",
+    "max_drawdown",
+    "profit_factor",
+    "total_trades",
+    "expectancy",
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    return BACKTEST_WORKERS if BACKTEST_WORKERS > 0 else (os.cpu_count() or 1)
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method for worker pools. Pools are created from request threads of a
+    multi-threaded server, and a child forked while another thread holds a lock
+    (candle store, model registry, logging) can deadlock, so workers never fork
+    from the server: they start from a forkserver, or are spawned where there is none.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all batch requests; created on first use and kept warm."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=default_workers(), mp_context=pool_context())
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def run_backtest_job(handle: SharedCandles, config: Dict[str, Any], include_candles: bool = False) -> Dict[str, Any]:
+    """Worker entry point: one backtest over a mapped candle file."""
+    started = time.perf_counter()
+    candles = handle.candles()
+    result = clean_data(run_strategy(candles.to_dataframe(), config))
+    job = {
+        "bars": len(candles),
+        "metrics": result.get("metrics", {}),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    if include_candles:
+        job["candles"] = candles.to_candles()
+        job["buy_signals"] = result.get("buy_signals", [])
+        job["sell_signals"] = result.get("sell_signals", [])
+        job["trades"] = result.get("trades", [])
+    return job
+
+
+def run_batch_backtest(
+    config: Dict[str, Any],
+    jobs: Iterable[Tuple[str, str]],
+    share: Any,
+    include_candles: bool = False,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> Dict[str, Any]:
+    """
+    Backtest ``config`` on every ``(dataset_id, timeframe)`` in ``jobs``.
+
+    ``share(dataset_id, timeframe)`` returns the SharedCandles handle for a pair
+    (normally ``data_manager.share_candles``). Jobs are submitted as soon as
+    their handle is ready, so workers start while later datasets are prepared.
+    A failing pair is reported with ``status: "error"`` and does not fail the batch.
+    """
+    started = time.perf_counter()
+    pool = pool or get_pool()
+    results: List[Dict[str, Any]] = []
+    pending: List[Tuple[Dict[str, Any], Future]] = []
+
+    for dataset_id, timeframe in jobs:
+        entry: Dict[str, Any] = {"dataset_id": dataset_id, "timeframe": timeframe}
+        results.append(entry)
+        try:
+            handle = share(dataset_id, timeframe)
+        except FileNotFoundError:
+            entry.update(status="error", error=f"Dataset {dataset_id} not found")
+            continue
+        except Exception as exc:
+            entry.update(status="error", error=f"Data fetch error: {exc}")
+            continue
+        if handle.rows == 0:
+            entry.update(status="error", error=f"No market data available for dataset {dataset_id}")
+            continue
+        pending.append((entry, pool.submit(run_backtest_job, handle, config, include_candles)))
+
+    for entry, future in pending:
+        try:
+            entry.update(status="ok", **future.result())
+        except BrokenProcessPool:
+            if pool is _pool:
+                shutdown_pool()
+            entry.update(status="error", error="Backtest worker crashed")
+        except Exception as exc:
+            entry.update(status="error", error=f"Strategy Error: {exc}")
+
+    return {
+        "results": results,
+        "aggregate": aggregate_results(results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def aggregate_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Cross-dataset table (best total_return first) plus mean/median of each metric."""
+    succeeded = [r for r in results if r.get("status") == "ok"]
+    table = sorted(
+        (
+            {"dataset_id": r["dataset_id"], "timeframe": r["timeframe"],
+             **{name: r["metrics"].get(name) for name in AGGREGATE_METRICS}}
+            for r in succeeded
+        ),
+        key=lambda row: row["total_return"] if row["total_return"] is not None else float("-inf"),
+        reverse=True,
+    )
+
+    mean: Dict[str, Optional[float]] = {}
+    median: Dict[str, Optional[float]] = {}
+    for name in AGGREGATE_METRICS:
+        values = [float(row[name]) for row in table if row[name] is not None]
+        mean[name] = round(statistics.fmean(values), 6) if values else None
+        median[name] = round(statistics.median(values), 6) if values else None
+
+    return {
+        "datasets": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "table": table,
+        "mean": mean,
+        "median": median,
+    }
@@ -0,0 +1,129 @@
+"""
+execution.py
+------------
+Bar-level execution core. Places a strategy's closed trades on the candle time grid
+and produces the per-bar position and equity curve that the metrics engine
+(backend/backtesting/metrics.py) annualizes from the actual bar interval.
+
+A trade is entered at the close of its entry bar and held through its exit bar:
+its bars in between are marked to market close-to-close, and the exit bar books
+whatever return makes the trade compound to exactly its reported ``pnl`` (so
+stop/target fills between closes are respected).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.market_data.candle_array import CandleArray
+
+_SHORT_TYPES = frozenset({"SELL", "SHORT"})
+
+
+@dataclass
+class EquityCurve:
+    time: np.ndarray      # int64 epoch seconds, one per bar
+    returns: np.ndarray   # float64 strategy return of each bar (0 on the first bar)
+    equity: np.ndarray    # float64 NAV at each bar close
+    position: np.ndarray  # float64 net direction held over each bar (+1 long, -1 short, 0 flat)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+def bar_arrays(candles: Union[pd.DataFrame, CandleArray, None]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(time in epoch seconds, close) of a candle frame or CandleArray, or None if unavailable."""
+    if candles is None:
+        return None
+    if isinstance(candles, CandleArray):
+        return candles.time, candles.close.astype("float64", copy=False)
+    if "close" not in candles.columns:
+        return None
+    if "time" in candles.columns:
+        times = candles["time"]
+    elif "timestamp" in candles.columns:
+        times = candles["timestamp"]
+    else:
+        return None
+    if pd.api.types.is_datetime64_any_dtype(times):
+        seconds = (times.dt.tz_localize(None) if times.dt.tz is not None else times).astype("datetime64[s]")
+        times = seconds.astype("int64")
+    times = pd.to_numeric(times, errors="coerce").to_numpy(dtype="float64")
+    if np.isnan(times).any():
+        return None
+    close = pd.to_numeric(candles["close"], errors="coerce").to_numpy(dtype="float64")
+    return times.astype("int64"), close
+
+
+def bar_index(times: np.ndarray, event_times: np.ndarray) -> np.ndarray:
+    """Index of the last bar at or before each event time (the first bar for earlier events)."""
+    return np.clip(np.searchsorted(times, event_times, side="right") - 1, 0, max(len(times) - 1, 0))
+
+
+def _trade_arrays(trades: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    closed = [t for t in trades if t.get("exit_time") is not None or t.get("entry_time") is not None]
+    exit_t = np.array([
+        t["exit_time"] if t.get("exit_time") is not None else t["entry_time"] for t in closed
+    ], dtype="float64")
+    entry_t = np.array([
+        t["entry_time"] if t.get("entry_time") is not None else t["exit_time"] for t in closed
+    ], dtype="float64")
+    direction = np.array([
+        -1.0 if str(t.get("type", "BUY")).upper() in _SHORT_TYPES else 1.0 for t in closed
+    ])
+    pnl = np.array([float(t.get("pnl") or 0.0) for t in closed], dtype="float64")
+    return entry_t, exit_t, direction, pnl
+
+
+def build_equity_curve(
+    times: np.ndarray,
+    close: np.ndarray,
+    trades: List[Dict[str, Any]],
+    initial_equity: float = 1.0,
+) -> EquityCurve:
+    """
+    Per-bar equity of ``trades`` (dicts with entry_time, exit_time, type, pnl) on the bars
+    ``times``/``close``. Trades are assumed not to overlap; overlapping trades add up.
+    """
+    times = np.asarray(times)
+    close = np.asarray(close, dtype="float64")
+    n = len(times)
+
+    bar_ret = np.zeros(n)
+    if n > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bar_ret[1:] = close[1:] / close[:-1] - 1.0
+        bar_ret[~np.isfinite(bar_ret)] = 0.0
+
+    entry_t, exit_t, direction, pnl = _trade_arrays(trades)
+    entry_idx = bar_index(times, entry_t)
+    exit_idx = np.maximum(bar_index(times, exit_t), entry_idx)
+
+    # Held over bars entry+1 .. exit.
+    delta = np.zeros(n + 1)
+    np.add.at(delta, entry_idx + 1, direction)
+    np.add.at(delta, exit_idx + 1, -direction)
+    position = np.cumsum(delta[:n])
+    returns = position * bar_ret
+
+    # Replace each trade's mark-to-market on its exit bar with the return that makes the
+    # trade compound to its reported pnl: (1 + pnl) / growth over the bars before exit.
+    if len(pnl):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_long = np.cumsum(np.log(np.maximum(1.0 + bar_ret, 1e-12)))
+            log_short = np.cumsum(np.log(np.maximum(1.0 - bar_ret, 1e-12)))
+        held = exit_idx > entry_idx
+        last_held = np.maximum(exit_idx - 1, entry_idx)
+        log_growth = np.where(
+            direction > 0,
+            log_long[last_held] - log_long[entry_idx],
+            log_short[last_held] - log_short[entry_idx],
+        )
+        exit_return = (1.0 + pnl) / np.exp(np.where(held, log_growth, 0.0)) - 1.0
+        np.add.at(returns, exit_idx, exit_return - np.where(held, direction * bar_ret[exit_idx], 0.0))
+
+    equity = float(initial_equity) * np.cumprod(1.0 + returns)
+    return EquityCurve(time=times.astype("int64", copy=False), returns=returns, equity=equity, position=position)
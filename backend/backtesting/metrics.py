@@ -1,16 +1,156 @@
 """
 Shared metrics helper for all AlgoTradeX strategy engines.
+
+Risk-adjusted metrics (Sharpe, Sortino, Calmar, drawdown, exposure) are computed on the
+bar-level equity curve from backend/backtesting/execution.py and annualized from the
+observed bar interval, so a 5m and a 1d backtest of the same strategy are comparable.
 """
 from __future__ import annotations
 
 import numpy as np
-from typing import List, Dict, Any, Optional
+import pandas as pd
+from typing import List, Dict, Any, Optional, Union
+
+from backend.backtesting.execution import EquityCurve, bar_arrays, build_equity_curve
+from backend.market_data.candle_array import CandleArray
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+MIN_TRADES = 5   # fewer closed trades than this → ratios are reported as None
+
+CURVE_EMPTY: Dict[str, Any] = {
+    "sortino_ratio":         None,
+    "calmar_ratio":          None,
+    "cagr":                  None,
+    "volatility":            None,
+    "exposure":              0.0,
+    "time_in_drawdown":      0.0,
+    "longest_drawdown_bars": 0,
+    "periods_per_year":      None,
+}
+
+
+def periods_per_year(times: np.ndarray) -> Optional[float]:
+    """Bars per year actually observed in ``times`` (epoch seconds), so session gaps count."""
+    if len(times) < 2:
+        return None
+    span = float(times[-1] - times[0])
+    return (len(times) - 1) * SECONDS_PER_YEAR / span if span > 0 else None
+
+
+def _longest_run(mask: np.ndarray) -> int:
+    if not mask.any():
+        return 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return int((edges[1::2] - edges[::2]).max())
 
 
-def compute_metrics(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+def equity_metrics(curve: EquityCurve, ppy: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Sharpe, Sortino, Calmar, CAGR, volatility, max drawdown, exposure and time in
+    drawdown of a bar-level equity curve. ``ppy`` defaults to the observed bar rate.
+    """
+    ppy = ppy if ppy is not None else periods_per_year(curve.time)
+    returns = curve.returns[1:]
+    equity = np.concatenate(([1.0], np.cumprod(1.0 + curve.returns)))   # from the pre-trade point
+    peaks = np.maximum.accumulate(equity)
+    drawdown = equity / peaks - 1.0
+    in_drawdown = drawdown[1:] < -1e-12
+    max_drawdown = float(drawdown.min())
+
+    sharpe = sortino = cagr = calmar = volatility = None
+    if ppy and len(returns) > 1:
+        mean = float(returns.mean())
+        std = float(returns.std(ddof=1))
+        downside = float(np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2)))
+        root = np.sqrt(ppy)
+        volatility = std * root
+        if std > 1e-12:
+            sharpe = mean / std * root
+        if downside > 1e-12:
+            sortino = mean / downside * root
+        years = len(returns) / ppy
+        growth = float(equity[-1])
+        cagr = growth ** (1.0 / years) - 1.0 if growth > 0 else -1.0
+        if max_drawdown < -1e-12:
+            calmar = cagr / abs(max_drawdown)
+
+    return {
+        "sharpe_ratio":          _round(sharpe),
+        "sortino_ratio":         _round(sortino),
+        "calmar_ratio":          _round(calmar),
+        "cagr":                  _round(cagr, 6),
+        "volatility":            _round(volatility, 6),
+        "max_drawdown":          round(max_drawdown, 6),
+        "exposure":              round(float(np.mean(curve.position != 0)), 4),
+        "time_in_drawdown":      round(float(in_drawdown.mean()) if len(in_drawdown) else 0.0, 4),
+        "longest_drawdown_bars": _longest_run(in_drawdown),
+        "periods_per_year":      _round(ppy, 2),
+    }
+
+
+def rolling_metrics(curve: EquityCurve, window: int, ppy: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Trailing ``window``-bar return, annualized volatility and Sharpe at every bar
+    (NaN until a full window is available), from running sums in one pass.
+    """
+    ppy = ppy if ppy is not None else periods_per_year(curve.time)
+    n = len(curve)
+    out = {key: np.full(n, np.nan) for key in ("return", "volatility", "sharpe")}
+    if window < 2 or n <= window or not ppy:
+        return out
+
+    r = curve.returns
+    csum = np.concatenate(([0.0], np.cumsum(r)))
+    csq = np.concatenate(([0.0], np.cumsum(r * r)))
+    total = csum[window + 1:] - csum[1:-window]
+    total_sq = csq[window + 1:] - csq[1:-window]
+    mean = total / window
+    var = np.maximum(total_sq - window * mean * mean, 0.0) / (window - 1)
+    std = np.sqrt(var)
+    root = np.sqrt(ppy)
+
+    out["return"][window:] = curve.equity[window:] / curve.equity[:-window] - 1.0
+    out["volatility"][window:] = std * root
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["sharpe"][window:] = np.where(std > 1e-12, mean / std * root, np.nan)
+    return out
+
+
+def _round(value: Optional[float], digits: int = 4) -> Optional[float]:
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _trade_curve(trades: List[Dict[str, Any]], pnls: np.ndarray) -> Optional[EquityCurve]:
+    """Fallback curve with one point per closed trade, when no candles are available."""
+    try:
+        times = np.fromiter(
+            (t.get("exit_time") or t.get("entry_time") or 0 for t in trades), dtype="float64", count=len(trades),
+        )
+    except (TypeError, ValueError):
+        return None
+    if not times.all() or np.any(np.diff(times) < 0):
+        return None
+    # Anchor a flat point one average trade-spacing before the first exit.
+    spacing = (times[-1] - times[0]) / max(len(times) - 1, 1)
+    times = np.concatenate(([times[0] - spacing], times))
+    returns = np.concatenate(([0.0], pnls))
+    return EquityCurve(
+        time=times.astype("int64"), returns=returns, equity=np.cumprod(1.0 + returns), position=np.ones(len(times)),
+    )
+
+
+def compute_metrics(
+    trades: List[Dict[str, Any]],
+    candles: Union[pd.DataFrame, CandleArray, None] = None,
+) -> Dict[str, Any]:
     """
     Compute a full set of performance metrics from a list of trade dicts.
-    Each trade must have pnl (float, fractional e.g. 0.023 = +2.3%).
+    Each trade must have pnl (float, fractional e.g. 0.023 = +2.3%) and, for the
+    curve-based metrics, entry_time/exit_time in epoch seconds.
+
+    With ``candles`` (the strategy's frame), ratios come from the bar-level equity curve
+    annualized from the bar interval; without, from the per-trade equity annualized from
+    trade timestamps (None when trades carry no times).
     """
     EMPTY = {
         "total_trades":  0,
@@ -23,12 +163,13 @@ def compute_metrics(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
         "sharpe_ratio":  None,   # None → display "—"
         "max_drawdown":  0.0,
         "expectancy":    0.0,
+        **CURVE_EMPTY,
     }
 
     if not trades:
         return EMPTY
 
-    pnls = np.array([float(t.get("pnl", 0)) for t in trades])
+    pnls = np.fromiter((float(t.get("pnl") or 0) for t in trades), dtype="float64", count=len(trades))
     n    = len(pnls)
 
     # ── Win / loss split ──────────────────────────────────────────────────────
@@ -52,25 +193,31 @@ def compute_metrics(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
         float("inf") if gross_profit > 0 else 0.0
     )
 
-    # ── Sharpe (annualised, equity-curve based) ───────────────────────────────
-    # Require at least 5 trades; use multiplicative equity curve pct changes.
-    if n >= 5:
-        equity   = np.cumprod(1 + pnls)           # multiplicative NAV
-        ret_pct  = np.diff(equity) / equity[:-1]  # period-to-period returns
-        if len(ret_pct) > 1 and ret_pct.std() > 1e-10:
-            sharpe_ratio: Optional[float] = round(
-                float(ret_pct.mean() / ret_pct.std() * np.sqrt(252)), 4
-            )
-        else:
-            sharpe_ratio = None
+    # ── Curve-based risk metrics ──────────────────────────────────────────────
+    bars = bar_arrays(candles)
+    curve: Optional[EquityCurve] = None
+    if bars is not None and len(bars[0]) > 1:
+        try:
+            curve = build_equity_curve(*bars, trades)
+        except (TypeError, ValueError):   # trade times not in epoch seconds
+            bars = None
+    if curve is None:
+        curve = _trade_curve(trades, pnls)
+
+    if curve is not None:
+        risk = equity_metrics(curve)
+        if bars is None:
+            # One point per trade: exposure and drawdown duration are not observable.
+            risk.update(exposure=None, time_in_drawdown=None, longest_drawdown_bars=None)
     else:
-        sharpe_ratio = None   # "Not enough trades"
+        equity_full = np.concatenate([[1.0], np.cumprod(1 + pnls)])
+        dd = equity_full / np.maximum.accumulate(equity_full) - 1
+        risk = {**CURVE_EMPTY, "sharpe_ratio": None, "max_drawdown": round(float(dd.min()), 6),
+                "exposure": None, "time_in_drawdown": None, "longest_drawdown_bars": None}
 
-    # ── Max drawdown (peak-to-trough on multiplicative equity) ────────────────
-    equity_full  = np.concatenate([[1.0], np.cumprod(1 + pnls)])
-    peaks        = np.maximum.accumulate(equity_full)
-    dd           = equity_full / peaks - 1          # negative numbers
-    max_drawdown = round(float(dd.min()), 6)        # most negative value
+    if n < MIN_TRADES:
+        # "Not enough trades" for a meaningful ratio.
+        risk.update(sharpe_ratio=None, sortino_ratio=None, calmar_ratio=None)
 
     # ── Expectancy ────────────────────────────────────────────────────────────
     loss_rate  = 1.0 - win_rate
@@ -84,7 +231,6 @@ def compute_metrics(trades: List[Dict[str, Any]]) -> Dict[str, Any]:
         "best_trade":    round(best_trade, 6),
         "worst_trade":   round(worst_trade, 6),
         "profit_factor": profit_factor,
-        "sharpe_ratio":  sharpe_ratio,   # None when < 5 trades
-        "max_drawdown":  max_drawdown,   # negative fraction
         "expectancy":    expectancy,
+        **risk,   # sharpe_ratio (None when < 5 trades), max_drawdown (negative fraction), ...
     }
@@ -0,0 +1,133 @@
+"""
+monte_carlo.py
+--------------
+Monte Carlo robustness analysis of a backtest's trade sequence.
+
+Each simulation draws a new ordering/sample of the trade pnls, compounds it into an
+equity path and records the final equity, the max drawdown and whether equity ever
+fell to the ruin level. Simulations run as (chunk × trades) NumPy matrices; chunks
+are seeded from one SeedSequence, so results are identical with or without a pool.
+
+Methods:
+  bootstrap  i.i.d. resampling with replacement
+  block      circular moving-block bootstrap (keeps streaks / serial correlation)
+  shuffle    permutation without replacement (same final equity, different paths)
+"""
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+METHODS = ("bootstrap", "block", "shuffle")
+PERCENTILES = (5, 25, 50, 75, 95)
+CHUNK_ELEMENTS = 2_000_000   # trades × simulations per batch, ~16 MB of float64 per matrix
+
+
+def trade_pnls(trades: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Fractional pnls of closed trades, in trade order."""
+    return np.array([float(t.get("pnl") or 0.0) for t in trades], dtype="float64")
+
+
+def default_block_size(n_trades: int) -> int:
+    return max(1, round(n_trades ** (1 / 3)))
+
+
+def _sample_indices(
+    rng: np.random.Generator, sims: int, n: int, method: str, block_size: int,
+) -> np.ndarray:
+    if method == "bootstrap":
+        return rng.integers(0, n, size=(sims, n))
+    if method == "shuffle":
+        return rng.permuted(np.broadcast_to(np.arange(n), (sims, n)), axis=1)
+    blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(sims, blocks, 1))
+    return ((starts + np.arange(block_size)) % n).reshape(sims, -1)[:, :n]
+
+
+def simulate_chunk(
+    pnls: np.ndarray,
+    sims: int,
+    method: str,
+    block_size: int,
+    ruin_level: float,
+    seed: np.random.SeedSequence,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(final equity, max drawdown, ruined?) of ``sims`` simulated paths; also a pool worker."""
+    rng = np.random.default_rng(seed)
+    growth = 1.0 + pnls[_sample_indices(rng, sims, len(pnls), method, block_size)]
+    equity = np.cumprod(growth, axis=1, out=growth)
+
+    # Paths start at 1.0, so the running peak never drops below it.
+    peaks = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peaks, 1.0, out=peaks)
+    max_drawdown = (equity / peaks).min(axis=1) - 1.0
+    ruined = equity.min(axis=1) <= ruin_level
+    return equity[:, -1].copy(), np.minimum(max_drawdown, 0.0), ruined
+
+
+def _summary(values: np.ndarray, percentiles: Sequence[float]) -> Dict[str, float]:
+    points = np.percentile(values, percentiles)
+    summary = {f"p{p:g}": round(float(v), 6) for p, v in zip(percentiles, points)}
+    summary["mean"] = round(float(values.mean()), 6)
+    return summary
+
+
+def run_monte_carlo(
+    pnls: Union[Sequence[float], np.ndarray],
+    simulations: int = 10_000,
+    method: str = "bootstrap",
+    block_size: Optional[int] = None,
+    ruin_level: float = 0.5,
+    percentiles: Sequence[float] = PERCENTILES,
+    seed: Optional[int] = None,
+    pool: Optional[Executor] = None,
+) -> Dict[str, Any]:
+    """
+    Distribution of final equity (starting at 1.0), max drawdown (negative fraction) and
+    the probability that equity touches ``ruin_level`` over ``simulations`` re-sampled
+    trade sequences. Chunks are submitted to ``pool`` when given.
+    """
+    pnls = np.asarray(pnls, dtype="float64")
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method '{method}' (expected one of {', '.join(METHODS)})")
+    if simulations < 1:
+        raise ValueError("simulations must be at least 1")
+    if not 0.0 <= ruin_level < 1.0:
+        raise ValueError("ruin_level must be in [0, 1)")
+
+    n = len(pnls)
+    block_size = min(block_size or default_block_size(n), max(n, 1))
+    result: Dict[str, Any] = {
+        "simulations": simulations,
+        "trades": n,
+        "method": method,
+        "block_size": block_size if method == "block" else None,
+        "ruin_level": ruin_level,
+    }
+    if n == 0:
+        return {**result, "final_equity": None, "max_drawdown": None, "probability_of_ruin": None}
+
+    chunk = max(1, min(simulations, CHUNK_ELEMENTS // n))
+    sizes = [min(chunk, simulations - start) for start in range(0, simulations, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(pnls, size, method, block_size, ruin_level, child) for size, child in zip(sizes, seeds)]
+
+    if pool is not None:
+        parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = [
+            future.result() for future in [pool.submit(simulate_chunk, *job) for job in jobs]
+        ]
+    else:
+        parts = [simulate_chunk(*job) for job in jobs]
+
+    final_equity = np.concatenate([part[0] for part in parts])
+    max_drawdown = np.concatenate([part[1] for part in parts])
+    ruined = np.concatenate([part[2] for part in parts])
+
+    return {
+        **result,
+        "final_equity": _summary(final_equity, percentiles),
+        "max_drawdown": _summary(max_drawdown, percentiles),
+        "probability_of_ruin": round(float(ruined.mean()), 6),
+    }
@@ -0,0 +1,363 @@
+"""
+portfolio.py
+------------
+Portfolio backtests: one or more strategy legs (dataset × timeframe × config) traded
+from a single cash balance.
+
+Each leg's signals come from ``run_strategy`` in the batch process pool, exactly as a
+single-instrument backtest. The parent then aligns every leg's closes on the union of
+their bar times (forward-filled, never looking ahead) and replays the trades in entry
+order against shared capital:
+
+  * exits due at or before a bar are settled before that bar's entries;
+  * an entry is skipped when ``max_positions`` are already open or the free cash
+    covers less than ``MIN_ALLOCATION_FRACTION`` of its target allocation;
+  * its allocation comes from the sizing rule applied to the mark-to-market equity.
+
+The combined equity curve is then rebuilt from the accepted trades with cumulative
+sums over the (bars × legs) arrays.
+"""
+from __future__ import annotations
+
+import heapq
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.backtesting.batch import get_pool
+from backend.backtesting.execution import EquityCurve, bar_index
+from backend.backtesting.metrics import equity_metrics
+from backend.market_data.downsampling import decimate_line
+from backend.market_data.shared_candles import SharedCandles
+from backend.strategy_engine import run_strategy
+from backend.utils.helpers import clean_data
+
+SIZING_METHODS = ("equal", "fraction", "fixed")
+# An entry is only taken when cash covers at least this share of its target allocation;
+# below that it is counted as skipped_cash instead of opening a dust position.
+MIN_ALLOCATION_FRACTION = 0.5
+_SHORT_TYPES = frozenset({"SELL", "SHORT"})
+
+
+@dataclass
+class PortfolioLeg:
+    dataset_id: str
+    timeframe: str
+    config: Dict[str, Any] = field(default_factory=dict)
+
+
+def run_portfolio_leg(handle: SharedCandles, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker entry point: one leg's bar times, closes and trades."""
+    candles = handle.candles()
+    result = clean_data(run_strategy(candles.to_dataframe(), config))
+    return {
+        "time": np.array(candles.time, dtype="int64"),
+        "close": np.array(candles.close, dtype="float64"),
+        "trades": result.get("trades", []),
+    }
+
+
+def align_closes(times: Sequence[np.ndarray], closes: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Union bar grid of all legs plus a (bars × legs) close matrix holding each leg's last
+    known close at every grid time (NaN before the leg's first bar).
+    """
+    grid = np.unique(np.concatenate(times)) if times else np.empty(0, dtype="int64")
+    matrix = np.full((len(grid), len(times)), np.nan)
+    for column, (leg_time, leg_close) in enumerate(zip(times, closes)):
+        last = np.searchsorted(leg_time, grid, side="right") - 1
+        known = last >= 0
+        matrix[known, column] = leg_close[last[known]]
+    return grid, matrix
+
+
+def check_settings(initial_capital: float, sizing: str, position_size: Optional[float], max_positions: int) -> None:
+    if not initial_capital > 0:
+        raise ValueError("initial_capital must be positive")
+    if sizing not in SIZING_METHODS:
+        raise ValueError(f"Unknown sizing '{sizing}' (expected one of {', '.join(SIZING_METHODS)})")
+    if sizing != "equal" and (position_size is None or position_size <= 0):
+        raise ValueError(f"Sizing '{sizing}' requires a positive position_size")
+    if max_positions < 1:
+        raise ValueError("max_positions must be at least 1")
+
+
+def _candidates(grid: np.ndarray, leg_trades: Sequence[List[Dict[str, Any]]]) -> Dict[str, np.ndarray]:
+    leg, entry_t, exit_t, direction, pnl, source = [], [], [], [], [], []
+    for column, trades in enumerate(leg_trades):
+        for k, trade in enumerate(trades):
+            if trade.get("entry_time") is None or trade.get("exit_time") is None:
+                continue
+            leg.append(column)
+            entry_t.append(float(trade["entry_time"]))
+            exit_t.append(float(trade["exit_time"]))
+            direction.append(-1.0 if str(trade.get("type", "BUY")).upper() in _SHORT_TYPES else 1.0)
+            pnl.append(float(trade.get("pnl") or 0.0))
+            source.append(k)
+
+    entry_bar = bar_index(grid, np.array(entry_t, dtype="float64"))
+    exit_bar = np.maximum(bar_index(grid, np.array(exit_t, dtype="float64")), entry_bar)
+    leg_arr = np.array(leg, dtype="int64")
+    order = np.lexsort((leg_arr, entry_bar))
+    return {
+        "leg": leg_arr[order],
+        "entry_bar": entry_bar[order],
+        "exit_bar": exit_bar[order],
+        "direction": np.array(direction)[order],
+        "pnl": np.array(pnl)[order],
+        "source": np.array(source, dtype="int64")[order],
+    }
+
+
+def simulate_portfolio(
+    grid: np.ndarray,
+    closes: np.ndarray,
+    leg_trades: Sequence[List[Dict[str, Any]]],
+    initial_capital: float = 10_000.0,
+    sizing: str = "equal",
+    position_size: Optional[float] = None,
+    max_positions: int = 5,
+) -> Dict[str, Any]:
+    """
+    Replay every leg's trades against one cash balance. Returns the accepted trades'
+    arrays (``taken`` indexes the entry-ordered candidates), the per-bar equity, open
+    position count and skip counts.
+
+    Sizing: ``equal`` allocates equity / max_positions, ``fraction`` allocates
+    ``position_size`` × equity and ``fixed`` allocates ``position_size`` in currency;
+    allocations are capped at the available cash, and entries whose cash covers less
+    than ``MIN_ALLOCATION_FRACTION`` of the target are skipped.
+    """
+    check_settings(initial_capital, sizing, position_size, max_positions)
+    cand = _candidates(grid, leg_trades)
+    leg, entry_bar, exit_bar = cand["leg"], cand["entry_bar"], cand["exit_bar"]
+    direction, pnl = cand["direction"], cand["pnl"]
+    entry_close = closes[entry_bar, leg] if len(leg) else np.empty(0)
+
+    allocation = np.zeros(len(leg))
+    cash = float(initial_capital)
+    open_heap: List[Tuple[int, int]] = []   # (exit_bar, candidate)
+    skipped_limit = skipped_cash = 0
+
+    for k in range(len(leg)):
+        bar = entry_bar[k]
+        while open_heap and open_heap[0][0] <= bar:
+            _exit, j = heapq.heappop(open_heap)
+            cash += allocation[j] * (1.0 + pnl[j])
+        if len(open_heap) >= max_positions:
+            skipped_limit += 1
+            continue
+
+        equity = cash
+        for _exit, j in open_heap:
+            equity += allocation[j] * (1.0 + direction[j] * (closes[bar, leg[j]] / entry_close[j] - 1.0))
+        if sizing == "equal":
+            target = equity / max_positions
+        elif sizing == "fraction":
+            target = equity * position_size
+        else:
+            target = position_size
+        amount = min(target, cash)
+        if not (target > 0 and amount >= MIN_ALLOCATION_FRACTION * target) or not np.isfinite(entry_close[k]):
+            skipped_cash += 1
+            continue
+        allocation[k] = amount
+        cash -= amount
+        heapq.heappush(open_heap, (exit_bar[k], k))
+
+    taken = np.flatnonzero(allocation > 0)
+    equity, open_count, gross = _equity_curve(
+        len(grid), closes, initial_capital,
+        leg[taken], entry_bar[taken], exit_bar[taken], direction[taken],
+        allocation[taken], entry_close[taken], pnl[taken],
+    )
+    return {
+        "candidates": cand,
+        "taken": taken,
+        "allocation": allocation[taken],
+        "equity": equity,
+        "open_positions": open_count,
+        "gross_exposure": gross,
+        "skipped_max_positions": skipped_limit,
+        "skipped_cash": skipped_cash,
+    }
+
+
+def _equity_curve(
+    n_bars: int,
+    closes: np.ndarray,
+    initial_capital: float,
+    leg: np.ndarray,
+    entry_bar: np.ndarray,
+    exit_bar: np.ndarray,
+    direction: np.ndarray,
+    allocation: np.ndarray,
+    entry_close: np.ndarray,
+    pnl: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Equity = capital + realized pnl + open positions marked at each bar's close."""
+    n_legs = closes.shape[1]
+    units = np.zeros((n_bars + 1, n_legs))      # signed quantity held over [entry, exit)
+    cost = np.zeros(n_bars + 1)                 # signed notional of the same positions
+    count = np.zeros(n_bars + 1, dtype="int64")
+    realized = np.zeros(n_bars)
+
+    quantity = direction * allocation / entry_close
+    np.add.at(units, (entry_bar, leg), quantity)
+    np.add.at(units, (exit_bar, leg), -quantity)
+    np.add.at(cost, entry_bar, direction * allocation)
+    np.add.at(cost, exit_bar, -direction * allocation)
+    np.add.at(count, entry_bar, 1)
+    np.add.at(count, exit_bar, -1)
+    np.add.at(realized, exit_bar, allocation * pnl)
+
+    held = np.cumsum(units[:n_bars], axis=0)
+    held[np.abs(held) < 1e-12] = 0.0
+    marks = np.nan_to_num(closes) * held
+    unrealized = marks.sum(axis=1) - np.cumsum(cost[:n_bars])
+    equity = initial_capital + np.cumsum(realized) + unrealized
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gross = np.where(equity > 0, np.abs(marks).sum(axis=1) / equity, np.nan)
+    return equity, np.cumsum(count[:n_bars]), gross
+
+
+def portfolio_report(
+    legs: Sequence[PortfolioLeg],
+    grid: np.ndarray,
+    leg_trades: Sequence[List[Dict[str, Any]]],
+    simulation: Dict[str, Any],
+    initial_capital: float,
+    max_points: Optional[int] = 2000,
+) -> Dict[str, Any]:
+    """Portfolio metrics, per-leg breakdown, accepted trades and the (decimated) equity curve."""
+    cand, taken = simulation["candidates"], simulation["taken"]
+    equity = simulation["equity"]
+    allocation = simulation["allocation"]
+    pnl_amount = allocation * cand["pnl"][taken]
+    taken_leg = cand["leg"][taken]
+    gross = simulation["gross_exposure"]
+
+    metrics: Dict[str, Any] = {
+        "initial_capital": round(float(initial_capital), 2),
+        "final_equity": round(float(equity[-1]), 2) if len(equity) else round(float(initial_capital), 2),
+        "total_return": round(float(equity[-1] / initial_capital - 1.0), 6) if len(equity) else 0.0,
+        "total_trades": int(len(taken)),
+        "win_rate": round(float(np.mean(pnl_amount > 0)), 4) if len(taken) else 0.0,
+        "skipped_max_positions": simulation["skipped_max_positions"],
+        "skipped_cash": simulation["skipped_cash"],
+        "max_concurrent_positions": int(simulation["open_positions"].max()) if len(equity) else 0,
+        "max_gross_exposure": round(float(np.nanmax(gross, initial=0.0)), 4),
+    }
+    if len(equity) > 1:
+        returns = np.concatenate(([0.0], equity[1:] / equity[:-1] - 1.0))
+        curve = EquityCurve(
+            time=grid, returns=returns, equity=equity / initial_capital,
+            position=simulation["open_positions"].astype("float64"),
+        )
+        metrics.update(equity_metrics(curve))
+
+    leg_rows = []
+    for column, leg in enumerate(legs):
+        mine = taken_leg == column
+        leg_rows.append({
+            "dataset_id": leg.dataset_id,
+            "timeframe": leg.timeframe,
+            "signalled_trades": int(np.sum(cand["leg"] == column)),
+            "taken_trades": int(mine.sum()),
+            "net_pnl": round(float(pnl_amount[mine].sum()), 2),
+            "win_rate": round(float(np.mean(pnl_amount[mine] > 0)), 4) if mine.any() else 0.0,
+        })
+
+    trades = []
+    for position, k in enumerate(taken):
+        leg = legs[cand["leg"][k]]
+        trade = leg_trades[cand["leg"][k]][cand["source"][k]]
+        trades.append({
+            **trade,
+            "dataset_id": leg.dataset_id,
+            "timeframe": leg.timeframe,
+            "allocation": round(float(allocation[position]), 2),
+            "pnl_amount": round(float(pnl_amount[position]), 2),
+        })
+
+    points = decimate_line(grid, equity, max_points) if len(grid) else np.empty(0, dtype="int64")
+    return {
+        "metrics": metrics,
+        "legs": leg_rows,
+        "trades": trades,
+        "equity_curve": [{"time": int(grid[i]), "value": round(float(equity[i]), 2)} for i in points],
+    }
+
+
+def run_portfolio_backtest(
+    legs: Sequence[PortfolioLeg],
+    share: Any,
+    initial_capital: float = 10_000.0,
+    sizing: str = "equal",
+    position_size: Optional[float] = None,
+    max_positions: int = 5,
+    max_points: Optional[int] = 2000,
+    pool: Optional[ProcessPoolExecutor] = None,
+) -> Dict[str, Any]:
+    """
+    Backtest ``legs`` as one portfolio. ``share(dataset_id, timeframe)`` returns the
+    SharedCandles handle for a leg (normally ``data_manager.share_candles``). A leg that
+    fails is reported with ``status: "error"`` in ``legs`` and left out of the portfolio.
+    """
+    started = time.perf_counter()
+    check_settings(initial_capital, sizing, position_size, max_positions)
+    pool = pool or get_pool()
+
+    statuses: List[Dict[str, Any]] = []
+    pending: List[Tuple[PortfolioLeg, Dict[str, Any], Future]] = []
+    for leg in legs:
+        status: Dict[str, Any] = {"dataset_id": leg.dataset_id, "timeframe": leg.timeframe}
+        statuses.append(status)
+        try:
+            handle = share(leg.dataset_id, leg.timeframe)
+        except FileNotFoundError:
+            status.update(status="error", error=f"Dataset {leg.dataset_id} not found")
+            continue
+        except Exception as exc:
+            status.update(status="error", error=f"Data fetch error: {exc}")
+            continue
+        if handle.rows == 0:
+            status.update(status="error", error=f"No market data available for dataset {leg.dataset_id}")
+            continue
+        pending.append((leg, status, pool.submit(run_portfolio_leg, handle, leg.config)))
+
+    ok_legs: List[PortfolioLeg] = []
+    ok_statuses: List[Dict[str, Any]] = []
+    outputs: List[Dict[str, Any]] = []
+    for leg, status, future in pending:
+        try:
+            output = future.result()
+        except Exception as exc:
+            status.update(status="error", error=f"Strategy Error: {exc}")
+            continue
+        status.update(status="ok", bars=len(output["time"]))
+        ok_legs.append(leg)
+        ok_statuses.append(status)
+        outputs.append(output)
+
+    grid, closes = align_closes([o["time"] for o in outputs], [o["close"] for o in outputs])
+    leg_trades = [o["trades"] for o in outputs]
+    simulation = simulate_portfolio(
+        grid, closes, leg_trades, initial_capital, sizing, position_size, max_positions,
+    )
+    report = portfolio_report(ok_legs, grid, leg_trades, simulation, initial_capital, max_points)
+
+    for status, row in zip(ok_statuses, report["legs"]):
+        status.update(row)
+    return {
+        **report,
+        "legs": statuses,
+        "settings": {
+            "initial_capital": initial_capital, "sizing": sizing,
+            "position_size": position_size, "max_positions": max_positions,
+        },
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
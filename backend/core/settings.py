@@ -7,3 +7,9 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 JWT_SECRET = os.getenv("JWT_SECRET", "supersecretjwtkey")
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
+
+# Byte budget of the process-wide candle store (backend/market_data/candle_store.py).
+CANDLE_STORE_MAX_BYTES = int(os.getenv("CANDLE_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Worker processes for batch backtests (backend/backtesting/batch.py); 0 means one per CPU.
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", "0"))
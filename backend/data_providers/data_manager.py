@@ -1,13 +1,22 @@
 """
 data_manager.py
 ---------------
-Loads uploaded CSV datasets and aggregates them into requested timeframes.
+Loads uploaded datasets (CSV, Parquet, Feather) and aggregates them into requested timeframes.
 """
 
 from __future__ import annotations
 import os
 from pathlib import Path
-from backend.market_data.csv_dataset_loader import TIMEFRAME_RULES, load_dataset_candles
+from typing import Optional
+
+import pandas as pd
+
+from backend.market_data.candle_array import CandleArray
+from backend.market_data.candle_store import file_version
+from backend.market_data.columnar_cache import is_cache_fresh
+from backend.market_data.csv_dataset_loader import TIMEFRAME_RULES, load_dataset_frame
+from backend.market_data.dataset_formats import get_dataset_path
+from backend.market_data.shared_candles import SharedCandles, get_shared_path, open_shared, share_dataframe
 
 # Supported timeframes and their pandas resample rules
 TIMEFRAME_MAP = dict(TIMEFRAME_RULES)
@@ -22,7 +31,7 @@ class DataManager:
             
         self.datasets_dir.mkdir(parents=True, exist_ok=True)
 
-    def load_candles(self, arg1: str, arg2: str, arg3: str = "1h") -> list[dict]:
+    def load_candles(self, arg1: str, arg2: str, arg3: str = "1h") -> CandleArray:
         """
         Backward compatibility for load_candles.
         Previously it was called as:
@@ -33,6 +42,10 @@ class DataManager:
           load_candles(dataset_id, timeframe)
           or load_candles(broker, dataset_id, timeframe)
         """
+        return CandleArray.from_dataframe(self.load_frame(arg1, arg2, arg3))
+
+    def load_frame(self, arg1: str, arg2: str, arg3: str = "1h") -> pd.DataFrame:
+        """Same argument handling as load_candles, but returns the resampled DataFrame."""
         # Determine which arg is the dataset_id (usually the first or second)
         dataset_id = arg1
         timeframe = arg2
@@ -43,14 +56,31 @@ class DataManager:
             timeframe = arg3
 
         try:
-            return load_dataset_candles(dataset_id, self.datasets_dir, timeframe=timeframe or "1m")
+            return load_dataset_frame(dataset_id, self.datasets_dir, timeframe=timeframe or "1m")
         except FileNotFoundError:
             alternate_dataset_id = arg2
             if alternate_dataset_id and alternate_dataset_id != dataset_id:
-                return load_dataset_candles(alternate_dataset_id, self.datasets_dir, timeframe=arg3 or timeframe or "1m")
+                return load_dataset_frame(alternate_dataset_id, self.datasets_dir, timeframe=arg3 or timeframe or "1m")
             else:
                 raise
 
+    def share_candles(self, dataset_id: str, timeframe: str = "1m") -> SharedCandles:
+        """
+        Memory-mapped copy of the resampled dataset for worker processes. Pass the
+        returned handle to tasks instead of the DataFrame and call ``.frame()`` or
+        ``.columns()`` inside the worker.
+        """
+        shared_path = get_shared_path(dataset_id, timeframe, self.datasets_dir)
+        source_path = get_dataset_path(dataset_id, self.datasets_dir)
+        if is_cache_fresh(shared_path, source_path):
+            return open_shared(shared_path)
+        frame = load_dataset_frame(dataset_id, self.datasets_dir, timeframe=timeframe or "1m")
+        return share_dataframe(frame, shared_path, source_path=source_path)
+
+    def dataset_version(self, dataset_id: str) -> Optional[tuple[int, int]]:
+        """(mtime_ns, size) of the dataset file, or None when it cannot be resolved."""
+        return file_version(get_dataset_path(dataset_id, self.datasets_dir))
+
 
 # ── Singleton ─────────────────────────────────────────────────────────────────
 data_manager = DataManager()
@@ -1,3 +1,10 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Hashable
+
+import numpy as np
 import pandas as pd
 
 def calculate_sma(close: pd.Series, window: int = 20) -> pd.Series:
@@ -31,3 +38,125 @@ def calculate_bbands(close: pd.Series, window: int = 20, dev: float = 2.0):
     upper = sma + (std * dev)
     lower = sma - (std * dev)
     return upper, lower, sma
+
+
+# ── Selectable indicator set ──────────────────────────────────────────────────
+
+INDICATOR_SPECS = {
+    "sma":    {"defaults": (20,),       "outputs": ("value",),                       "primary": "value"},
+    "ema":    {"defaults": (50,),       "outputs": ("value",),                       "primary": "value"},
+    "rsi":    {"defaults": (14,),       "outputs": ("value",),                       "primary": "value"},
+    "macd":   {"defaults": (12, 26, 9), "outputs": ("macd", "signal", "histogram"), "primary": "macd"},
+    "bbands": {"defaults": (20, 2.0),   "outputs": ("upper", "lower", "middle"),    "primary": "middle"},
+}
+
+DEFAULT_INDICATORS = "sma:20,ema:50,rsi:14,macd:12:26:9,bbands:20:2"
+
+
+def _coerce_param(raw: str, default):
+    value = float(raw)
+    if isinstance(default, int):
+        if not value.is_integer() or value <= 0:
+            raise ValueError(f"Indicator period must be a positive integer, got {raw!r}")
+        return int(value)
+    return value
+
+
+def parse_indicator_request(spec: str | None) -> list[tuple[str, str, tuple]]:
+    """
+    Parse "alias=name:p1:p2,..." into (alias, name, params) tuples.
+    Aliases are optional; unspecified params fall back to the indicator defaults.
+    """
+    parsed = []
+    for token in (spec or DEFAULT_INDICATORS).split(","):
+        token = token.strip()
+        if not token:
+            continue
+        alias, _, body = token.rpartition("=")
+        name, *raw_params = [part.strip() for part in body.split(":")]
+        name = name.lower()
+        if name not in INDICATOR_SPECS:
+            raise ValueError(f"Unknown indicator: {name}. Expected one of: {sorted(INDICATOR_SPECS)}")
+        defaults = INDICATOR_SPECS[name]["defaults"]
+        if len(raw_params) > len(defaults):
+            raise ValueError(f"Too many parameters for {name}: expected at most {len(defaults)}")
+        params = tuple(
+            _coerce_param(raw_params[i], default) if i < len(raw_params) and raw_params[i] else default
+            for i, default in enumerate(defaults)
+        )
+        parsed.append((alias.strip(), name, params))
+
+    names = [name for _, name, _ in parsed]
+    return [
+        (alias or (name if names.count(name) == 1 else "_".join([name, *map(str, params)])), name, params)
+        for alias, name, params in parsed
+    ]
+
+
+def compute_indicator_arrays(close: pd.Series, name: str, params: tuple) -> dict[str, np.ndarray]:
+    if name == "sma":
+        outputs = (calculate_sma(close, *params),)
+    elif name == "ema":
+        outputs = (calculate_ema(close, *params),)
+    elif name == "rsi":
+        outputs = (calculate_rsi(close, *params),)
+    elif name == "macd":
+        outputs = calculate_macd(close, *params)
+    elif name == "bbands":
+        outputs = calculate_bbands(close, *params)
+    else:
+        raise ValueError(f"Unknown indicator: {name}")
+
+    return {
+        key: series.to_numpy(dtype="float64")
+        for key, series in zip(INDICATOR_SPECS[name]["outputs"], outputs)
+    }
+
+
+# ── Shared indicator cache ────────────────────────────────────────────────────
+
+class IndicatorCache:
+    """
+    Process-wide LRU of computed indicator arrays keyed by
+    (source key, indicator name, params). The source key must change whenever
+    the underlying candles change, e.g. (dataset_id, timeframe, file version).
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = int(max_entries)
+        self._entries: OrderedDict[tuple, dict[str, np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source_key: Hashable, name: str, params: tuple, close: pd.Series) -> dict[str, np.ndarray]:
+        key = (source_key, name, tuple(params))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        arrays = compute_indicator_arrays(close, name, tuple(params))
+        for array in arrays.values():
+            array.setflags(write=False)
+
+        with self._lock:
+            self._entries[key] = arrays
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return arrays
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+indicator_cache = IndicatorCache()
@@ -0,0 +1,150 @@
+"""
+candle_array.py
+---------------
+Struct-of-arrays candle container used between the loaders and the strategy
+engine. One int64 array of epoch seconds plus one array per OHLCV field
+(float64 by default, float32 via ``astype``) costs 48 bytes per candle
+instead of roughly half a kilobyte for a dict of Python floats.
+
+It still behaves like the old ``list[dict]`` for reading code (``len``,
+indexing, iteration, slicing), but dicts are only materialized on demand:
+call ``to_candles()`` at the JSON edge and ``to_dataframe()`` where a frame is
+needed.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+from operator import itemgetter
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+FIELDS = ("time", *PRICE_FIELDS)
+
+_get_time = itemgetter("time")
+_get_prices = itemgetter("open", "high", "low", "close")
+
+
+class CandleArray(Sequence):
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        time: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+    ):
+        self.time = np.asarray(time, dtype="int64")
+        prices = [np.asarray(values) for values in (open, high, low, close, volume)]
+        for field, values in zip(PRICE_FIELDS, prices):
+            if values.dtype.kind != "f":
+                values = values.astype("float64")
+            if len(values) != len(self.time):
+                raise ValueError(f"CandleArray field '{field}' has {len(values)} values, expected {len(self.time)}")
+            setattr(self, field, values)
+
+    # ── construction ──────────────────────────────────────────────────────────
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, time_column: str = "timestamp") -> "CandleArray":
+        """From a frame with a datetime ``timestamp`` (or epoch-seconds ``time``) column plus OHLCV."""
+        if time_column not in df.columns and "time" in df.columns:
+            time_column = "time"
+        times = df[time_column]
+        if pd.api.types.is_datetime64_any_dtype(times):
+            epoch = pd.Timestamp(0, tz="UTC") if getattr(times.dt, "tz", None) is not None else pd.Timestamp(0)
+            seconds = ((times - epoch) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+        else:
+            seconds = times.to_numpy(dtype="int64")
+        volume = df["volume"].to_numpy(dtype="float64") if "volume" in df.columns else np.zeros(len(df))
+        return cls(
+            seconds,
+            df["open"].to_numpy(dtype="float64"),
+            df["high"].to_numpy(dtype="float64"),
+            df["low"].to_numpy(dtype="float64"),
+            df["close"].to_numpy(dtype="float64"),
+            volume,
+        )
+
+    @classmethod
+    def from_candles(cls, candles: Iterable[dict]) -> "CandleArray":
+        candles = list(candles)
+        if not candles:
+            return cls.empty()
+        try:
+            times = np.fromiter(map(_get_time, candles), dtype="int64", count=len(candles))
+            prices = np.array(list(map(_get_prices, candles)), dtype="float64")
+            volume = np.array([c.get("volume") or 0.0 for c in candles], dtype="float64")
+            if not np.isnan(prices).any():  # None becomes NaN here but 0.0 below
+                return cls(times, *prices.T, volume)
+        except (KeyError, TypeError, ValueError):
+            pass  # missing fields: fall back to the per-field conversion below
+        return cls(
+            np.fromiter((int(c["time"]) for c in candles), dtype="int64", count=len(candles)),
+            *(
+                np.fromiter((float(c.get(field) or 0.0) for c in candles), dtype="float64", count=len(candles))
+                for field in PRICE_FIELDS
+            ),
+        )
+
+    @classmethod
+    def empty(cls) -> "CandleArray":
+        return cls(np.empty(0, dtype="int64"), *(np.empty(0) for _ in PRICE_FIELDS))
+
+    # ── sequence protocol ─────────────────────────────────────────────────────
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Any:
+        if isinstance(index, (int, np.integer)):
+            position = int(index)
+            return {
+                "time": int(self.time[position]),
+                **{field: float(getattr(self, field)[position]) for field in PRICE_FIELDS},
+            }
+        return CandleArray(*(getattr(self, field)[index] for field in FIELDS))
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.to_candles())
+
+    def __repr__(self) -> str:
+        return f"CandleArray(len={len(self)}, dtype={self.close.dtype})"
+
+    # ── conversions ───────────────────────────────────────────────────────────
+    def to_candles(self) -> list[dict]:
+        """The JSON-edge representation: one ``{"time", "open", ..., "volume"}`` dict per candle."""
+        columns = [self.time.tolist(), *(getattr(self, field).tolist() for field in PRICE_FIELDS)]
+        return [
+            {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for t, o, h, l, c, v in zip(*columns)
+        ]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Same columns and dtypes as ``pd.DataFrame(candle_dicts)`` used to produce."""
+        return pd.DataFrame({field: getattr(self, field) for field in FIELDS})
+
+    def astype(self, dtype: Union[str, np.dtype]) -> "CandleArray":
+        """Copy with OHLCV in ``dtype`` (e.g. float32 for compact storage); times stay int64."""
+        return CandleArray(self.time, *(getattr(self, field).astype(dtype) for field in PRICE_FIELDS))
+
+    def between(self, start: Optional[int] = None, end: Optional[int] = None) -> "CandleArray":
+        """Candles with ``start <= time <= end`` (epoch seconds); relies on times being sorted."""
+        lo = 0 if start is None else int(np.searchsorted(self.time, int(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.time, int(end), side="right"))
+        return self[lo:hi]
+
+    @property
+    def nbytes(self) -> int:
+        return int(sum(getattr(self, field).nbytes for field in FIELDS))
+
+
+def as_candle_array(candles: Union[CandleArray, Iterable[dict]]) -> CandleArray:
+    return candles if isinstance(candles, CandleArray) else CandleArray.from_candles(candles)
+
+
+def candle_dicts(candles: Union[CandleArray, Sequence[dict]]) -> list[dict]:
+    return candles.to_candles() if isinstance(candles, CandleArray) else list(candles)
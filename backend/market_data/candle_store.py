@@ -0,0 +1,134 @@
+"""
+candle_store.py
+---------------
+Process-wide LRU of loaded candle data (DataFrames or arrays) bounded by a byte
+budget rather than an entry count, since a 1m dataset can be a hundred times
+larger than a 1d one.
+
+Every entry carries the version of the file it came from (see ``file_version``);
+a lookup with a different version drops the stale entry and reloads. Values are
+shared between callers and must be treated as read-only.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional, TypeVar, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.core.settings import CANDLE_STORE_MAX_BYTES
+
+T = TypeVar("T")
+FileVersion = tuple[int, int]
+
+
+def file_version(path: Union[str, Path]) -> Optional[FileVersion]:
+    """(mtime_ns, size) of ``path``, or None when it cannot be stat'ed."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def estimate_nbytes(value: Any) -> int:
+    if isinstance(value, pd.DataFrame):
+        deep = any(dtype == object for dtype in value.dtypes)
+        return int(value.memory_usage(index=True, deep=deep).sum())
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, (int, np.integer)):
+        return int(nbytes)
+    return sys.getsizeof(value)
+
+
+class CandleStore:
+    def __init__(self, max_bytes: int = CANDLE_STORE_MAX_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries: OrderedDict[Hashable, tuple[Hashable, Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Hashable, loader: Callable[[], T]) -> T:
+        cached = self.peek(key, version)
+        if cached is not None:
+            return cached
+        with self._lock:
+            self.misses += 1
+
+        value = loader()
+        self._store(key, version, value)
+        return value
+
+    def peek(self, key: Hashable, version: Hashable) -> Optional[Any]:
+        """The cached value for (key, version), or None. Never loads; a miss is not counted."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != version:
+                self._drop(key)
+                self.invalidations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        with self._lock:
+            keys = list(self._entries) if key is None else [key] if key in self._entries else []
+            for stale in keys:
+                self._drop(stale)
+            self.invalidations += len(keys)
+
+    def set_max_bytes(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _store(self, key: Hashable, version: Hashable, value: Any) -> None:
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                return  # larger than the whole budget: serve it, don't keep it
+            self._entries[key] = (version, value, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+
+
+candle_store = CandleStore()
@@ -0,0 +1,90 @@
+"""
+columnar_cache.py
+-----------------
+Normalized, columnar copy of each dataset stored next to the source file as
+``.cache/{dataset_id}.npy``. Reading it skips CSV parsing and normalization
+entirely; it is written once at ingest (or on the first normalized load of a
+legacy dataset) and is considered stale as soon as the source file is newer.
+"""
+from __future__ import annotations
+
+import os
+import uuid
+from pathlib import Path
+from typing import Final, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME: Final[str] = ".cache"
+
+CANDLE_RECORD_DTYPE: Final[np.dtype] = np.dtype([
+    ("timestamp", "<i8"),  # epoch nanoseconds, UTC
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+_EPOCH: Final[pd.Timestamp] = pd.Timestamp(0, tz="UTC")
+
+
+def get_cache_dir(datasets_dir: Union[str, Path]) -> Path:
+    return Path(datasets_dir) / CACHE_DIRNAME
+
+
+def get_cache_path(dataset_id: str, datasets_dir: Union[str, Path]) -> Path:
+    return get_cache_dir(datasets_dir) / f"{dataset_id}.npy"
+
+
+def is_cache_fresh(cache_path: Path, source_path: Path) -> bool:
+    try:
+        return cache_path.stat().st_mtime_ns >= source_path.stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+def dataframe_to_records(df: pd.DataFrame) -> np.ndarray:
+    records = np.empty(len(df), dtype=CANDLE_RECORD_DTYPE)
+    records["timestamp"] = ((df["timestamp"] - _EPOCH) // pd.Timedelta(1, "ns")).to_numpy(dtype="int64")
+    for column in ("open", "high", "low", "close", "volume"):
+        records[column] = df[column].to_numpy(dtype="float64")
+    return records
+
+
+def records_to_dataframe(records: np.ndarray) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(np.asarray(records["timestamp"]), unit="ns", utc=True),
+        "open": np.asarray(records["open"]),
+        "high": np.asarray(records["high"]),
+        "low": np.asarray(records["low"]),
+        "close": np.asarray(records["close"]),
+        "volume": np.asarray(records["volume"]),
+    })
+
+
+def write_records(records: np.ndarray, cache_path: Path) -> None:
+    """Atomic write: readers either see the previous cache or the complete new one."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique per writer: threads of one process refreshing the same cache must not share it.
+    tmp_path = cache_path.with_name(f".{cache_path.name}.{uuid.uuid4().hex}.tmp")
+    with tmp_path.open("wb") as handle:
+        np.save(handle, records, allow_pickle=False)
+    os.replace(tmp_path, cache_path)
+
+
+def write_dataframe_cache(df: pd.DataFrame, cache_path: Path) -> None:
+    write_records(dataframe_to_records(df), cache_path)
+
+
+def read_dataframe_cache(cache_path: Path, source_path: Optional[Path] = None) -> Optional[pd.DataFrame]:
+    if source_path is not None and not is_cache_fresh(cache_path, source_path):
+        return None
+    try:
+        records = np.load(cache_path, allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if records.dtype != CANDLE_RECORD_DTYPE:
+        return None
+    return records_to_dataframe(records)
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import contextlib
 from pathlib import Path
-from typing import Optional, Union
+from typing import Any, Optional, Union
 
+import numpy as np
 import pandas as pd
 from fastapi import HTTPException
 
+from backend.market_data.candle_array import CandleArray
+from backend.market_data.candle_store import candle_store, file_version
+from backend.market_data.dataset_formats import get_dataset_path
+from backend.market_data.dataset_metadata import build_dataset_metadata, read_dataset_metadata, write_dataset_metadata
 from backend.market_data.dataset_normalizer import CANONICAL_COLUMNS, load_dataset_dataframe
+from backend.market_data.downsampling import downsample_candles, downsample_dataframe
+from backend.market_data.pagination import build_page, resolve_bounds
 
 TIMEFRAME_RULES = {
     "1m": "1min",
@@ -66,18 +74,68 @@ def resample_dataset_dataframe(df: pd.DataFrame, timeframe: str) -> pd.DataFrame
     return resampled[CANONICAL_COLUMNS]
 
 
+def timestamps_to_epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    return ((timestamps - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+
+
 def dataframe_to_candles(df: pd.DataFrame) -> list[dict]:
-    return [
-        {
-            "time": int(pd.Timestamp(row["timestamp"]).timestamp()),
-            "open": float(row["open"]),
-            "high": float(row["high"]),
-            "low": float(row["low"]),
-            "close": float(row["close"]),
-            "volume": float(row["volume"]),
-        }
-        for _, row in df[CANONICAL_COLUMNS].iterrows()
-    ]
+    columns = {"time": timestamps_to_epoch_seconds(df["timestamp"]).tolist()}
+    for column in ("open", "high", "low", "close", "volume"):
+        columns[column] = df[column].to_numpy(dtype="float64").tolist()
+
+    keys = list(columns)
+    return [dict(zip(keys, row)) for row in zip(*columns.values())]
+
+
+def _raw_time_range(
+    timeframe: str,
+    start: Optional[str],
+    end: Optional[str],
+) -> tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """
+    Raw-row range covering every bar that _filter_dataframe can keep: bars start
+    at or after ``start`` and a bar starting at ``end`` still needs its full period.
+    """
+    rule = TIMEFRAME_RULES.get((timeframe or "1m").lower())
+    period = pd.Timedelta(rule) if rule else pd.Timedelta(0)
+    start_ts = pd.to_datetime(start, utc=True) if start else None
+    end_ts = pd.to_datetime(end, utc=True) + max(period, pd.Timedelta(1, "ns")) if end else None
+    return start_ts, end_ts
+
+
+def load_dataset_frame(
+    dataset_id: str,
+    datasets_dir: Union[str, Path],
+    timeframe: str = "1m",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Dataset resampled to ``timeframe``, shared through the candle store. The
+    result must be treated as read-only.
+
+    ``start``/``end`` only narrow what is read from disk, and only when the full
+    frame is not already in the store; callers still apply the exact bar filter.
+    """
+    path = get_dataset_path(dataset_id, datasets_dir)
+    version = file_version(path)
+    if version is None:
+        return resample_dataset_dataframe(load_dataset_dataframe(dataset_id, datasets_dir), timeframe)
+
+    key = ("dataset", str(path.resolve()), (timeframe or "1m").lower())
+    if start or end:
+        cached = candle_store.peek(key, version)
+        if cached is not None:
+            return cached
+        raw_start, raw_end = _raw_time_range(timeframe, start, end)
+        df = load_dataset_dataframe(dataset_id, datasets_dir, start=raw_start, end=raw_end)
+        return resample_dataset_dataframe(df, timeframe)
+
+    return candle_store.get(
+        key,
+        version,
+        lambda: resample_dataset_dataframe(load_dataset_dataframe(dataset_id, datasets_dir), timeframe),
+    )
 
 
 def load_dataset_candles(
@@ -87,24 +145,60 @@ def load_dataset_candles(
     start: Optional[str] = None,
     end: Optional[str] = None,
     limit: Optional[int] = None,
-) -> list[dict]:
-    df = load_dataset_dataframe(dataset_id, datasets_dir)
-    resampled = resample_dataset_dataframe(df, timeframe)
+    max_points: Optional[int] = None,
+) -> CandleArray:
+    resampled = load_dataset_frame(dataset_id, datasets_dir, timeframe, start=start, end=end)
     filtered = _filter_dataframe(resampled, start=start, end=end, limit=limit)
-    return dataframe_to_candles(filtered)
+    return CandleArray.from_dataframe(downsample_dataframe(filtered, max_points))
+
+
+def load_dataset_candle_page(
+    dataset_id: str,
+    datasets_dir: Union[str, Path],
+    timeframe: str = "1m",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    count: Optional[int] = None,
+    window_start: Optional[int] = None,
+    window_end: Optional[int] = None,
+    prefetch: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> dict[str, Any]:
+    resampled = load_dataset_frame(dataset_id, datasets_dir, timeframe, start=start, end=end)
+    filtered = _filter_dataframe(resampled, start=start, end=end)
+
+    times = timestamps_to_epoch_seconds(filtered["timestamp"])
+    try:
+        lo, hi = resolve_bounds(
+            times,
+            before=before,
+            after=after,
+            count=count,
+            window_start=window_start,
+            window_end=window_end,
+            prefetch=prefetch,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Cursors come from the raw bars; only the returned candles are aggregated.
+    page = build_page(CandleArray.from_dataframe(filtered.iloc[lo:hi]), lo, hi, len(filtered))
+    page["candles"] = downsample_candles(page["candles"], max_points)
+    page["timeframe"] = timeframe
+    return page
 
 
 def load_dataset_summary(dataset_id: str, datasets_dir: Union[str, Path]) -> dict:
+    """Served from the metadata sidecar; older datasets are backfilled on first request."""
+    source_path = get_dataset_path(dataset_id, datasets_dir)
+    metadata = read_dataset_metadata(dataset_id, datasets_dir, source_path)
+    if metadata is not None:
+        return metadata
+
     df = load_dataset_dataframe(dataset_id, datasets_dir)
-    start = pd.Timestamp(df["timestamp"].iloc[0]).isoformat() if not df.empty else None
-    end = pd.Timestamp(df["timestamp"].iloc[-1]).isoformat() if not df.empty else None
-
-    return {
-        "id": dataset_id,
-        "dataset_id": dataset_id,
-        "rows": int(len(df)),
-        "start": start,
-        "end": end,
-        "columns": CANONICAL_COLUMNS,
-        "status": "ready",
-    }
+    metadata = build_dataset_metadata(dataset_id, df, source_path)
+    with contextlib.suppress(OSError):
+        write_dataset_metadata(metadata, datasets_dir)
+    return metadata
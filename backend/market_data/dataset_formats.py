@@ -0,0 +1,129 @@
+"""
+dataset_formats.py
+------------------
+File formats accepted for uploaded datasets and how each one is read.
+
+CSV remains the default. Parquet and Feather are read natively through pyarrow
+with column projection (only the columns that normalize to a canonical OHLCV
+name are loaded) and, for Parquet, row-group filtering on the timestamp column
+when a time range is requested.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Collection, Final, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+DATASET_SUFFIXES: Final[tuple[str, ...]] = (".csv", ".parquet", ".feather")
+COLUMNAR_SUFFIXES: Final[frozenset[str]] = frozenset({".parquet", ".feather"})
+
+
+def is_dataset_filename(filename: str) -> bool:
+    return Path(filename).suffix.lower() in DATASET_SUFFIXES
+
+
+def get_dataset_path(dataset_id: str, datasets_dir: Union[str, Path]) -> Path:
+    """First existing ``{dataset_id}{suffix}``, falling back to the CSV path."""
+    base = Path(datasets_dir)
+    for suffix in DATASET_SUFFIXES:
+        candidate = base / f"{dataset_id}{suffix}"
+        if candidate.exists():
+            return candidate
+    return base / f"{dataset_id}{DATASET_SUFFIXES[0]}"
+
+
+ColumnNamer = Callable[[str], str]
+
+
+def _projected_columns(schema: pa.Schema, canonical_name: ColumnNamer, wanted: Collection[str]) -> list[str]:
+    return [name for name in schema.names if canonical_name(name) in wanted]
+
+
+def _drop_redundant_timestamp_columns(
+    parquet_file: pq.ParquetFile,
+    columns: list[str],
+    canonical_name: ColumnNamer,
+) -> list[str]:
+    """
+    Several source columns may alias to ``timestamp`` (e.g. ``timestamp`` and
+    ``time``); normalization keeps the first and only back-fills its nulls. When
+    footer statistics prove the first one has no nulls, the others are not read.
+    """
+    candidates = [name for name in columns if canonical_name(name) == "timestamp"]
+    if len(candidates) < 2:
+        return columns
+
+    metadata = parquet_file.metadata
+    for row_group in range(metadata.num_row_groups):
+        # Leaf-column index: differs from the Arrow field index once a nested column precedes it.
+        chunks = metadata.row_group(row_group)
+        index = next(
+            (i for i in range(chunks.num_columns) if chunks.column(i).path_in_schema == candidates[0]), None,
+        )
+        if index is None:
+            return columns
+        stats = chunks.column(index).statistics
+        if stats is None or not stats.has_null_count or stats.null_count:
+            return columns
+    redundant = set(candidates[1:])
+    return [name for name in columns if name not in redundant]
+
+
+def _timestamp_filters(
+    schema: pa.Schema,
+    columns: list[str],
+    canonical_name: ColumnNamer,
+    start: Optional[pd.Timestamp],
+    end: Optional[pd.Timestamp],
+) -> Optional[list[tuple]]:
+    """Row-group filters, only when the file stores real timestamps (not raw epoch numbers)."""
+    if start is None and end is None:
+        return None
+
+    candidates = [name for name in columns if canonical_name(name) == "timestamp"]
+    if len(candidates) != 1 or not pa.types.is_timestamp(schema.field(candidates[0]).type):
+        return None
+
+    column = candidates[0]
+    field_type = schema.field(column).type
+    filters = []
+    for op, bound in ((">=", start), ("<", end)):
+        if bound is None:
+            continue
+        value = bound if field_type.tz else bound.tz_convert("UTC").tz_localize(None)
+        filters.append((column, op, value))
+    return filters
+
+
+def read_dataset_file(
+    path: Path,
+    canonical_name: ColumnNamer,
+    wanted_columns: Collection[str],
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+    Raw (not yet normalized) frame for ``path``.
+
+    For columnar formats only the source columns whose ``canonical_name`` is in
+    ``wanted_columns`` are read. ``start``/``end`` prune Parquet row groups
+    (``end`` exclusive); callers must still filter the normalized result, since
+    pruning is a no-op for CSV, Feather and epoch-number timestamp columns.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        parquet_file = pq.ParquetFile(path)
+        schema = parquet_file.schema_arrow
+        columns = _projected_columns(schema, canonical_name, wanted_columns)
+        columns = _drop_redundant_timestamp_columns(parquet_file, columns, canonical_name)
+        filters = _timestamp_filters(schema, columns, canonical_name, start, end)
+        table = pq.read_table(path, columns=columns, filters=filters)
+        return table.to_pandas()
+    if suffix == ".feather":
+        table = feather.read_table(path, memory_map=True)
+        return table.select(_projected_columns(table.schema, canonical_name, wanted_columns)).to_pandas()
+    return pd.read_csv(path)
@@ -0,0 +1,204 @@
+"""
+dataset_ingest.py
+-----------------
+Single-pass ingest of uploaded CSV datasets.
+
+Bytes are fed in as they arrive. For CSV, each complete block of lines is parsed
+and normalized with the dataset_normalizer rules, ordering is checked across
+block boundaries, the raw bytes are teed to ``{dataset_id}.csv`` and, once the
+upload ends, the normalized columnar cache and the metadata sidecar are written
+so the dataset is immediately ready to query without a second parse.
+
+Parquet and Feather keep their metadata in the file footer, so they are written
+to disk as they arrive and validated with a single projected read at the end.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+from pathlib import Path
+from typing import Any, Final, Optional, Union
+
+import pandas as pd
+from fastapi import HTTPException
+
+from backend.market_data.columnar_cache import get_cache_path, write_dataframe_cache
+from backend.market_data.dataset_formats import COLUMNAR_SUFFIXES, DATASET_SUFFIXES, read_dataset_file
+from backend.market_data.dataset_metadata import build_dataset_metadata, get_metadata_path, write_dataset_metadata
+from backend.market_data.dataset_normalizer import (
+    CANONICAL_COLUMNS,
+    get_dataset_csv_path,
+    normalize_column_name,
+    normalize_dataset_dataframe,
+    normalize_dataset_rows,
+    sort_dataset_rows,
+    validate_dataset_columns,
+)
+
+DEFAULT_CHUNK_BYTES: Final[int] = 4 * 1024 * 1024
+
+
+class CsvChunkIngestor:
+    """
+    Incremental CSV parser for dataset uploads.
+
+    Usage::
+
+        ingestor = CsvChunkIngestor(dataset_id, datasets_dir)
+        try:
+            for block in stream:
+                ingestor.feed(block)
+            summary = ingestor.finish()
+        except Exception:
+            ingestor.abort()
+            raise
+
+    Rows are split on newlines, so quoted fields spanning several lines are not
+    supported (OHLCV exports never contain them).
+    """
+
+    def __init__(
+        self,
+        dataset_id: str,
+        datasets_dir: Union[str, Path],
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    ):
+        self.dataset_id = dataset_id
+        self.datasets_dir = Path(datasets_dir)
+        self.raw_path = get_dataset_csv_path(dataset_id, datasets_dir)
+        self.cache_path = get_cache_path(dataset_id, datasets_dir)
+        self.metadata_path = get_metadata_path(dataset_id, datasets_dir)
+        self.chunk_bytes = int(chunk_bytes)
+
+        self._raw = self.raw_path.open("wb")
+        self._hash = hashlib.sha256()
+        self._buffer = b""
+        self._header: Optional[bytes] = None
+        self._frames: list[pd.DataFrame] = []
+        self._rows_seen = 0
+        self._last_timestamp: Optional[pd.Timestamp] = None
+        self._ordered = True
+
+    def feed(self, data: bytes) -> None:
+        if not data:
+            return
+        self._raw.write(data)
+        self._hash.update(data)
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_bytes:
+            self._drain(final=False)
+
+    def finish(self) -> dict[str, Any]:
+        self._drain(final=True)
+        self._raw.close()
+
+        if self._header is None:
+            raise HTTPException(status_code=400, detail="CSV is empty.")
+        if not self._frames:
+            raise HTTPException(status_code=400, detail="CSV has no data rows.")
+
+        df = pd.concat(self._frames, ignore_index=True)
+        if not self._ordered:
+            # Same rule as normalize_dataset_dataframe: sort, last duplicate wins.
+            df = sort_dataset_rows(df)
+
+        write_dataframe_cache(df, self.cache_path)
+        metadata = build_dataset_metadata(self.dataset_id, df, self.raw_path, file_hash=self._hash.hexdigest())
+        write_dataset_metadata(metadata, self.datasets_dir)
+        return metadata
+
+    def abort(self) -> None:
+        if not self._raw.closed:
+            self._raw.close()
+        for path in (self.raw_path, self.cache_path, self.metadata_path):
+            path.unlink(missing_ok=True)
+
+    def _drain(self, final: bool) -> None:
+        if self._header is None:
+            newline = self._buffer.find(b"\n")
+            if newline < 0:
+                if not final:
+                    return
+                newline = len(self._buffer)
+            header = self._buffer[: newline + 1]
+            if not header.strip():
+                return
+            self._header = header
+            self._buffer = self._buffer[newline + 1 :]
+            validate_dataset_columns(pd.read_csv(io.BytesIO(header), nrows=0).columns)
+
+        if final:
+            body, self._buffer = self._buffer, b""
+        else:
+            cut = self._buffer.rfind(b"\n")
+            if cut < 0:
+                return
+            body, self._buffer = self._buffer[: cut + 1], self._buffer[cut + 1 :]
+
+        if not body.strip():
+            return
+
+        chunk = pd.read_csv(io.BytesIO(self._header + body))
+        if chunk.empty:
+            return
+        # Keep row numbers in validation errors relative to the whole file.
+        chunk.index = chunk.index + self._rows_seen
+        self._rows_seen += len(chunk)
+
+        normalized = normalize_dataset_rows(chunk)
+        timestamps = normalized["timestamp"]
+        if self._ordered:
+            strictly_increasing = timestamps.is_monotonic_increasing and timestamps.is_unique
+            continues = self._last_timestamp is None or timestamps.iloc[0] > self._last_timestamp
+            self._ordered = bool(strictly_increasing and continues)
+        self._last_timestamp = timestamps.iloc[-1]
+        self._frames.append(normalized)
+
+
+class ColumnarFileIngestor:
+    """Same interface as CsvChunkIngestor for Parquet/Feather uploads."""
+
+    def __init__(self, dataset_id: str, datasets_dir: Union[str, Path], suffix: str):
+        self.dataset_id = dataset_id
+        self.datasets_dir = Path(datasets_dir)
+        self.raw_path = self.datasets_dir / f"{dataset_id}{suffix}"
+        self.metadata_path = get_metadata_path(dataset_id, datasets_dir)
+        self._raw = self.raw_path.open("wb")
+        self._hash = hashlib.sha256()
+
+    def feed(self, data: bytes) -> None:
+        if data:
+            self._raw.write(data)
+            self._hash.update(data)
+
+    def finish(self) -> dict[str, Any]:
+        self._raw.close()
+        try:
+            raw_df = read_dataset_file(self.raw_path, normalize_column_name, CANONICAL_COLUMNS)
+        except (OSError, ValueError) as exc:
+            # pyarrow raises ArrowInvalid (a ValueError) for corrupt or truncated files.
+            raise HTTPException(status_code=400, detail=f"Unreadable {self.raw_path.suffix} file: {exc}")
+        df = normalize_dataset_dataframe(raw_df)
+        if df.empty:
+            raise HTTPException(status_code=400, detail="Dataset has no data rows.")
+        metadata = build_dataset_metadata(self.dataset_id, df, self.raw_path, file_hash=self._hash.hexdigest())
+        write_dataset_metadata(metadata, self.datasets_dir)
+        return metadata
+
+    def abort(self) -> None:
+        if not self._raw.closed:
+            self._raw.close()
+        for path in (self.raw_path, self.metadata_path):
+            path.unlink(missing_ok=True)
+
+
+def create_ingestor(dataset_id: str, datasets_dir: Union[str, Path], filename: str):
+    suffix = Path(filename).suffix.lower()
+    if suffix not in DATASET_SUFFIXES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported dataset format. Allowed: {', '.join(DATASET_SUFFIXES)}",
+        )
+    if suffix in COLUMNAR_SUFFIXES:
+        return ColumnarFileIngestor(dataset_id, datasets_dir, suffix)
+    return CsvChunkIngestor(dataset_id, datasets_dir)
@@ -0,0 +1,133 @@
+"""
+dataset_metadata.py
+-------------------
+Per-dataset summary sidecar stored as ``.cache/{dataset_id}.meta.json``.
+
+It is written at ingest time (or backfilled on the first summary request for
+older datasets) and records the source file's mtime and size, so the summary
+endpoint and the asset list can be served without reading any data file. A
+sidecar whose recorded mtime/size no longer match the source is ignored.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Final, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.market_data.columnar_cache import get_cache_dir
+from backend.market_data.dataset_formats import DATASET_SUFFIXES, get_dataset_path
+from backend.market_data.dataset_normalizer import CANONICAL_COLUMNS
+
+METADATA_SUFFIX: Final[str] = ".meta.json"
+HASH_BLOCK_BYTES: Final[int] = 1024 * 1024
+
+
+def get_metadata_path(dataset_id: str, datasets_dir: Union[str, Path]) -> Path:
+    return get_cache_dir(datasets_dir) / f"{dataset_id}{METADATA_SUFFIX}"
+
+
+def hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while block := handle.read(HASH_BLOCK_BYTES):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    return ((timestamps - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+
+
+def detect_step_seconds(timestamps: pd.Series) -> Optional[int]:
+    """Most common spacing between consecutive bars, in seconds."""
+    if len(timestamps) < 2:
+        return None
+    diffs = np.diff(_epoch_seconds(timestamps))
+    diffs = diffs[diffs > 0]
+    if diffs.size == 0:
+        return None
+    values, counts = np.unique(diffs, return_counts=True)
+    return int(values[np.argmax(counts)])
+
+
+def count_gaps(timestamps: pd.Series, step_seconds: Optional[int]) -> int:
+    """Number of places where consecutive bars are further apart than the detected step."""
+    if step_seconds is None:
+        return 0
+    return int(np.count_nonzero(np.diff(_epoch_seconds(timestamps)) > step_seconds))
+
+
+def build_dataset_metadata(
+    dataset_id: str,
+    df: pd.DataFrame,
+    source_path: Path,
+    file_hash: Optional[str] = None,
+) -> dict[str, Any]:
+    """Summary of a normalized dataset frame plus the identity of its source file."""
+    stat = source_path.stat()
+    step_seconds = detect_step_seconds(df["timestamp"])
+    empty = df.empty
+    return {
+        "id": dataset_id,
+        "dataset_id": dataset_id,
+        "rows": int(len(df)),
+        "start": None if empty else pd.Timestamp(df["timestamp"].iloc[0]).isoformat(),
+        "end": None if empty else pd.Timestamp(df["timestamp"].iloc[-1]).isoformat(),
+        "step_seconds": step_seconds,
+        "gaps": count_gaps(df["timestamp"], step_seconds),
+        "price_range": {
+            "min": None if empty else float(df["low"].min()),
+            "max": None if empty else float(df["high"].max()),
+        },
+        "columns": CANONICAL_COLUMNS,
+        "format": source_path.suffix.lower().lstrip("."),
+        "file_hash": file_hash or hash_file(source_path),
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "status": "ready",
+    }
+
+
+def write_dataset_metadata(metadata: dict[str, Any], datasets_dir: Union[str, Path]) -> Path:
+    path = get_metadata_path(metadata["dataset_id"], datasets_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")   # unique per writing thread
+    tmp_path.write_text(json.dumps(metadata), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_dataset_metadata(
+    dataset_id: str,
+    datasets_dir: Union[str, Path],
+    source_path: Optional[Path] = None,
+) -> Optional[dict[str, Any]]:
+    """The stored sidecar, or None when it is missing, unreadable or stale."""
+    source_path = source_path or get_dataset_path(dataset_id, datasets_dir)
+    try:
+        stat = source_path.stat()
+        metadata = json.loads(get_metadata_path(dataset_id, datasets_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if metadata.get("source_mtime_ns") != stat.st_mtime_ns or metadata.get("source_size") != stat.st_size:
+        return None
+    return metadata
+
+
+def list_dataset_files(datasets_dir: Union[str, Path]) -> list[tuple[str, Path]]:
+    """(dataset_id, path) for every dataset file, one entry per id using get_dataset_path precedence."""
+    base = Path(datasets_dir)
+    if not base.exists():
+        return []
+    dataset_ids = sorted({
+        entry.stem
+        for entry in base.iterdir()
+        if entry.is_file() and entry.suffix.lower() in DATASET_SUFFIXES
+    })
+    return [(dataset_id, get_dataset_path(dataset_id, base)) for dataset_id in dataset_ids]
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 from pathlib import Path
 import re
 from typing import Final, Optional, Union
@@ -7,6 +8,9 @@ from typing import Final, Optional, Union
 import pandas as pd
 from fastapi import HTTPException
 
+from backend.market_data.columnar_cache import get_cache_path, read_dataframe_cache, write_dataframe_cache
+from backend.market_data.dataset_formats import COLUMNAR_SUFFIXES, get_dataset_path, read_dataset_file
+
 CANONICAL_COLUMNS: Final[list[str]] = ["timestamp", "open", "high", "low", "close", "volume"]
 REQUIRED_COLUMNS: Final[set[str]] = {"timestamp", "open", "high", "low", "close"}
 OPTIONAL_DEFAULTS: Final[dict[str, float]] = {"volume": 0.0}
@@ -44,8 +48,8 @@ def normalize_column_name(value: str) -> str:
 def _coalesce_duplicate_columns(df: pd.DataFrame) -> pd.DataFrame:
     merged: dict[str, pd.Series] = {}
 
-    for column in df.columns:
-        series = df[column]
+    for position, column in enumerate(df.columns):
+        series = df.iloc[:, position]
         if column not in merged:
             merged[column] = series
             continue
@@ -77,7 +81,8 @@ def _parse_timestamps(series: pd.Series) -> pd.Series:
             detail=f"Invalid timestamp values found in CSV at rows: {bad_rows}",
         )
 
-    return parsed
+    # Fixed resolution so fresh parses and columnar-cache reads compare equal.
+    return parsed.dt.as_unit("ns")
 
 
 def _coerce_numeric(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
@@ -95,38 +100,88 @@ def _coerce_numeric(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
     return result
 
 
-def normalize_dataset_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    normalized = df.copy()
-    normalized.columns = [normalize_column_name(column) for column in normalized.columns]
-    normalized = _coalesce_duplicate_columns(normalized)
-
-    missing = REQUIRED_COLUMNS - set(normalized.columns)
+def validate_dataset_columns(columns) -> None:
+    normalized = {normalize_column_name(column) for column in columns}
+    missing = REQUIRED_COLUMNS - normalized
     if missing:
         raise HTTPException(
             status_code=400,
             detail=f"Missing required columns: {sorted(missing)}",
         )
 
+
+def normalize_dataset_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Column aliasing, numeric coercion and timestamp parsing, row by row in the
+    original order. Used directly by chunked ingest, where ordering is checked
+    across chunk boundaries rather than re-sorted per chunk.
+    """
+    normalized = df.copy()
+    normalized.columns = [normalize_column_name(column) for column in normalized.columns]
+    normalized = _coalesce_duplicate_columns(normalized)
+    validate_dataset_columns(normalized.columns)
+
     for column, default in OPTIONAL_DEFAULTS.items():
         if column not in normalized.columns:
             normalized[column] = default
 
     normalized = normalized[[column for column in CANONICAL_COLUMNS if column in normalized.columns]].copy()
-    normalized = _coerce_numeric(normalized, ["open", "high", "low", "close", "volume"])
+    price_columns = ["open", "high", "low", "close", "volume"]
+    # Always float64 so fresh parses, the columnar cache and shared arrays agree.
+    normalized = _coerce_numeric(normalized, price_columns).astype({column: "float64" for column in price_columns})
     normalized["timestamp"] = _parse_timestamps(normalized["timestamp"])
-    normalized = normalized.sort_values("timestamp").drop_duplicates(subset=["timestamp"], keep="last").reset_index(drop=True)
-
     return normalized[CANONICAL_COLUMNS]
 
 
+def sort_dataset_rows(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("timestamp", kind="stable").drop_duplicates(subset=["timestamp"], keep="last").reset_index(drop=True)
+
+
+def normalize_dataset_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    return sort_dataset_rows(normalize_dataset_rows(df))[CANONICAL_COLUMNS]
+
+
 def get_dataset_csv_path(dataset_id: str, datasets_dir: Union[str, Path]) -> Path:
     return Path(datasets_dir) / f"{dataset_id}.csv"
 
 
-def load_dataset_dataframe(dataset_id: str, datasets_dir: Union[str, Path]) -> pd.DataFrame:
-    csv_path = get_dataset_csv_path(dataset_id, datasets_dir)
-    if not csv_path.exists():
+def load_dataset_dataframe(
+    dataset_id: str,
+    datasets_dir: Union[str, Path],
+    start: Optional[pd.Timestamp] = None,
+    end: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+    Normalized dataset, optionally restricted to ``start <= timestamp < end``.
+
+    CSV datasets go through the columnar cache; Parquet/Feather datasets are
+    read natively with column projection and, where possible, row-group pruning.
+    """
+    path = get_dataset_path(dataset_id, datasets_dir)
+    if not path.exists():
         raise FileNotFoundError(f"Dataset {dataset_id} not found")
 
-    raw_df = pd.read_csv(csv_path)
-    return normalize_dataset_dataframe(raw_df)
+    if path.suffix.lower() in COLUMNAR_SUFFIXES:
+        raw_df = read_dataset_file(path, normalize_column_name, CANONICAL_COLUMNS, start=start, end=end)
+        return _slice_time_range(normalize_dataset_dataframe(raw_df), start, end)
+
+    cache_path = get_cache_path(dataset_id, datasets_dir)
+    normalized = read_dataframe_cache(cache_path, path)
+    if normalized is None:
+        normalized = normalize_dataset_dataframe(read_dataset_file(path, normalize_column_name, CANONICAL_COLUMNS))
+        with contextlib.suppress(OSError):
+            write_dataframe_cache(normalized, cache_path)
+    return _slice_time_range(normalized, start, end)
+
+
+def _slice_time_range(
+    df: pd.DataFrame,
+    start: Optional[pd.Timestamp],
+    end: Optional[pd.Timestamp],
+) -> pd.DataFrame:
+    if start is None and end is None:
+        return df
+    timestamps = df["timestamp"]
+    lo = 0 if start is None else int(timestamps.searchsorted(start, side="left"))
+    hi = len(df) if end is None else int(timestamps.searchsorted(end, side="left"))
+    return df.iloc[lo:hi].reset_index(drop=True)
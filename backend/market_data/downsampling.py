@@ -0,0 +1,169 @@
+"""
+downsampling.py
+---------------
+Server-side reduction of chart payloads to roughly one point per screen pixel.
+
+Candles are aggregated OHLC-aware (first open, max high, min low, last close,
+summed volume, labelled with the first bar's time). Indicator lines are decimated
+either with Largest-Triangle-Three-Buckets (shape preserving) or min-max
+(extreme preserving).
+"""
+from __future__ import annotations
+
+from typing import Final, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.market_data.candle_array import CandleArray
+
+MIN_POINTS: Final[int] = 3
+LINE_METHODS: Final[set[str]] = {"lttb", "minmax"}
+
+
+def _bucket_starts(n: int, max_points: int) -> np.ndarray:
+    return np.unique(np.linspace(0, n, max_points + 1).astype("int64")[:-1])
+
+
+def needs_downsampling(n: int, max_points: Optional[int]) -> bool:
+    return max_points is not None and int(max_points) >= MIN_POINTS and n > int(max_points)
+
+
+def aggregate_ohlc(
+    time: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    max_points: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    n = len(time)
+    if not needs_downsampling(n, max_points):
+        return time, open_, high, low, close, volume
+
+    starts = _bucket_starts(n, int(max_points))
+    ends = np.append(starts[1:], n) - 1
+    return (
+        time[starts],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(volume, starts),
+    )
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices selected by Largest-Triangle-Three-Buckets, always keeping both endpoints."""
+    n = len(x)
+    if not needs_downsampling(n, max_points):
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    edges = np.linspace(1, n - 1, int(max_points) - 1).astype("int64")
+
+    selected = np.empty(int(max_points), dtype="int64")
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for bucket in range(len(edges) - 1):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_lo, next_hi = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[bucket + 1] = a
+
+    return selected
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Indices of the minimum and maximum of each bucket (two points per bucket)."""
+    n = len(y)
+    if not needs_downsampling(n, max_points):
+        return np.arange(n)
+
+    n_buckets = max(1, int(max_points) // 2)
+    width = -(-n // n_buckets)
+    padded = np.full(n_buckets * width, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(n_buckets, width)
+    valid = ~np.all(np.isnan(grid), axis=1)
+
+    offsets = np.arange(n_buckets)[valid] * width
+    lows = offsets + np.nanargmin(grid[valid], axis=1)
+    highs = offsets + np.nanargmax(grid[valid], axis=1)
+    return np.unique(np.concatenate([lows, highs]))
+
+
+def decimate_line(x: np.ndarray, y: np.ndarray, max_points: Optional[int], method: str = "lttb") -> np.ndarray:
+    if max_points is None or not needs_downsampling(len(x), max_points):
+        return np.arange(len(x))
+    if method not in LINE_METHODS:
+        raise ValueError(f"Unsupported decimation method: {method}. Expected one of: {sorted(LINE_METHODS)}")
+    if method == "minmax":
+        return minmax_indices(y, int(max_points))
+    return lttb_indices(x, y, int(max_points))
+
+
+def downsample_dataframe(df: pd.DataFrame, max_points: Optional[int], time_column: str = "timestamp") -> pd.DataFrame:
+    if max_points is None or not needs_downsampling(len(df), max_points):
+        return df
+
+    time, open_, high, low, close, volume = aggregate_ohlc(
+        df[time_column].to_numpy(),
+        df["open"].to_numpy(dtype="float64"),
+        df["high"].to_numpy(dtype="float64"),
+        df["low"].to_numpy(dtype="float64"),
+        df["close"].to_numpy(dtype="float64"),
+        df["volume"].to_numpy(dtype="float64"),
+        int(max_points),
+    )
+    return pd.DataFrame({
+        time_column: time,
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    })
+
+
+def downsample_candles(candles: Union[CandleArray, Sequence[dict]], max_points: Optional[int]) -> list[dict]:
+    if isinstance(candles, CandleArray):
+        if max_points is not None and needs_downsampling(len(candles), max_points):
+            candles = CandleArray(*aggregate_ohlc(
+                candles.time, candles.open, candles.high, candles.low, candles.close, candles.volume, int(max_points),
+            ))
+        return candles.to_candles()
+    if max_points is None or not needs_downsampling(len(candles), max_points):
+        return list(candles)
+
+    frame = pd.DataFrame(list(candles), columns=["time", "open", "high", "low", "close", "volume"])
+    frame["volume"] = frame["volume"].fillna(0.0)
+    reduced = downsample_dataframe(frame, max_points, time_column="time")
+    return [
+        {
+            "time": int(time),
+            "open": float(open_),
+            "high": float(high),
+            "low": float(low),
+            "close": float(close),
+            "volume": float(volume),
+        }
+        for time, open_, high, low, close, volume in zip(
+            reduced["time"].to_numpy(),
+            reduced["open"].to_numpy(),
+            reduced["high"].to_numpy(),
+            reduced["low"].to_numpy(),
+            reduced["close"].to_numpy(),
+            reduced["volume"].to_numpy(),
+        )
+    ]
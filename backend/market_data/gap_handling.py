@@ -1,63 +1,119 @@
 from __future__ import annotations
 
-from typing import Final, List
+from concurrent.futures import Executor
+from typing import Final, List, Optional, Sequence, Union
 
+import numpy as np
+
+from backend.market_data.candle_array import CandleArray
 from bot.strategy_engine import generate_trades, generate_trades_and_setups
 
 EXPECTED_STEP_SECONDS: Final[int] = 300
 
-def split_candles_on_gaps(candles: List[dict], *, expected_step_seconds: int = EXPECTED_STEP_SECONDS) -> List[List[dict]]:
-    if not candles:
-        return []
+Candles = Union[List[dict], CandleArray]
+
+
+def gap_segment_bounds(times: np.ndarray, *, expected_step_seconds: int = EXPECTED_STEP_SECONDS) -> np.ndarray:
+    """
+    (start, stop) row ranges of the continuous segments of a time column, shape (k, 2).
+
+    A new segment starts wherever consecutive times are more than ``expected_step_seconds``
+    apart. NaN times (unparseable values) never split a segment.
+    """
+    n = len(times)
+    if n == 0:
+        return np.empty((0, 2), dtype="int64")
+    with np.errstate(invalid="ignore"):
+        breaks = np.flatnonzero(np.diff(times) > int(expected_step_seconds)) + 1
+    starts = np.concatenate(([0], breaks))
+    stops = np.append(breaks, n)
+    return np.column_stack((starts, stops)).astype("int64")
+
 
-    segments: list[list[dict]] = []
-    start = 0
-    for i in range(1, len(candles)):
+def _candle_times(candles: Sequence[dict]) -> np.ndarray:
+    try:
+        return np.fromiter((int(c["time"]) for c in candles), dtype="int64", count=len(candles))
+    except (KeyError, TypeError, ValueError):
+        pass
+
+    # Candle validation should guarantee valid times, but keep the split deterministic.
+    times = np.full(len(candles), np.nan)
+    for i, candle in enumerate(candles):
         try:
-            prev_time = int(candles[i - 1]["time"])
-            curr_time = int(candles[i]["time"])
+            times[i] = int(candle["time"])
         except Exception:
-            # Candle validation should guarantee this, but keep the split deterministic.
             continue
+    return times
+
+
+def split_candles_on_gaps(candles: Candles, *, expected_step_seconds: int = EXPECTED_STEP_SECONDS) -> List[Candles]:
+    if len(candles) == 0:
+        return []
+    times = candles.time if isinstance(candles, CandleArray) else _candle_times(candles)
+    bounds = gap_segment_bounds(times, expected_step_seconds=expected_step_seconds)
+    return [candles[start:stop] for start, stop in bounds.tolist()]
 
-        if curr_time - prev_time > int(expected_step_seconds):
-            seg = candles[start:i]
-            if seg:
-                segments.append(seg)
-            start = i
 
-    tail = candles[start:]
-    if tail:
-        segments.append(tail)
-    return segments
+def _engine_segments(candles: Candles, expected_step_seconds: int) -> List[Candles]:
+    # The engine runs on arrays; converting once makes every segment a zero-copy view.
+    if not isinstance(candles, CandleArray):
+        try:
+            candles = CandleArray.from_candles(candles)
+        except (KeyError, TypeError, ValueError):
+            pass
+    return split_candles_on_gaps(candles, expected_step_seconds=expected_step_seconds)
 
 
-def generate_trades_with_gap_resets(candles: List[dict], *, expected_step_seconds: int = EXPECTED_STEP_SECONDS) -> List[dict]:
+def generate_trades_with_gap_resets(
+    candles: Candles,
+    *,
+    expected_step_seconds: int = EXPECTED_STEP_SECONDS,
+    executor: Optional[Executor] = None,
+) -> List[dict]:
     """
     Runs the locked strategy engine while ensuring trades do not span time gaps.
 
     When a gap (> expected_step_seconds) is detected between consecutive candles, strategy state is reset by
     splitting the candle stream into continuous segments and running the engine independently per segment.
+    Segments are independent, so an ``executor`` (e.g. a ProcessPoolExecutor) may run them concurrently.
     """
+    segments = _engine_segments(candles, expected_step_seconds)
+    if executor:
+        runs = executor.map(generate_trades, segments, chunksize=_chunksize(len(segments)))
+    else:
+        runs = map(generate_trades, segments)
     trades: list[dict] = []
-    for segment in split_candles_on_gaps(candles, expected_step_seconds=expected_step_seconds):
-        trades.extend(generate_trades(segment))
+    for seg_trades in runs:
+        trades.extend(seg_trades)
     return trades
 
 
 def generate_trades_and_setups_with_gap_resets(
-    candles: List[dict], *, expected_step_seconds: int = EXPECTED_STEP_SECONDS
+    candles: Candles,
+    *,
+    expected_step_seconds: int = EXPECTED_STEP_SECONDS,
+    executor: Optional[Executor] = None,
 ) -> tuple[List[dict], List[dict]]:
     """
     Runs the locked strategy engine while ensuring trades and setups do not span time gaps.
 
     When a gap (> expected_step_seconds) is detected between consecutive candles, strategy state is reset by
     splitting the candle stream into continuous segments and running the engine independently per segment.
+    Segments are independent, so an ``executor`` (e.g. a ProcessPoolExecutor) may run them concurrently.
     """
+    segments = _engine_segments(candles, expected_step_seconds)
+    if executor:
+        runs = executor.map(generate_trades_and_setups, segments, chunksize=_chunksize(len(segments)))
+    else:
+        runs = map(generate_trades_and_setups, segments)
     trades: list[dict] = []
     setups: list[dict] = []
-    for segment in split_candles_on_gaps(candles, expected_step_seconds=expected_step_seconds):
-        seg_trades, seg_setups = generate_trades_and_setups(segment)
+    for seg_trades, seg_setups in runs:
         trades.extend(seg_trades)
         setups.extend(seg_setups)
     return trades, setups
+
+
+def _chunksize(n_segments: int) -> int:
+    # Segments are small; batch them so per-task pickling doesn't dominate.
+    return max(1, n_segments // 32)
@@ -7,6 +7,11 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Final, List, Optional, Union
 
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
 EXPECTED_COLUMNS: Final[list[str]] = ["timestamp", "open", "high", "low", "close", "volume"]
 _PATTERN_ALERT_COLUMN: Final[str] = "pattern alert"
 _TIMESTAMP_ALIASES: Final[tuple[str, ...]] = ("timestamp", "time", "date", "datetime")
@@ -81,12 +86,140 @@ def resolve_latest_csv(data_dir: Path, prefix: str) -> Path:
     return max(files, key=lambda p: (p.stat().st_mtime, p.name))
 
 
-def load_candles_from_csv_path(csv_path: Path) -> List[dict]:
-    if not csv_path.exists():
-        raise FileNotFoundError(f"CSV not found: {csv_path}")
-    if not csv_path.is_file():
-        raise CandleCSVError(f"Expected a file but found: {csv_path}")
+def _resolve_columns(header: list[str], csv_path: Path) -> tuple[int, list[int], Optional[int]]:
+    """Header validation shared by both parsers: (timestamp index, OHLCV indices, pattern alert index)."""
+    header_norm = [_normalize_header(c) for c in header]
+    positions: dict[str, list[int]] = {}
+    for idx, name in enumerate(header_norm):
+        positions.setdefault(name, []).append(idx)
+
+    ts_candidates: list[tuple[str, int]] = []
+    for name in _TIMESTAMP_ALIASES:
+        idxs = positions.get(name, [])
+        if len(idxs) > 1:
+            raise CandleCSVError(f"Duplicate '{name}' column in {csv_path}")
+        if idxs:
+            ts_candidates.append((name, idxs[0]))
+
+    if not ts_candidates:
+        raise CandleCSVError(
+            f"Missing required timestamp column in {csv_path}. Expected one of: {list(_TIMESTAMP_ALIASES)}"
+        )
+    if len(ts_candidates) > 1:
+        found = [n for n, _ in ts_candidates]
+        raise CandleCSVError(
+            f"Multiple timestamp columns in {csv_path}: {found}. Keep only one of: {list(_TIMESTAMP_ALIASES)}"
+        )
+    ts_idx = ts_candidates[0][1]
+
+    required_non_ts = ["open", "high", "low", "close", "volume"]
+    missing = [c for c in required_non_ts if c not in positions]
+    if missing:
+        raise CandleCSVError(
+            f"Missing required columns in {csv_path}: {missing}. Required: {['timestamp', *required_non_ts]}"
+        )
+
+    duplicates = [c for c in required_non_ts if len(positions.get(c, [])) > 1]
+    if duplicates:
+        raise CandleCSVError(f"Duplicate required columns in {csv_path}: {duplicates}")
+
+    pattern_positions = positions.get(_PATTERN_ALERT_COLUMN, [])
+    if len(pattern_positions) > 1:
+        raise CandleCSVError(f"Duplicate '{_PATTERN_ALERT_COLUMN}' column in {csv_path}")
+    pattern_idx = pattern_positions[0] if pattern_positions else None
+
+    return ts_idx, [positions[name][0] for name in required_non_ts], pattern_idx
+
+
+def _vectorized_timestamps(values: pa.ChunkedArray) -> Optional[np.ndarray]:
+    """Same conversion as _parse_timestamp applied to a whole column; None if any value would fail."""
+    try:
+        numeric = pc.cast(values, pa.float64()).to_numpy(zero_copy_only=False)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        try:
+            return np.fromiter((_parse_timestamp(v) for v in values.to_pylist()), dtype="int64", count=len(values))
+        except Exception:
+            return None
+
+    if not np.isfinite(numeric).all():
+        return None
+    seconds = np.where(numeric > 1e12, numeric / 1000.0, numeric)
+    return np.trunc(seconds).astype("int64")
+
+
+def _vectorized_pattern_alerts(values: pa.ChunkedArray) -> list:
+    """_parse_pattern_alert per distinct raw value rather than per row."""
+    encoded = pc.dictionary_encode(values).combine_chunks()
+    parsed = [_parse_pattern_alert(v.strip()) for v in encoded.dictionary.to_pylist()]
+    lookup = np.array([*parsed, None], dtype=object)  # last slot: empty cells
+    codes = encoded.indices.fill_null(len(parsed)).to_numpy(zero_copy_only=False)
+    return lookup[codes].tolist()
+
+
+def _load_candles_vectorized(csv_path: Path) -> Optional[List[dict]]:
+    """
+    Column-at-a-time parse of a well-formed file. Returns None as soon as anything
+    would fail validation (or merely looks unusual, e.g. blank or short rows),
+    leaving the row-by-row parser to produce the exact error for that line. Header
+    errors are raised directly since both parsers share _resolve_columns.
+    """
+    try:
+        with csv_path.open("r", encoding="utf-8", newline="") as f:
+            header = next(csv.reader(f), None)
+    except Exception:
+        return None
+    if header is None:
+        return None
+
+    ts_idx, ohlcv_idx, pattern_idx = _resolve_columns(header, csv_path)
+    names = [str(idx) for idx in range(len(header))]
+    string_columns = [ts_idx] if pattern_idx is None else [ts_idx, pattern_idx]
+
+    try:
+        # Arrow's float parsing is correctly rounded, i.e. identical to float() on valid input;
+        # only empty cells count as missing so anything else odd fails the numeric type check.
+        table = pa_csv.read_csv(
+            csv_path,
+            read_options=pa_csv.ReadOptions(skip_rows=1, column_names=names, encoding="utf8"),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=[names[idx] for idx in sorted({*string_columns, *ohlcv_idx})],
+                column_types={names[idx]: pa.string() for idx in string_columns},
+                null_values=[""],
+                strings_can_be_null=True,
+            ),
+        )
+    except Exception:
+        return None
+    if table.num_rows == 0:
+        return None
+
+    columns = {idx: table.column(names[idx]) for idx in (*string_columns, *ohlcv_idx)}
+    if not all(pa.types.is_integer(columns[idx].type) or pa.types.is_floating(columns[idx].type) for idx in ohlcv_idx):
+        return None
+    try:
+        ohlcv = [pc.cast(columns[idx], pa.float64()).to_numpy(zero_copy_only=False) for idx in ohlcv_idx]
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None  # e.g. an integer above 2**53, which the safe cast refuses to round
+    if not all(np.isfinite(values).all() for values in ohlcv):
+        return None  # also catches empty cells, which read as NaN
+
+    times = _vectorized_timestamps(columns[ts_idx])
+    if times is None or (len(times) > 1 and not (np.diff(times) > 0).all()):
+        return None
+
+    if pattern_idx is None:
+        pattern_alerts: list = [None] * table.num_rows
+    else:
+        pattern_alerts = _vectorized_pattern_alerts(columns[pattern_idx])
+
+    opens, highs, lows, closes, volumes = (values.tolist() for values in ohlcv)
+    return [
+        {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v, "pattern_alert": pa_}
+        for t, o, h, l, c, v, pa_ in zip(times.tolist(), opens, highs, lows, closes, volumes, pattern_alerts)
+    ]
+
 
+def _load_candles_rowwise(csv_path: Path) -> List[dict]:
     candles: list[dict] = []
     prev_ts: Optional[int] = None
 
@@ -98,52 +231,7 @@ def load_candles_from_csv_path(csv_path: Path) -> List[dict]:
             except StopIteration:
                 raise CandleCSVError(f"CSV is empty: {csv_path}")
 
-            header_norm = [_normalize_header(c) for c in header]
-            positions: dict[str, list[int]] = {}
-            for idx, name in enumerate(header_norm):
-                positions.setdefault(name, []).append(idx)
-
-            ts_candidates: list[tuple[str, int]] = []
-            for name in _TIMESTAMP_ALIASES:
-                idxs = positions.get(name, [])
-                if len(idxs) > 1:
-                    raise CandleCSVError(f"Duplicate '{name}' column in {csv_path}")
-                if idxs:
-                    ts_candidates.append((name, idxs[0]))
-
-            if not ts_candidates:
-                raise CandleCSVError(
-                    f"Missing required timestamp column in {csv_path}. Expected one of: {list(_TIMESTAMP_ALIASES)}"
-                )
-            if len(ts_candidates) > 1:
-                found = [n for n, _ in ts_candidates]
-                raise CandleCSVError(
-                    f"Multiple timestamp columns in {csv_path}: {found}. Keep only one of: {list(_TIMESTAMP_ALIASES)}"
-                )
-            ts_idx = ts_candidates[0][1]
-
-            required_non_ts = ["open", "high", "low", "close", "volume"]
-            missing = [c for c in required_non_ts if c not in positions]
-            if missing:
-                raise CandleCSVError(
-                    f"Missing required columns in {csv_path}: {missing}. Required: {['timestamp', *required_non_ts]}"
-                )
-
-            duplicates = [c for c in required_non_ts if len(positions.get(c, [])) > 1]
-            if duplicates:
-                raise CandleCSVError(f"Duplicate required columns in {csv_path}: {duplicates}")
-
-            pattern_positions = positions.get(_PATTERN_ALERT_COLUMN, [])
-            if len(pattern_positions) > 1:
-                raise CandleCSVError(f"Duplicate '{_PATTERN_ALERT_COLUMN}' column in {csv_path}")
-            pattern_idx = pattern_positions[0] if pattern_positions else None
-
-            idx_map = {name: positions[name][0] for name in required_non_ts}
-            o_idx = idx_map["open"]
-            h_idx = idx_map["high"]
-            l_idx = idx_map["low"]
-            c_idx = idx_map["close"]
-            v_idx = idx_map["volume"]
+            ts_idx, (o_idx, h_idx, l_idx, c_idx, v_idx), pattern_idx = _resolve_columns(header, csv_path)
 
             for line_no, row in enumerate(reader, start=2):
                 if not row or not any(str(cell or "").strip() for cell in row):
@@ -218,6 +306,18 @@ def load_candles_from_csv_path(csv_path: Path) -> List[dict]:
     return candles
 
 
+def load_candles_from_csv_path(csv_path: Path) -> List[dict]:
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+    if not csv_path.is_file():
+        raise CandleCSVError(f"Expected a file but found: {csv_path}")
+
+    candles = _load_candles_vectorized(csv_path)
+    if candles is not None:
+        return candles
+    return _load_candles_rowwise(csv_path)
+
+
 def load_candles(market: str, pair: str) -> List[dict]:
     market_norm = str(market or "").strip().lower()
     if market_norm not in ALLOWED_MARKETS:
@@ -0,0 +1,140 @@
+"""
+multi_timeframe.py
+------------------
+Higher-timeframe series aligned onto a strategy's base bars (Pine's ``request.security``).
+
+A ``TimeframeContext`` loads each requested timeframe once, through the candle store
+when the dataset is known (so it reuses the resample cache instead of reading the
+file again) or by resampling the base frame otherwise. Every base bar then sees the
+last higher-timeframe bar that had *closed* by the base bar's own close: a 1h bar
+labelled 10:00 becomes visible on the 5m bar labelled 10:55 and never earlier, so
+strategies cannot look ahead.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from backend.market_data.csv_dataset_loader import (
+    TIMEFRAME_RULES,
+    load_dataset_frame,
+    resample_dataset_dataframe,
+    timestamps_to_epoch_seconds,
+)
+
+TIMEFRAME_SECONDS: Dict[str, int] = {
+    timeframe: int(pd.Timedelta(rule).total_seconds()) for timeframe, rule in TIMEFRAME_RULES.items()
+}
+
+
+def normalize_timeframe(timeframe: str) -> str:
+    normalized = str(timeframe or "").strip().lower()
+    if normalized not in TIMEFRAME_SECONDS:
+        raise ValueError(f"Unsupported timeframe: {timeframe}. Expected one of: {', '.join(TIMEFRAME_SECONDS)}")
+    return normalized
+
+
+def _epoch_seconds(df: pd.DataFrame) -> np.ndarray:
+    if "time" in df.columns:
+        return pd.to_numeric(df["time"]).to_numpy(dtype="int64")
+    return timestamps_to_epoch_seconds(df["timestamp"])
+
+
+def _bar_seconds(times: np.ndarray) -> int:
+    """Nominal bar length: the most common spacing between consecutive bars."""
+    if len(times) < 2:
+        return 0
+    steps, counts = np.unique(np.diff(times), return_counts=True)
+    return int(steps[np.argmax(counts)])
+
+
+class TimeframeContext:
+    """Higher-timeframe frames for one base series, plus their forward-fill positions."""
+
+    def __init__(
+        self, base_time: np.ndarray, loader: Callable[[str], pd.DataFrame], symbol: Optional[str] = None,
+    ):
+        self.base_time = np.asarray(base_time, dtype="int64")
+        self.symbol = symbol   # dataset id when known; request.security may name it explicitly
+        self.base_seconds = _bar_seconds(self.base_time)
+        self._loader = loader
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._positions: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def for_dataset(
+        cls, base_time: np.ndarray, dataset_id: str, datasets_dir: Union[str, Path],
+    ) -> "TimeframeContext":
+        """Higher timeframes of a stored dataset, served from the candle store's resample cache."""
+        return cls(
+            base_time, lambda timeframe: load_dataset_frame(dataset_id, datasets_dir, timeframe=timeframe), dataset_id,
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "TimeframeContext":
+        """Higher timeframes resampled from the base frame itself (``time`` in epoch seconds)."""
+        base_time = _epoch_seconds(df)
+        canonical: Dict[str, pd.DataFrame] = {}
+
+        def load(timeframe: str) -> pd.DataFrame:
+            if "frame" not in canonical:
+                canonical["frame"] = pd.DataFrame({
+                    "timestamp": pd.to_datetime(base_time, unit="s", utc=True),
+                    **{column: df[column].to_numpy(dtype="float64") for column in ("open", "high", "low", "close")},
+                    "volume": df["volume"].to_numpy(dtype="float64") if "volume" in df.columns else 0.0,
+                })
+            return resample_dataset_dataframe(canonical["frame"], timeframe)
+
+        return cls(base_time, load)
+
+    def frame(self, timeframe: str) -> pd.DataFrame:
+        """Bars of ``timeframe`` with ``time`` (epoch seconds of the bar start) and OHLCV, 0-indexed."""
+        timeframe = normalize_timeframe(timeframe)
+        if timeframe not in self._frames:
+            loaded = self._loader(timeframe)
+            frame = pd.DataFrame({
+                "time": _epoch_seconds(loaded),
+                **{column: loaded[column].to_numpy(dtype="float64") for column in ("open", "high", "low", "close", "volume")},
+            })
+            self._frames[timeframe] = frame
+        return self._frames[timeframe]
+
+    def positions(self, timeframe: str) -> np.ndarray:
+        """Per base bar, the row in ``frame(timeframe)`` of the last bar closed by then (-1 if none)."""
+        timeframe = normalize_timeframe(timeframe)
+        if timeframe not in self._positions:
+            if TIMEFRAME_SECONDS[timeframe] < self.base_seconds:
+                raise ValueError(f"Timeframe {timeframe} is shorter than the strategy's bars")
+            closes_at = self.frame(timeframe)["time"].to_numpy() + TIMEFRAME_SECONDS[timeframe]
+            self._positions[timeframe] = (
+                np.searchsorted(closes_at, self.base_time + self.base_seconds, side="right") - 1
+            )
+        return self._positions[timeframe]
+
+    def align(self, timeframe: str, values: Union[np.ndarray, pd.Series]) -> np.ndarray:
+        """Forward-fill per-bar ``values`` of ``timeframe`` onto the base bars (NaN/False before the first close)."""
+        values = np.asarray(values)
+        positions = self.positions(timeframe)
+        known = positions >= 0
+        if values.dtype == bool:
+            aligned = np.zeros(len(positions), dtype=bool)
+        else:
+            aligned = np.full(len(positions), np.nan)
+        if len(values):
+            aligned[known] = values[positions[known]]
+        return aligned
+
+    def series(self, timeframe: str, column: str) -> np.ndarray:
+        return self.align(timeframe, self.frame(timeframe)[column].to_numpy())
+
+
+def context_for(df: pd.DataFrame, context: Optional[TimeframeContext] = None) -> TimeframeContext:
+    """``context`` when it matches ``df``'s bars, else one resampled from ``df``."""
+    if context is not None and len(context.base_time) == len(df):
+        return context
+    rebuilt = TimeframeContext.from_frame(df)
+    rebuilt.symbol = context.symbol if context is not None else None
+    return rebuilt
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import Any, Final, Optional, Sequence, Union
+
+import numpy as np
+
+from backend.market_data.candle_array import CandleArray, candle_dicts
+
+DEFAULT_PAGE_SIZE: Final[int] = 1000
+MAX_PAGE_SIZE: Final[int] = 10_000
+DEFAULT_PREFETCH_BARS: Final[int] = 200
+
+
+def is_paginated_request(
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    count: Optional[int] = None,
+    window_start: Optional[int] = None,
+    window_end: Optional[int] = None,
+) -> bool:
+    return any(value is not None for value in (before, after, count, window_start, window_end))
+
+
+def _clamp_count(count: Optional[int]) -> int:
+    if count is None:
+        return DEFAULT_PAGE_SIZE
+    value = int(count)
+    if value <= 0:
+        raise ValueError("count must be a positive integer.")
+    return min(value, MAX_PAGE_SIZE)
+
+
+def page_bounds(
+    times: np.ndarray,
+    *,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    count: Optional[int] = None,
+) -> tuple[int, int]:
+    """
+    Cursor pagination over a sorted epoch-seconds array.
+
+    - ``after`` only: the first ``count`` bars strictly after the cursor (scrolling right).
+    - ``before`` (with or without ``after``): the last ``count`` bars strictly before the
+      cursor (scrolling left).
+    - neither: the latest ``count`` bars (initial chart load).
+    """
+    size = _clamp_count(count)
+    lo = 0 if after is None else int(np.searchsorted(times, int(after), side="right"))
+    hi = len(times) if before is None else int(np.searchsorted(times, int(before), side="left"))
+    hi = max(lo, hi)
+
+    if after is not None and before is None:
+        return lo, min(hi, lo + size)
+    return max(lo, hi - size), hi
+
+
+def window_bounds(
+    times: np.ndarray,
+    *,
+    window_start: Optional[int] = None,
+    window_end: Optional[int] = None,
+    prefetch: Optional[int] = None,
+) -> tuple[int, int]:
+    """
+    Visible-window mode: every bar inside [window_start, window_end] plus ``prefetch``
+    bars on each side so the chart can scroll before it has to ask for more.
+    """
+    margin = DEFAULT_PREFETCH_BARS if prefetch is None else max(0, int(prefetch))
+    lo = 0 if window_start is None else int(np.searchsorted(times, int(window_start), side="left"))
+    hi = len(times) if window_end is None else int(np.searchsorted(times, int(window_end), side="right"))
+    hi = max(lo, hi)
+
+    if hi - lo > MAX_PAGE_SIZE:
+        hi = lo + MAX_PAGE_SIZE
+    return max(0, lo - margin), min(len(times), hi + margin)
+
+
+def resolve_bounds(
+    times: np.ndarray,
+    *,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    count: Optional[int] = None,
+    window_start: Optional[int] = None,
+    window_end: Optional[int] = None,
+    prefetch: Optional[int] = None,
+) -> tuple[int, int]:
+    if window_start is not None or window_end is not None:
+        return window_bounds(times, window_start=window_start, window_end=window_end, prefetch=prefetch)
+    return page_bounds(times, before=before, after=after, count=count)
+
+
+def build_page(candles: list[dict], lo: int, hi: int, total: int) -> dict[str, Any]:
+    return {
+        "candles": candles,
+        "total": int(total),
+        "has_more_before": lo > 0,
+        "has_more_after": hi < total,
+        "next_before": int(candles[0]["time"]) if candles and lo > 0 else None,
+        "next_after": int(candles[-1]["time"]) if candles and hi < total else None,
+    }
+
+
+def paginate_candles(
+    candles: Union[CandleArray, Sequence[dict]],
+    *,
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    count: Optional[int] = None,
+    window_start: Optional[int] = None,
+    window_end: Optional[int] = None,
+    prefetch: Optional[int] = None,
+) -> dict[str, Any]:
+    if isinstance(candles, CandleArray):
+        times = candles.time
+    else:
+        times = np.fromiter((int(candle["time"]) for candle in candles), dtype="int64", count=len(candles))
+    lo, hi = resolve_bounds(
+        times,
+        before=before,
+        after=after,
+        count=count,
+        window_start=window_start,
+        window_end=window_end,
+        prefetch=prefetch,
+    )
+    return build_page(candle_dicts(candles[lo:hi]), lo, hi, len(candles))
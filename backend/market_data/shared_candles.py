@@ -0,0 +1,99 @@
+"""
+shared_candles.py
+-----------------
+Candle arrays that can be handed to worker processes by reference.
+
+A resampled frame is written once as a structured ``.npy`` (same record layout
+as the columnar cache) and described by a small, picklable ``SharedCandles``
+handle. Workers memory-map the file read-only, so every process shares the same
+page-cache pages and the per-task payload is a few hundred bytes regardless of
+how many bars the dataset has.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from backend.market_data.candle_array import CandleArray
+from backend.market_data.columnar_cache import (
+    CANDLE_RECORD_DTYPE,
+    dataframe_to_records,
+    get_cache_dir,
+    is_cache_fresh,
+    write_records,
+)
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class SharedCandles:
+    """Reference to a memory-mapped candle file; cheap to pickle."""
+
+    path: str
+    rows: int
+    mtime_ns: int
+
+    def records(self) -> np.ndarray:
+        """Read-only structured view over the mapped file (zero-copy)."""
+        return _open_memmap(self.path, self.mtime_ns)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """Zero-copy per-field views: ``timestamp`` (epoch nanoseconds, int64) plus OHLCV."""
+        records = self.records()
+        views = {"timestamp": records["timestamp"]}
+        views.update({field: records[field] for field in PRICE_FIELDS})
+        return views
+
+    def candles(self) -> CandleArray:
+        """CandleArray over the mapped prices; only the epoch-seconds time column is copied."""
+        records = self.records()
+        return CandleArray(records["timestamp"] // 1_000_000_000, *(records[field] for field in PRICE_FIELDS))
+
+    def frame(self) -> pd.DataFrame:
+        """
+        DataFrame with the canonical columns for code that needs one (e.g.
+        run_strategy). Price columns are built without copying where pandas
+        allows; the timestamp column is materialized as datetime64[ns, UTC].
+        """
+        records = self.records()
+        data = {"timestamp": pd.to_datetime(records["timestamp"], unit="ns", utc=True)}
+        data.update({field: pd.Series(records[field], copy=False) for field in PRICE_FIELDS})
+        return pd.DataFrame(data, copy=False)
+
+
+@lru_cache(maxsize=32)
+def _open_memmap(path: str, mtime_ns: int) -> np.ndarray:
+    # mtime_ns is part of the cache key so a rewritten file is re-mapped.
+    records = np.load(path, mmap_mode="r", allow_pickle=False)
+    if records.dtype != CANDLE_RECORD_DTYPE:
+        raise ValueError(f"{path} is not a candle record file")
+    return records
+
+
+def get_shared_path(dataset_id: str, timeframe: str, datasets_dir: Union[str, Path]) -> Path:
+    return get_cache_dir(datasets_dir) / f"{dataset_id}@{(timeframe or '1m').lower()}.npy"
+
+
+def share_dataframe(df: pd.DataFrame, path: Path, source_path: Union[str, Path, None] = None) -> SharedCandles:
+    """
+    Write ``df`` (canonical candle columns) to ``path`` unless an up-to-date copy
+    already exists, and return a handle to it. ``source_path`` is the file the
+    frame was derived from; the shared copy is rewritten once it is newer.
+    """
+    path = Path(path)
+    if source_path is None or not is_cache_fresh(path, Path(source_path)):
+        write_records(dataframe_to_records(df), path)
+    return open_shared(path)
+
+
+def open_shared(path: Union[str, Path]) -> SharedCandles:
+    """Handle to an already written shared candle file."""
+    path = Path(path)
+    mtime_ns = path.stat().st_mtime_ns
+    return SharedCandles(path=str(path), rows=int(len(_open_memmap(str(path), mtime_ns))), mtime_ns=mtime_ns)
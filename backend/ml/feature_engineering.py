@@ -0,0 +1,243 @@
+"""
+Feature Store
+Computes the bar-level features shared by the ML modules (regime detection, trade
+scoring, strategy insights) once per candle series and serves named projections of them.
+
+Every feature is computed for every bar; warm-up bars are NaN and each consumer decides
+whether to drop or fill them. The matrix is cached per candle series, keyed by a
+fingerprint of its OHLCV columns — the same candles loaded for a (dataset version,
+timeframe) or posted back by the UI map to the same entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+
+# ── Indicator helpers ────────────────────────────────────────────────────────
+
+def _true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    prev_close = close.shift(1)
+    return pd.concat([
+        high - low,
+        (high - prev_close).abs(),
+        (low  - prev_close).abs(),
+    ], axis=1).max(axis=1)
+
+
+def _adx(high: pd.Series, low: pd.Series, atr: pd.Series, period: int = 14) -> pd.Series:
+    """Approximate ADX using directional movement."""
+    up_move   = high.diff()
+    down_move = -low.diff()
+
+    plus_dm  = np.where((up_move > down_move) & (up_move > 0), up_move,   0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+
+    plus_dm_s  = pd.Series(plus_dm,  index=high.index).rolling(period).mean()
+    minus_dm_s = pd.Series(minus_dm, index=high.index).rolling(period).mean()
+
+    atr_safe = atr.replace(0, np.nan)
+    plus_di  = 100 * plus_dm_s  / atr_safe
+    minus_di = 100 * minus_dm_s / atr_safe
+
+    dx_denom = (plus_di + minus_di).replace(0, np.nan)
+    dx = 100 * (plus_di - minus_di).abs() / dx_denom
+    return dx.rolling(period).mean()
+
+
+def rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    """RSI from simple rolling means of gains and losses (the "rsi" feature)."""
+    delta = close.diff()
+    gain  = delta.clip(lower=0).rolling(period).mean()
+    loss  = (-delta.clip(upper=0)).rolling(period).mean()
+    rs    = gain / loss.replace(0, np.nan)
+    return 100 - (100 / (1 + rs))
+
+
+def _ema(series: pd.Series, period: int) -> pd.Series:
+    return series.ewm(span=period, adjust=False).mean()
+
+
+# ── Feature definitions ──────────────────────────────────────────────────────
+
+def _ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Lower-cased, numeric OHLC(V) columns on a fresh RangeIndex."""
+    df = df.reset_index(drop=True)
+    df.columns = df.columns.str.lower()
+    out = pd.DataFrame({col: pd.to_numeric(df[col], errors="coerce") for col in PRICE_COLUMNS if col in df.columns})
+    if "volume" in df.columns:
+        out["volume"] = pd.to_numeric(df["volume"], errors="coerce")
+    return out
+
+
+def _build_features(df: pd.DataFrame) -> dict[str, pd.Series]:
+    high, low, close = df["high"], df["low"], df["close"]
+    log_returns = np.log(close / close.shift(1))
+    pct_returns = close.pct_change()
+    atr = _true_range(high, low, close).rolling(14).mean()
+
+    feat: dict[str, pd.Series] = {
+        "returns":       log_returns,
+        "momentum_1":    pct_returns,
+        "momentum_5":    close.pct_change(5),
+        "volatility_20": log_returns.rolling(20).std(),
+        "vol_20":        pct_returns.rolling(20).std(),
+        "atr_norm":      atr / close,
+        "adx":           _adx(high, low, atr, 14),
+        "rsi":           rsi(close, 14),
+        "macd":          _ema(close, 12) - _ema(close, 26),
+        "ma_slope":      close.rolling(50).mean().diff(5) / close,
+        "dist_ma20":     (close - close.rolling(20).mean()) / close,
+        "dist_ema50":    (close - _ema(close, 50)) / close,
+        "dist_ema200":   (close - _ema(close, 200)) / close,
+        # Short vs long volatility of log returns (regime) and of simple returns (scoring).
+        "vol_ratio":     log_returns.rolling(5).std() / log_returns.rolling(60).std().replace(0, np.nan),
+        "vol_ratio_pct": pct_returns.rolling(5).std() / pct_returns.rolling(60).std().replace(0, np.nan),
+    }
+
+    if "volume" in df.columns:
+        vol = df["volume"]
+        feat["volume_change"] = vol.pct_change().clip(-5, 5)
+        feat["volume_spike"]  = vol / vol.rolling(20).mean().replace(0, np.nan)
+    else:
+        feat["volume_change"] = pd.Series(0.0, index=df.index)
+        feat["volume_spike"]  = pd.Series(1.0, index=df.index)
+    return feat
+
+
+FEATURE_NAMES: tuple[str, ...] = (
+    "returns", "momentum_1", "momentum_5", "volatility_20", "vol_20", "atr_norm", "adx", "rsi", "macd",
+    "ma_slope", "dist_ma20", "dist_ema50", "dist_ema200", "vol_ratio", "vol_ratio_pct",
+    "volume_change", "volume_spike",
+)
+
+
+class FeatureMatrix:
+    """Read-only (bars × features) float64 matrix stored column by column."""
+
+    __slots__ = ("names", "values", "_positions")
+
+    def __init__(self, names: Sequence[str], values: np.ndarray):
+        self.names = tuple(names)
+        self.values = np.asfortranarray(values, dtype="float64")
+        self.values.setflags(write=False)
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[:, self._positions[name]]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes)
+
+    def select(self, names: Sequence[str]) -> np.ndarray:
+        """Columns ``names`` as a new (bars × len(names)) array."""
+        return self.values[:, [self._positions[name] for name in names]]
+
+    def frame(self, names: Sequence[str], index: Optional[pd.Index] = None) -> pd.DataFrame:
+        return pd.DataFrame(self.select(names), columns=list(names), index=index)
+
+
+def compute_features(df: pd.DataFrame) -> FeatureMatrix:
+    """Every feature in FEATURE_NAMES for the candles in ``df`` (uncached)."""
+    feat = _build_features(_ohlcv(df))
+    values = np.empty((len(df), len(FEATURE_NAMES)), dtype="float64", order="F")
+    for i, name in enumerate(FEATURE_NAMES):
+        values[:, i] = feat[name].to_numpy(dtype="float64")
+    return FeatureMatrix(FEATURE_NAMES, values)
+
+
+def candle_fingerprint(df: pd.DataFrame) -> str:
+    """Digest of the OHLCV columns that features are computed from."""
+    ohlcv = _ohlcv(df)
+    digest = hashlib.sha1(",".join(ohlcv.columns).encode())
+    for col in ohlcv.columns:
+        digest.update(np.ascontiguousarray(ohlcv[col].to_numpy(dtype="float64")).tobytes())
+    return digest.hexdigest()
+
+
+# ── Bar alignment ────────────────────────────────────────────────────────────
+
+def nearest_bars(times: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Index of the bar whose time is closest to each target, found with one binary search
+    instead of a full |times - t| scan per target. Ties resolve like np.argmin would: to
+    the first such bar in the column.
+    """
+    order  = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+    right  = np.searchsorted(sorted_times, targets, side="left").clip(0, len(times) - 1)
+    left   = (right - 1).clip(0)
+    # First bar carrying each neighbouring time.
+    left_bar  = order[np.searchsorted(sorted_times, sorted_times[left], side="left")]
+    right_bar = order[np.searchsorted(sorted_times, sorted_times[right], side="left")]
+    left_gap  = np.abs(targets - sorted_times[left])
+    right_gap = np.abs(sorted_times[right] - targets)
+    return np.where(
+        left_gap < right_gap, left_bar,
+        np.where(right_gap < left_gap, right_bar, np.minimum(left_bar, right_bar)),
+    )
+
+
+# ── Shared feature cache ─────────────────────────────────────────────────────
+
+class FeatureStore:
+    """
+    Process-wide LRU of FeatureMatrix objects keyed by candle fingerprint, so a
+    backtest followed by scoring, regime and insight requests on the same candles
+    computes the features once.
+    """
+
+    def __init__(self, max_entries: int = 16, compute: Callable[[pd.DataFrame], FeatureMatrix] = compute_features):
+        self.max_entries = int(max_entries)
+        self._compute = compute
+        self._entries: OrderedDict[str, FeatureMatrix] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, df: pd.DataFrame) -> FeatureMatrix:
+        key = candle_fingerprint(df)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        features = self._compute(df)
+
+        with self._lock:
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return features
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(f.nbytes for f in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+feature_store = FeatureStore()
@@ -0,0 +1,90 @@
+"""
+Model Registry
+Keeps fitted models (regime classifiers, scorers, ...) in a small in-process LRU and
+persists each one with joblib, so a restart reloads a model instead of retraining it.
+
+Models are stored under a name such as "regime/<dataset_id>@<timeframe>"; what makes a
+stored model stale is decided by the caller (e.g. by comparing a dataset version kept on
+the model object).
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import joblib
+
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parents[1] / "datasets" / ".cache" / "models"
+MODEL_DIR = Path(os.getenv("MODEL_CACHE_DIR", str(DEFAULT_MODEL_DIR)))
+
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9_.@=-]+")
+
+
+class ModelRegistry:
+    def __init__(self, model_dir: Union[str, Path] = MODEL_DIR, max_entries: int = 16):
+        self.model_dir = Path(model_dir)
+        self.max_entries = int(max_entries)
+        self._models: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_for(self, name: str) -> Path:
+        parts = [_UNSAFE_CHARS.sub("_", part) for part in name.split("/") if part]
+        return self.model_dir.joinpath(*parts).with_suffix(".joblib")
+
+    def get(self, name: str) -> Optional[Any]:
+        """The model stored under ``name`` from memory, else from disk, else None."""
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+
+        path = self.path_for(name)
+        if not path.exists():
+            return None
+        try:
+            model = joblib.load(path)
+        except Exception:
+            # Unreadable or written by an incompatible library version: treat as missing.
+            return None
+        self._remember(name, model)
+        return model
+
+    def put(self, name: str, model: Any, persist: bool = True) -> None:
+        """Store ``model`` under ``name``; ``persist=False`` keeps it in memory only."""
+        self._remember(name, model)
+        if not persist:
+            return
+        path = self.path_for(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")   # unique per writing thread
+        joblib.dump(model, tmp_path, compress=3)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget ``name`` (or every model) in memory and on disk."""
+        with self._lock:
+            names = list(self._models) if name is None else [name]
+            for stale in names:
+                self._models.pop(stale, None)
+        if name is None:
+            paths = self.model_dir.rglob("*.joblib") if self.model_dir.exists() else []
+        else:
+            paths = [self.path_for(name)]
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _remember(self, name: str, model: Any) -> None:
+        with self._lock:
+            self._models[name] = model
+            self._models.move_to_end(name)
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+
+
+model_registry = ModelRegistry()
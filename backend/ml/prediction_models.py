@@ -0,0 +1,352 @@
+"""
+Offline Model Training + Prediction
+Fits the regime and trade-quality models for every dataset in a process pool, off the
+request path, and stores each training run as a numbered model version on local disk.
+Request handlers only load a stored model and run inference.
+
+Layout under MODEL_DIR/offline:
+  v0003/regime/<dataset_id>@<timeframe>.joblib   RegimeModel fitted on one dataset
+  v0003/trade_quality/<config_key>.joblib        TradeScorer pooled across every dataset
+  v0003/manifest.json                            what each model was fitted on
+  manifest.json                                  copy of the current version's manifest
+
+Run a training pass with ``python -m backend.ml.prediction_models``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+from backend.backtesting.batch import default_workers, pool_context
+from backend.data_providers.data_manager import DataManager, data_manager
+from backend.market_data.dataset_metadata import list_dataset_files
+from backend.market_data.shared_candles import SharedCandles
+from backend.ml.feature_engineering import feature_store
+from backend.ml.model_registry import MODEL_DIR, ModelRegistry
+from backend.ml.regime_detection import MIN_BARS, RegimeModel, fit_regime_model
+from backend.ml.trade_scoring import (
+    TradeScorer,
+    _build_labels_from_trades,
+    apply_trade_scorer,
+    extract_features,
+    fit_trade_scorer,
+)
+from backend.strategy_engine import run_strategy
+
+OFFLINE_DIR = MODEL_DIR / "offline"
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".manifest.lock"
+KEEP_VERSIONS = 3
+
+# Strategy whose trades label the pooled trade-quality model unless a config is given.
+DEFAULT_TRADE_CONFIG: Dict[str, Any] = {"mode": "template", "strategy": "ma_crossover", "parameters": {}}
+
+_VERSION_DIR = re.compile(r"^v(\d+)$")
+
+
+class ModelNotTrainedError(LookupError):
+    """No offline model exists for the requested dataset/config."""
+
+
+def config_key(config: Optional[Dict[str, Any]] = None) -> str:
+    payload = json.dumps(config or DEFAULT_TRADE_CONFIG, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def regime_model_name(dataset_id: str, timeframe: str) -> str:
+    return f"regime/{dataset_id}@{timeframe}"
+
+
+# ── Training ─────────────────────────────────────────────────────────────────
+
+def train_dataset_job(
+    handle: SharedCandles,
+    dataset_id: str,
+    timeframe: str,
+    dataset_version: Any,
+    trade_config: Dict[str, Any],
+    version_dir: str,
+) -> Dict[str, Any]:
+    """
+    Worker entry point: fit and store the regime model for one dataset and return the
+    (features at entry, profitable?) rows its trades contribute to the pooled trade model.
+    """
+    started = time.perf_counter()
+    df = handle.candles().to_dataframe()
+    job: Dict[str, Any] = {"bars": len(df), "regime": False}
+
+    # One core per job: the pool already runs a job per core.
+    if len(df) >= MIN_BARS:
+        entry = fit_regime_model(df, dataset_version, n_jobs=1)
+        ModelRegistry(version_dir).put(regime_model_name(dataset_id, timeframe), entry)
+        job["regime"] = True
+
+    trades = run_strategy(df, dict(trade_config)).get("trades", [])
+    _positions, bar_indices, labels = _build_labels_from_trades(df, trades)
+    job["trades"] = int(len(labels))
+    job["X"] = extract_features(df, feature_store).values[bar_indices]
+    job["y"] = labels
+    job["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return job
+
+
+def train_models(
+    dataset_ids: Optional[Iterable[str]] = None,
+    timeframes: Sequence[str] = ("5m",),
+    trade_config: Optional[Dict[str, Any]] = None,
+    manager: DataManager = data_manager,
+    root: Union[str, Path] = OFFLINE_DIR,
+    pool: Optional[ProcessPoolExecutor] = None,
+    version: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Fit every model for ``dataset_ids`` (default: all datasets) × ``timeframes`` as a new
+    model version under ``root`` and make it current. Returns the version's manifest.
+    ``version`` is one already claimed with ``reserve_version``; by default a new one is.
+
+    Regime models are fitted per dataset in worker processes; the trade-quality model is
+    fitted once on the trades of every dataset, so it can score datasets it never saw.
+    A failing dataset is reported with ``status: "error"`` and does not fail the run.
+    """
+    started = time.perf_counter()
+    root = Path(root)
+    trade_config = trade_config or DEFAULT_TRADE_CONFIG
+    if dataset_ids is None:
+        dataset_ids = [dataset_id for dataset_id, _path in list_dataset_files(manager.datasets_dir)]
+
+    if version is None:
+        version = reserve_version(root)
+    version_dir = root / f"v{version:04d}"
+    version_dir.mkdir(parents=True, exist_ok=True)
+
+    own_pool = pool is None
+    pool = pool or ProcessPoolExecutor(max_workers=default_workers(), mp_context=pool_context())
+    results: List[Dict[str, Any]] = []
+    pending = []
+    try:
+        for dataset_id in dataset_ids:
+            for timeframe in timeframes:
+                entry: Dict[str, Any] = {"dataset_id": dataset_id, "timeframe": timeframe}
+                results.append(entry)
+                try:
+                    handle = manager.share_candles(dataset_id, timeframe)
+                    dataset_version = manager.dataset_version(dataset_id)
+                except FileNotFoundError:
+                    entry.update(status="error", error=f"Dataset {dataset_id} not found")
+                    continue
+                except Exception as exc:
+                    entry.update(status="error", error=f"Data fetch error: {exc}")
+                    continue
+                entry["dataset_version"] = list(dataset_version) if dataset_version else None
+                pending.append((entry, pool.submit(
+                    train_dataset_job, handle, dataset_id, timeframe, dataset_version, trade_config, str(version_dir),
+                )))
+
+        X_parts, y_parts = [], []
+        for entry, future in pending:
+            try:
+                job = future.result()
+            except Exception as exc:
+                entry.update(status="error", error=f"Training Error: {exc}")
+                continue
+            X_parts.append(job.pop("X"))
+            y_parts.append(job.pop("y"))
+            entry.update(status="ok", **job)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    key = config_key(trade_config)
+    trade_quality: Dict[str, Any] = {"config": trade_config, "trained": False}
+    y_all = np.concatenate(y_parts) if y_parts else np.empty(0, dtype="int64")
+    if len(np.unique(y_all)) >= 2:
+        scorer = fit_trade_scorer(np.concatenate(X_parts), y_all)
+        ModelRegistry(version_dir).put(f"trade_quality/{key}", scorer)
+        trade_quality.update(trained=True, rows=int(len(y_all)), win_rate=round(float(y_all.mean()), 4))
+
+    manifest = {
+        "version": version,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "regime": {
+            f"{r['dataset_id']}@{r['timeframe']}": {"dataset_version": r["dataset_version"], "bars": r["bars"]}
+            for r in results if r.get("regime")
+        },
+        "trade_quality": {key: trade_quality},
+        "jobs": results,
+    }
+    _write_json(version_dir / MANIFEST_NAME, manifest)
+    # Readers only follow the root manifest, so a version becomes visible once complete.
+    # Runs can overlap (CLI and API), so an older version finishing last must not replace it.
+    with _locked(root / LOCK_NAME):
+        current = _current_version(root)
+        if current is None or version > current:
+            _write_json(root / MANIFEST_NAME, manifest)
+            current = version
+        _prune_versions(root, keep=KEEP_VERSIONS, current=current)
+    return manifest
+
+
+def _next_version(root: Path) -> int:
+    versions = [int(m.group(1)) for p in root.glob("v*") if (m := _VERSION_DIR.match(p.name))] if root.exists() else []
+    return max(versions, default=0) + 1
+
+
+def reserve_version(root: Union[str, Path] = OFFLINE_DIR) -> int:
+    """Claim the next version number by creating its directory, so concurrent runs never share one."""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    while True:
+        version = _next_version(root)
+        try:
+            (root / f"v{version:04d}").mkdir()
+        except FileExistsError:
+            continue
+        return version
+
+
+def _prune_versions(root: Path, keep: int, current: Optional[int] = None) -> None:
+    versions = sorted((int(m.group(1)), p) for p in root.glob("v*") if (m := _VERSION_DIR.match(p.name)))
+    for version, path in versions[:-keep]:
+        if version != current:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _current_version(root: Path) -> Optional[int]:
+    try:
+        return int(json.loads((root / MANIFEST_NAME).read_text(encoding="utf-8"))["version"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+@contextlib.contextmanager
+def _locked(path: Path):
+    """Exclusive lock on ``path`` held across processes (training CLI and API server)."""
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_json(path: Path, payload: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(json.dumps(payload, indent=2, default=str), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+# ── Prediction ───────────────────────────────────────────────────────────────
+
+class OfflineModels:
+    """Read side of the offline store: follows the current manifest and loads models lazily."""
+
+    def __init__(self, root: Union[str, Path] = OFFLINE_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._manifest_mtime: Optional[int] = None
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._registry: Optional[ModelRegistry] = None
+
+    def manifest(self) -> Dict[str, Any]:
+        path = self.root / MANIFEST_NAME
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            raise ModelNotTrainedError("No offline models have been trained yet")
+        with self._lock:
+            if mtime != self._manifest_mtime:
+                manifest = json.loads(path.read_text(encoding="utf-8"))
+                self._manifest = manifest
+                self._manifest_mtime = mtime
+                self._registry = ModelRegistry(self.root / f"v{manifest['version']:04d}")
+            return self._manifest
+
+    def _load(self, name: str) -> Any:
+        self.manifest()
+        model = self._registry.get(name)
+        if model is None:
+            raise ModelNotTrainedError(f"No offline model {name}")
+        return model
+
+    def regime_model(self, dataset_id: str, timeframe: str) -> RegimeModel:
+        return self._load(regime_model_name(dataset_id, timeframe))
+
+    def regime_dataset_version(self, dataset_id: str, timeframe: str) -> Optional[tuple]:
+        trained = self.manifest()["regime"].get(f"{dataset_id}@{timeframe}")
+        if trained is None or trained["dataset_version"] is None:
+            return None
+        return tuple(trained["dataset_version"])
+
+    def trade_scorer(self, config: Optional[Dict[str, Any]] = None) -> TradeScorer:
+        return self._load(f"trade_quality/{config_key(config)}")
+
+
+offline_models = OfflineModels()
+
+
+def predict_regime(df: pd.DataFrame, dataset_id: str, timeframe: str, models: Optional[OfflineModels] = None) -> dict:
+    """detect_market_regime's output for ``df`` from the dataset's offline model, without fitting."""
+    return (models or offline_models).regime_model(dataset_id, timeframe).predict(df)
+
+
+def predict_trade_scores(
+    df: pd.DataFrame,
+    trades: List[dict],
+    config: Optional[Dict[str, Any]] = None,
+    models: Optional[OfflineModels] = None,
+) -> List[dict]:
+    """score_trades' output shape from the pooled offline trade-quality model, without fitting."""
+    return apply_trade_scorer((models or offline_models).trade_scorer(config), df, trades)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Train the offline regime and trade-quality models.")
+    parser.add_argument("--datasets", nargs="*", help="Dataset ids (default: every dataset).")
+    parser.add_argument("--timeframes", nargs="+", default=["5m"])
+    parser.add_argument("--config", help="JSON strategy config whose trades label the trade-quality model.")
+    args = parser.parse_args(argv)
+
+    manifest = train_models(
+        dataset_ids=args.datasets or None,
+        timeframes=args.timeframes,
+        trade_config=json.loads(args.config) if args.config else None,
+    )
+    failed = [job for job in manifest["jobs"] if job.get("status") != "ok"]
+    print(f"Model version v{manifest['version']:04d}: {len(manifest['regime'])} regime model(s), "
+          f"{len(failed)} failed job(s) in {manifest['elapsed_ms'] / 1000:.1f}s")
+    for job in failed:
+        print(f"  {job['dataset_id']}@{job['timeframe']}: {job['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,12 +7,19 @@ No external APIs required — fully self-contained.
 
 from __future__ import annotations
 
+import hashlib
 import warnings
+from dataclasses import dataclass, field, replace
+from typing import Hashable, Optional
+
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from backend.ml.feature_engineering import FeatureStore, candle_fingerprint, compute_features, feature_store
+from backend.ml.model_registry import ModelRegistry, model_registry
+
 warnings.filterwarnings("ignore")
 
 # ── Regime label constants ───────────────────────────────────────────────────
@@ -31,100 +38,37 @@ REGIME_ADVICE = {
     "Low Volatility": "Low-volatility periods often precede larger moves. Breakout setups may offer attractive risk/reward.",
 }
 
-# ── Feature engineering ──────────────────────────────────────────────────────
-
-def _calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    """Average True Range."""
-    high = df["high"]
-    low  = df["low"]
-    close = df["close"]
-    tr = pd.concat([
-        high - low,
-        (high - close.shift(1)).abs(),
-        (low  - close.shift(1)).abs(),
-    ], axis=1).max(axis=1)
-    return tr.rolling(period).mean()
-
-
-def _calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    """Approximate ADX using directional movement."""
-    high  = df["high"]
-    low   = df["low"]
-    close = df["close"]
-
-    atr = _calculate_atr(df, period)
-
-    up_move   = high.diff()
-    down_move = -low.diff()
-
-    plus_dm  = np.where((up_move > down_move) & (up_move > 0), up_move,   0)
-    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0)
+MIN_BARS = 80
+HISTORY_BARS = 60
 
-    plus_dm_s  = pd.Series(plus_dm,  index=df.index).rolling(period).mean()
-    minus_dm_s = pd.Series(minus_dm, index=df.index).rolling(period).mean()
+# Bars of context needed to compute every feature for one new bar (longest chain is the
+# 60-bar return std; the 50-bar MA slope needs 55).
+FEATURE_LOOKBACK = 128
 
-    atr_safe = atr.replace(0, np.nan)
-    plus_di  = 100 * plus_dm_s  / atr_safe
-    minus_di = 100 * minus_dm_s / atr_safe
+# Refit once the series has grown by this fraction since the model was trained.
+RETRAIN_GROWTH = 0.25
 
-    dx_denom = (plus_di + minus_di).replace(0, np.nan)
-    dx = 100 * (plus_di - minus_di).abs() / dx_denom
+# ── Feature engineering ──────────────────────────────────────────────────────
 
-    return dx.rolling(period).mean()
+REGIME_FEATURES = (
+    "returns",        # 1. Log returns
+    "volatility_20",  # 2. Rolling volatility (20-bar)
+    "atr_norm",       # 3. Normalised ATR
+    "adx",            # 4. ADX
+    "ma_slope",       # 5. MA slope (50-bar SMA)
+    "volume_change",  # 6. Volume change (if available, else zero)
+    "dist_ma20",      # 7. Price distance from 20-bar MA (mean-reversion signal)
+    "vol_ratio",      # 8. Volatility regime ratio: recent vs long-term vol
+)
 
 
-def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
+def engineer_features(df: pd.DataFrame, store: Optional[FeatureStore] = None) -> pd.DataFrame:
     """
-    Build the feature matrix from raw OHLCV data.
-    Returns a DataFrame aligned to the original index, NaN rows dropped.
+    Project the regime features out of the shared feature matrix (computed fresh when
+    ``store`` is None). Returns a DataFrame aligned to the original index, NaN rows dropped.
     """
-    df = df.copy()
-
-    # Normalise column names
-    df.columns = df.columns.str.lower()
-    
-    # Ensure numeric
-    for col in ["open", "high", "low", "close"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    feat = pd.DataFrame(index=df.index)
-
-    # 1. Log returns
-    feat["returns"]      = np.log(df["close"] / df["close"].shift(1))
-
-    # 2. Rolling volatility (20-bar)
-    feat["volatility_20"] = feat["returns"].rolling(20).std()
-
-    # 3. Normalised ATR
-    atr = _calculate_atr(df, 14)
-    feat["atr_norm"] = atr / df["close"]
-
-    # 4. ADX
-    feat["adx"] = _calculate_adx(df, 14)
-
-    # 5. MA slope (50-bar SMA)
-    ma50 = df["close"].rolling(50).mean()
-    feat["ma_slope"] = ma50.diff(5) / df["close"]
-
-    # 6. Volume change (if available, else zero)
-    if "volume" in df.columns:
-        vol = pd.to_numeric(df["volume"], errors="coerce")
-        feat["volume_change"] = vol.pct_change().clip(-5, 5)
-    else:
-        feat["volume_change"] = 0.0
-
-    # 7. Price distance from 20-bar MA (mean-reversion signal)
-    ma20 = df["close"].rolling(20).mean()
-    feat["dist_ma20"] = (df["close"] - ma20) / df["close"]
-
-    # 8. Volatility regime ratio: recent vs long-term vol
-    feat["vol_ratio"] = (
-        feat["returns"].rolling(5).std()
-        / feat["returns"].rolling(60).std().replace(0, np.nan)
-    )
-
-    return feat.dropna()
+    features = store.get(df) if store is not None else compute_features(df)
+    return features.frame(REGIME_FEATURES, index=df.index).dropna()
 
 
 # ── Rule-based label generation ──────────────────────────────────────────────
@@ -155,24 +99,166 @@ def generate_labels(feat: pd.DataFrame) -> pd.Series:
     return labels
 
 
+def regime_labels(df: pd.DataFrame, registry: Optional[ModelRegistry] = None) -> pd.Series:
+    """
+    Rule-based label of every featurized bar of ``df``, indexed by row position — the
+    targets the regime model is trained on. Cached per candle series.
+    """
+    registry = registry or model_registry
+    name = f"regime_labels/{candle_fingerprint(df)}"
+    labels = registry.get(name)
+    if labels is None:
+        labels = generate_labels(engineer_features(df.reset_index(drop=True), feature_store))
+        registry.put(name, labels, persist=False)
+    return labels
+
+
 # ── Model training + prediction ──────────────────────────────────────────────
 
-def _build_model() -> RandomForestClassifier:
+def _build_model(n_jobs: int = -1) -> RandomForestClassifier:
     return RandomForestClassifier(
         n_estimators=200,
         max_depth=10,
         min_samples_leaf=5,
-        n_jobs=-1,
+        n_jobs=n_jobs,
         random_state=42,
     )
 
 
-def detect_market_regime(df: pd.DataFrame) -> dict:
+def _insufficient_data() -> dict:
+    return {
+        "regime": "Insufficient Data",
+        "confidence": 0.0,
+        "advice": f"At least {MIN_BARS} bars of data are required for regime detection.",
+        "regime_history": [],
+    }
+
+
+@dataclass
+class RegimeModel:
+    """A fitted scaler + forest together with the scored tail of the series it has seen."""
+
+    scaler: StandardScaler
+    model: RandomForestClassifier
+    version: Optional[Hashable]
+    trained_rows: int                       # bars the forest was fitted on
+    bars: int                               # bars scored so far (>= trained_rows)
+    tail_digest: str                        # fingerprint of the last FEATURE_LOOKBACK scored bars
+    history: list = field(default_factory=list)  # last HISTORY_BARS predicted labels
+    regime: str = ""
+    confidence: float = 0.0
+
+    def result(self) -> dict:
+        return {
+            "regime":         self.regime,
+            "confidence":     round(self.confidence, 4),
+            "advice":         REGIME_ADVICE.get(self.regime, ""),
+            "regime_history": [REGIME_LABELS[label] for label in self.history],
+        }
+
+    def predict(self, df: pd.DataFrame) -> dict:
+        """Regime of the last bars of ``df`` with this fitted model — inference only."""
+        feat = engineer_features(df.iloc[-(FEATURE_LOOKBACK + HISTORY_BARS):])
+        if feat.empty:
+            return _insufficient_data()
+        X_scaled = self.scaler.transform(feat.values[-HISTORY_BARS:])
+        scored = replace(self, history=[int(p) for p in self.model.predict(X_scaled)])
+        _score_last(scored, X_scaled)
+        return scored.result()
+
+    def extends_to(self, df: pd.DataFrame) -> bool:
+        """True when ``df`` is the series this model scored with bars appended after it."""
+        return len(df) >= self.bars and _tail_digest(df, self.bars) == self.tail_digest
+
+
+def _tail_digest(df: pd.DataFrame, stop: int) -> str:
+    cols = [c for c in ("open", "high", "low", "close") if c in df.columns]
+    window = df[cols].iloc[max(0, stop - FEATURE_LOOKBACK):stop]
+    values = window.apply(pd.to_numeric, errors="coerce").to_numpy(dtype="float64")
+    return hashlib.sha1(np.ascontiguousarray(values).tobytes()).hexdigest()
+
+
+def _score_last(entry: RegimeModel, X_scaled: np.ndarray) -> None:
+    probabilities = entry.model.predict_proba(X_scaled[[-1]])[0]
+    best = int(np.argmax(probabilities))
+    pred_label = int(entry.model.classes_[best])
+    entry.regime = REGIME_LABELS[pred_label]
+    entry.confidence = float(probabilities[best])
+
+
+def fit_regime_model(df: pd.DataFrame, version: Optional[Hashable] = None, n_jobs: int = -1) -> RegimeModel:
+    """
+    Engineer features → label → train, then score the last HISTORY_BARS rows.
+    ``n_jobs`` bounds training parallelism (e.g. 1 inside an offline training pool).
+    """
+    df = df.reset_index(drop=True)
+    feat   = engineer_features(df, feature_store)
+    labels = regime_labels(df)
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(feat.values)
+
+    model = _build_model(n_jobs)
+    model.fit(X_scaled, labels.values)
+    # Training uses every core once; lookups on a handful of rows don't need to.
+    model.n_jobs = 1
+
+    entry = RegimeModel(
+        scaler=scaler,
+        model=model,
+        version=version,
+        trained_rows=len(df),
+        bars=len(df),
+        tail_digest=_tail_digest(df, len(df)),
+        history=[int(p) for p in model.predict(X_scaled[-HISTORY_BARS:])],
+    )
+    _score_last(entry, X_scaled)
+    return entry
+
+
+def update_regime_model(entry: RegimeModel, df: pd.DataFrame, version: Optional[Hashable] = None) -> RegimeModel:
+    """
+    Score only the bars appended since ``entry`` last saw the series.
+
+    Features for the new bars are computed from a FEATURE_LOOKBACK-bar window ending at
+    them, so the cost is independent of the length of the series.
+    """
+    df = df.reset_index(drop=True)
+    start = entry.bars
+    if len(df) > start:
+        window = df.iloc[max(0, start - FEATURE_LOOKBACK):]
+        feat = engineer_features(window)
+        feat = feat[feat.index >= start]
+        if len(feat):
+            X_scaled = entry.scaler.transform(feat.values)
+            preds = entry.model.predict(X_scaled)
+            entry.history = (entry.history + [int(p) for p in preds])[-HISTORY_BARS:]
+            _score_last(entry, X_scaled)
+        entry.bars = len(df)
+        entry.tail_digest = _tail_digest(df, len(df))
+    entry.version = version
+    return entry
+
+
+def detect_market_regime(
+    df: pd.DataFrame,
+    cache_key: Optional[str] = None,
+    version: Optional[Hashable] = None,
+    registry: Optional[ModelRegistry] = None,
+) -> dict:
     """
     Full pipeline: engineer features → label → train → predict on last row.
 
+    With a ``cache_key`` (e.g. "<dataset_id>@<timeframe>") the fitted model is kept in the
+    model registry: an unchanged dataset ``version`` is answered from the stored result, new
+    bars appended to the series are scored incrementally, and anything else (rewritten
+    history, or growth past RETRAIN_GROWTH) refits the model.
+
     Args:
         df: OHLCV DataFrame (must have 'close', 'high', 'low'; 'volume' optional).
+        cache_key: registry name for this series; None trains a throwaway model.
+        version: dataset version the frame was loaded from (e.g. DataManager.dataset_version).
+        registry: registry to use instead of the module-level one.
 
     Returns:
         {
@@ -182,40 +268,29 @@ def detect_market_regime(df: pd.DataFrame) -> dict:
           "regime_history":  list,  # last 60 bars regime per-bar for sparkline
         }
     """
-    if len(df) < 80:
-        return {
-            "regime": "Insufficient Data",
-            "confidence": 0.0,
-            "advice": "At least 80 bars of data are required for regime detection.",
-            "regime_history": [],
-        }
-
-    feat   = engineer_features(df)
-    labels = generate_labels(feat)
-
-    X = feat.values
-    y = labels.values
-
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-
-    model = _build_model()
-    model.fit(X_scaled, y)
-
-    # Predict on the most recent bar
-    last_X  = X_scaled[[-1]]
-    pred_label   = int(model.predict(last_X)[0])
-    probabilities = model.predict_proba(last_X)[0]
-    confidence   = float(probabilities[pred_label])
-    regime_name  = REGIME_LABELS[pred_label]
-
-    # Build per-bar history for sparkline (last 60 bars)
-    all_preds = model.predict(X_scaled)
-    regime_history = [REGIME_LABELS[int(p)] for p in all_preds[-60:]]
+    if len(df) < MIN_BARS:
+        return _insufficient_data()
+
+    if cache_key is None:
+        return fit_regime_model(df, version).result()
+
+    registry = registry or model_registry
+    name = f"regime/{cache_key}"
+    entry = registry.get(name)
+
+    if entry is not None and version is not None and entry.version == version and entry.bars == len(df):
+        return entry.result()
+
+    if (
+        entry is not None
+        and entry.extends_to(df)
+        and len(df) <= entry.trained_rows * (1 + RETRAIN_GROWTH)
+    ):
+        if entry.bars == len(df) and entry.version == version:
+            return entry.result()
+        entry = update_regime_model(entry, df, version)
+    else:
+        entry = fit_regime_model(df, version)
 
-    return {
-        "regime":         regime_name,
-        "confidence":     round(confidence, 4),
-        "advice":         REGIME_ADVICE.get(regime_name, ""),
-        "regime_history": regime_history,
-    }
+    registry.put(name, entry)
+    return entry.result()
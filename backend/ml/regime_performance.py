@@ -7,7 +7,8 @@ Reuses the regime_detection feature engineering for consistency.
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-from backend.ml.regime_detection import engineer_features, generate_labels, REGIME_LABELS
+from backend.ml.feature_engineering import nearest_bars
+from backend.ml.regime_detection import REGIME_LABELS, regime_labels
 
 # ── Advice templates ─────────────────────────────────────────────────────────
 
@@ -68,48 +69,37 @@ def compute_regime_performance(df: pd.DataFrame, trades: list[dict]) -> dict:
             "insight": "Not enough data for a regime breakdown (need ≥ 80 bars and at least 1 trade).",
         }
 
-    # 1. Generate per-bar regime labels using the same pipeline as regime_detection
-    feat   = engineer_features(df)
-    labels = generate_labels(feat)          # pd.Series aligned to feat's index
+    # 1. Per-bar regime labels — the cached targets the regime model is trained on
+    df     = df.reset_index(drop=True)
+    labels = regime_labels(df)              # pd.Series indexed by row position
 
-    # Build a time → regime mapping
-    times = df["time"].values if "time" in df.columns else np.arange(len(df), dtype=float)
-    # feat index maps into df rows that survived dropna; reassemble to full df index
-    feat_idx = feat.index.tolist()
-
-    regime_per_bar = {}
-    for loc, regime_int in zip(feat_idx, labels.values):
-        regime_per_bar[times[loc] if loc < len(times) else loc] = REGIME_LABELS[int(regime_int)]
+    times = df["time"].to_numpy(dtype=float) if "time" in df.columns else np.arange(len(df), dtype=float)
+    # One regime per distinct bar time; a repeated time keeps its latest label.
+    per_time = pd.Series(labels.to_numpy(), index=times[labels.index.to_numpy()])
+    per_time = per_time.groupby(level=0, sort=False).last()
 
     # 2. Assign regime to each trade (nearest bar by entry_time)
-    time_arr    = np.array(list(regime_per_bar.keys()), dtype=float)
-    regime_arr  = np.array(list(regime_per_bar.values()))
-
-    def lookup_regime(entry_t):
-        if len(time_arr) == 0:
-            return "Unknown"
-        idx = int(np.argmin(np.abs(time_arr - float(entry_t))))
-        return regime_arr[idx]
+    entry_times = np.array(
+        [float(t.get("entry_time") or t.get("exit_time") or 0) for t in trades], dtype=float,
+    )
+    pnls = np.array([t["pnl"] for t in trades], dtype=float)
 
-    enriched = []
-    for t in trades:
-        entry_t = t.get("entry_time") or t.get("exit_time") or 0
-        enriched.append({**t, "regime": lookup_regime(entry_t)})
+    if len(per_time) == 0:
+        # No featurized bars: every trade is "Unknown", which has no breakdown row.
+        codes = np.full(len(trades), -1)
+    else:
+        codes = per_time.to_numpy()[nearest_bars(per_time.index.to_numpy(dtype=float), entry_times)]
 
     # 3. Group and compute per-regime stats
-    all_regimes = list(REGIME_LABELS.values())
     breakdown: dict[str, dict] = {}
-
-    for regime_name in all_regimes:
-        group = [t for t in enriched if t.get("regime") == regime_name]
-        if not group:
+    for code, regime_name in REGIME_LABELS.items():
+        group = pnls[codes == code]
+        if not len(group):
             continue
-        pnls    = [t["pnl"] for t in group]
-        wins    = [p for p in pnls if p > 0]
         breakdown[regime_name] = {
-            "trades":     len(group),
-            "avg_return": round(float(np.mean(pnls)), 6),
-            "win_rate":   round(len(wins) / len(pnls), 4) if pnls else 0.0,
+            "trades":     int(len(group)),
+            "avg_return": round(float(np.mean(group)), 6),
+            "win_rate":   round(int((group > 0).sum()) / len(group), 4),
         }
 
     return {
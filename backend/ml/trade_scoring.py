@@ -6,12 +6,19 @@ trained on market features at the time of signal generation.
 
 from __future__ import annotations
 
+import hashlib
 import warnings
+from dataclasses import dataclass
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 
+from backend.ml.feature_engineering import FeatureStore, compute_features, feature_store, nearest_bars
+from backend.ml.model_registry import ModelRegistry, model_registry
+
 warnings.filterwarnings("ignore")
 
 # ── Risk classification thresholds ──────────────────────────────────────────
@@ -28,115 +35,97 @@ def _risk_level(score: float) -> str:
         return "Medium"
     return "High"
 
-# ── Indicator helpers ────────────────────────────────────────────────────────
-
-def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
-    delta = close.diff()
-    gain  = delta.clip(lower=0).rolling(period).mean()
-    loss  = (-delta.clip(upper=0)).rolling(period).mean()
-    rs    = gain / loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
-
-def _ema(series: pd.Series, period: int) -> pd.Series:
-    return series.ewm(span=period, adjust=False).mean()
-
-def _macd_line(close: pd.Series) -> pd.Series:
-    return _ema(close, 12) - _ema(close, 26)
-
-def _atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    tr = pd.concat([
-        df["high"] - df["low"],
-        (df["high"] - df["close"].shift(1)).abs(),
-        (df["low"]  - df["close"].shift(1)).abs(),
-    ], axis=1).max(axis=1)
-    return tr.rolling(period).mean()
-
-def _adx(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    atr = _atr(df, period)
-    up   = df["high"].diff().clip(lower=0)
-    down = (-df["low"].diff()).clip(lower=0)
-    plus_dm  = np.where(up > down, up, 0)
-    minus_dm = np.where(down > up, down, 0)
-    atr_s = atr.replace(0, np.nan)
-    plus_di  = 100 * pd.Series(plus_dm,  index=df.index).rolling(period).mean() / atr_s
-    minus_di = 100 * pd.Series(minus_dm, index=df.index).rolling(period).mean() / atr_s
-    denom = (plus_di + minus_di).replace(0, np.nan)
-    dx = 100 * (plus_di - minus_di).abs() / denom
-    return dx.rolling(period).mean()
+# ── Feature engineering ──────────────────────────────────────────────────────
 
+SCORING_FEATURES = (
+    "rsi", "macd", "momentum_5", "momentum_1", "atr_norm", "adx", "vol_20",
+    "dist_ema50", "dist_ema200", "volume_spike", "vol_ratio_pct",
+)
 
-# ── Feature engineering ──────────────────────────────────────────────────────
 
-def extract_features(df: pd.DataFrame) -> pd.DataFrame:
+def extract_features(df: pd.DataFrame, store: Optional[FeatureStore] = None) -> pd.DataFrame:
     """
-    Build a feature matrix aligned to df's index. Rows with NaN are kept
-    (filled with 0) to preserve index alignment with the trade timestamps.
+    Project the scoring features out of the shared feature matrix (computed fresh when
+    ``store`` is None). Rows with NaN are kept (filled with 0) to preserve index
+    alignment with the trade timestamps.
     """
-    df = df.copy()
-    df.columns = df.columns.str.lower()
-    for col in ["open","high","low","close"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    feat = pd.DataFrame(index=df.index)
-    close = df["close"]
-
-    feat["rsi"]          = _rsi(close, 14)
-    feat["macd"]         = _macd_line(close)
-    feat["momentum_5"]   = close.pct_change(5)
-    feat["momentum_1"]   = close.pct_change(1)
-    feat["atr_norm"]     = _atr(df, 14) / close
-    feat["adx"]          = _adx(df, 14)
-    feat["vol_20"]       = close.pct_change().rolling(20).std()
-    feat["dist_ema50"]   = (close - _ema(close, 50)) / close
-    feat["dist_ema200"]  = (close - _ema(close, 200)) / close
-
-    if "volume" in df.columns:
-        vol = pd.to_numeric(df["volume"], errors="coerce")
-        feat["volume_spike"] = vol / vol.rolling(20).mean().replace(0, np.nan)
-    else:
-        feat["volume_spike"] = 1.0
-
-    feat["vol_ratio"] = (
-        close.pct_change().rolling(5).std()
-        / close.pct_change().rolling(60).std().replace(0, np.nan)
-    )
-
-    return feat.fillna(0)
+    features = store.get(df) if store is not None else compute_features(df)
+    feat = features.frame(SCORING_FEATURES, index=df.index)
+    return feat.rename(columns={"vol_ratio_pct": "vol_ratio"}).fillna(0)
 
 
-def _build_labels_from_trades(df: pd.DataFrame, trades: list[dict]) -> tuple[list[int], list[int]]:
+def _build_labels_from_trades(df: pd.DataFrame, trades: list[dict]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Map each trade to the closest candle bar by entry_time.
     Label = 1 if pnl > 0 (profitable), else 0.
-    Returns (bar_indices, labels).
+    Returns (trade_positions, bar_indices, labels) for the trades that carry a time.
     """
-    times  = df["time"].values if "time" in df.columns else np.arange(len(df))
-    indices, labels = [], []
+    times = df["time"].to_numpy(dtype="float64") if "time" in df.columns else np.arange(len(df), dtype="float64")
 
-    for t in trades:
+    positions, entry_times, labels = [], [], []
+    for i, t in enumerate(trades):
         entry_t = t.get("entry_time") or t.get("exit_time")
         if entry_t is None:
             continue
-        # Find nearest bar
-        diffs = np.abs(times - entry_t)
-        idx   = int(np.argmin(diffs))
-        pnl   = t.get("pnl", 0)
-        indices.append(idx)
-        labels.append(1 if pnl > 0 else 0)
+        positions.append(i)
+        entry_times.append(entry_t)
+        labels.append(1 if t.get("pnl", 0) > 0 else 0)
+
+    bar_indices = nearest_bars(times, np.asarray(entry_times, dtype="float64"))
+    return np.asarray(positions, dtype="int64"), bar_indices, np.asarray(labels, dtype="int64")
+
+
+# ── Model training + caching ─────────────────────────────────────────────────
 
-    return indices, labels
+@dataclass
+class TradeScorer:
+    scaler: StandardScaler
+    model: RandomForestClassifier
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        """Probability of the "profitable" class for every row of X."""
+        proba   = self.model.predict_proba(self.scaler.transform(X))
+        classes = list(self.model.classes_)
+        pos_idx = classes.index(1) if 1 in classes else 0
+        return proba[:, pos_idx]
+
+
+def _training_key(X_train: np.ndarray, y_train: np.ndarray) -> str:
+    digest = hashlib.sha1(np.ascontiguousarray(X_train, dtype="float64").tobytes())
+    digest.update(np.ascontiguousarray(y_train, dtype="int64").tobytes())
+    return f"trade_scoring/{digest.hexdigest()}"
+
+
+def fit_trade_scorer(X_train: np.ndarray, y_train: np.ndarray, n_jobs: int = -1) -> TradeScorer:
+    scaler = StandardScaler()
+    X_train_s = scaler.fit_transform(X_train)
+
+    model = RandomForestClassifier(
+        n_estimators=300,
+        max_depth=12,
+        min_samples_leaf=3,
+        n_jobs=n_jobs,
+        random_state=42,
+    )
+    model.fit(X_train_s, y_train)
+    # Training uses every core once; scoring one batch doesn't need to.
+    model.n_jobs = 1
+    return TradeScorer(scaler=scaler, model=model)
 
 
 # ── Public scoring API ───────────────────────────────────────────────────────
 
-def score_trades(df: pd.DataFrame, trades: list[dict]) -> list[dict]:
+def score_trades(df: pd.DataFrame, trades: list[dict], registry: Optional[ModelRegistry] = None) -> list[dict]:
     """
     Score every trade in `trades` using a RandomForest trained on in-sample features.
 
+    The fitted scorer is kept in memory under a digest of its training set, so scoring
+    the same backtest again reuses it instead of refitting.
+
     Args:
-        df:     OHLCV DataFrame.
-        trades: List of trade dicts produced by the backtest engine.
+        df:       OHLCV DataFrame.
+        trades:   List of trade dicts produced by the backtest engine.
+        registry: registry to cache the scorer in instead of the module-level one.
 
     Returns:
         The original trade dicts each augmented with:
@@ -154,12 +143,12 @@ def score_trades(df: pd.DataFrame, trades: list[dict]) -> list[dict]:
             for t in trades
         ]
 
-    feat_df = extract_features(df)
+    feat_df = extract_features(df, feature_store)
     X_all   = feat_df.values
 
-    bar_indices, labels = _build_labels_from_trades(df, trades)
+    positions, bar_indices, labels = _build_labels_from_trades(df, trades)
 
-    if len(set(labels)) < 2:
+    if len(set(labels.tolist())) < 2:
         # All winners or all losers — model can't discriminate
         default_score = 0.75 if all(l == 1 for l in labels) else 0.30
         return [
@@ -168,36 +157,46 @@ def score_trades(df: pd.DataFrame, trades: list[dict]) -> list[dict]:
             for t in trades
         ]
 
-    X_train = np.array([X_all[i] for i in bar_indices])
-    y_train = np.array(labels)
+    X_train = X_all[bar_indices]
+    y_train = labels
 
-    scaler  = StandardScaler()
-    X_train_s = scaler.fit_transform(X_train)
+    registry = registry or model_registry
+    key     = _training_key(X_train, y_train)
+    scorer  = registry.get(key)
+    if scorer is None:
+        scorer = fit_trade_scorer(X_train, y_train)
+        registry.put(key, scorer, persist=False)
 
-    model = RandomForestClassifier(
-        n_estimators=300,
-        max_depth=12,
-        min_samples_leaf=3,
-        n_jobs=-1,
-        random_state=42,
-    )
-    model.fit(X_train_s, y_train)
+    return _scored_trades(trades, positions, scorer.score(X_train))
 
-    scored = []
-    for idx, t in zip(bar_indices, trades):
-        x       = scaler.transform(X_all[[idx]])
-        proba   = model.predict_proba(x)[0]
-        # index of class "1" (profitable)
-        classes = list(model.classes_)
-        pos_idx = classes.index(1) if 1 in classes else 0
-        score   = float(proba[pos_idx])
-        
-        scored.append({
+
+def apply_trade_scorer(scorer: TradeScorer, df: pd.DataFrame, trades: list[dict]) -> list[dict]:
+    """Score ``trades`` with an already fitted scorer (e.g. an offline model) — no training."""
+    df = df.copy()
+    df.columns = df.columns.str.lower()
+    if not trades:
+        return []
+
+    X_all = extract_features(df, feature_store).values
+    positions, bar_indices, _labels = _build_labels_from_trades(df, trades)
+    scores = scorer.score(X_all[bar_indices]) if len(positions) else np.empty(0)
+    return _scored_trades(trades, positions, scores)
+
+
+def _scored_trades(trades: list[dict], positions: np.ndarray, trade_scores: np.ndarray) -> list[dict]:
+    # Trades without a timestamp can't be placed on a bar; they keep a neutral score.
+    scores = np.full(len(trades), 0.5)
+    scores[positions] = trade_scores
+
+    scored = [
+        {
             **t,
             "trade_score": round(score, 4),
             "confidence":  round(score, 4),
             "risk_level":  _risk_level(score),
-        })
+        }
+        for t, score in zip(trades, scores.tolist())
+    ]
 
     # Sort best-score-first for the "top trades" view
     scored.sort(key=lambda x: x["trade_score"], reverse=True)
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from typing import Any, Optional
 
-import pandas as pd
-
 from backend.data_providers.data_manager import data_manager
 from backend.strategy_engine import run_strategy
 from backend.utils.helpers import clean_data
@@ -26,14 +24,15 @@ def evaluate_replay(
         visible_candles = candles[: normalized_cursor + 1]
 
     strategy_config = config or {}
-    df = pd.DataFrame(visible_candles)
-    result = clean_data(run_strategy(df, strategy_config))
+    result = clean_data(run_strategy(visible_candles.to_dataframe(), strategy_config))
 
-    current_candle = visible_candles[-1] if visible_candles else None
+    candle_records = candles.to_candles()
+    visible_records = candle_records[: len(visible_candles)]
+    current_candle = visible_records[-1] if visible_records else None
     return {
         "cursor": normalized_cursor,
-        "candles": candles,
-        "visible_candles": visible_candles,
+        "candles": candle_records,
+        "visible_candles": visible_records,
         "current_candle": current_candle,
         "buy_signals": result.get("buy_signals", []),
         "sell_signals": result.get("sell_signals", []),
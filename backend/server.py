@@ -34,6 +34,11 @@ from backend.database.database import init_db
 def on_startup():
     init_db()
 
+@app.on_event("shutdown")
+def on_shutdown():
+    from backend.backtesting.batch import shutdown_pool
+    shutdown_pool()
+
 # ── Routers ───────────────────────────────────────────────────────────────────
 from backend.api.replay_routes import router as replay_router
 from backend.api.backtest_routes import router as backtest_router
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from bisect import bisect_left
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from backend.market_data.candle_array import CandleArray
 
 
 _SETUP_CACHE: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
@@ -25,11 +27,14 @@ def _find_candle_index(candle_times: List[int], timestamp: int) -> int:
 
 
 def build_trade_setups(
-    candles: List[Dict[str, Any]],
+    candles: Union[CandleArray, List[Dict[str, Any]]],
     buy_signals: List[Dict[str, Any]],
     sell_signals: List[Dict[str, Any]],
 ) -> List[Dict[str, Any]]:
-    candle_times = [int(candle.get("time", 0)) for candle in candles]
+    if isinstance(candles, CandleArray):
+        candle_times = candles.time.tolist()
+    else:
+        candle_times = [int(candle.get("time", 0)) for candle in candles]
     combined_signals: List[Tuple[str, Dict[str, Any]]] = []
     combined_signals.extend(("BUY", signal) for signal in (buy_signals or []))
     combined_signals.extend(("SELL", signal) for signal in (sell_signals or []))
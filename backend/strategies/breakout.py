@@ -105,5 +105,5 @@ def run_breakout(df: pd.DataFrame, params: dict) -> dict:
         "sell_signals": sell_signals,
         "trades":       trades,
         "indicators":   indicators,
-        "metrics":      compute_metrics(trades),
+        "metrics":      compute_metrics(trades, df),
     }
@@ -151,6 +151,6 @@ def run_code_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any
         "buy_signals": buy_signals,
         "sell_signals": sell_signals,
         "trades": trades,
-        "metrics": compute_metrics(trades),
+        "metrics": compute_metrics(trades, df),
         "indicators": indicators
     }
@@ -120,6 +120,6 @@ def run_ma_crossover(df: pd.DataFrame, params: dict) -> dict:
         "buy_signals": buy_signals,
         "sell_signals": sell_signals,
         "trades": trades,
-        "metrics": compute_metrics(trades),
+        "metrics": compute_metrics(trades, working),
         "indicators": indicators,
     }
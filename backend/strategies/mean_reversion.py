@@ -96,5 +96,5 @@ def run_mean_reversion(df: pd.DataFrame, params: dict) -> dict:
         "sell_signals": sell_signals,
         "trades":       trades,
         "indicators":   indicators,
-        "metrics":      compute_metrics(trades),
+        "metrics":      compute_metrics(trades, df),
     }
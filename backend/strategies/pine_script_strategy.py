@@ -8,6 +8,7 @@ import numpy as np
 import pandas as pd
 
 from backend.backtesting.metrics import compute_metrics
+from backend.market_data.multi_timeframe import TimeframeContext, context_for, normalize_timeframe
 
 
 _COMMENT_RE = re.compile(r"//.*$")
@@ -23,6 +24,49 @@ _CLOSE_RE = re.compile(
 )
 _WHEN_RE = re.compile(r"when\s*=\s*(.+?)(?:,\s*\w+\s*=.*)?$", re.IGNORECASE)
 
+_SECURITY_KEY = "__security__"
+_PINE_TIMEFRAMES = {"1": "1m", "5": "5m", "15": "15m", "30": "30m", "60": "1h", "240": "4h", "D": "1d", "1D": "1d"}
+_PRICE_NAMES = ("open", "high", "low", "close", "volume", "time")
+_OWN_SYMBOL_NAMES = frozenset({"syminfo.tickerid", "syminfo.ticker"})
+
+
+class _SecuritySource:
+    """What request.security needs: the higher-timeframe bars and the script's assignments."""
+
+    def __init__(self, working: pd.DataFrame, context: Optional[TimeframeContext], assignments: List[Tuple[str, str]]):
+        self._working = working
+        self._context = context
+        self.assignments = dict(assignments)
+
+    @property
+    def context(self) -> TimeframeContext:
+        self._context = context_for(self._working, self._context)
+        return self._context
+
+
+class _SecurityEnv(dict):
+    """Higher-timeframe scope: script variables are re-evaluated on that timeframe's bars."""
+
+    def __init__(self, values: Dict[str, Any], assignments: Dict[str, str], index: pd.Index):
+        super().__init__(values)
+        self._assignments = assignments
+        self._index = index
+        self._pending: set = set()
+
+    def __contains__(self, name: object) -> bool:
+        return dict.__contains__(self, name) or name in self._assignments
+
+    def __missing__(self, name: str) -> Any:
+        if name not in self._assignments:
+            raise KeyError(name)
+        if name in self._pending:
+            raise ValueError(f"Pine Script variable {name} refers to itself inside request.security.")
+        self._pending.add(name)
+        value = _eval_expression(self._assignments[name], self, self._index)
+        self._pending.discard(name)
+        self[name] = value
+        return value
+
 
 def _get_series_index(env: Dict[str, Any]) -> pd.Index:
     for value in env.values():
@@ -70,8 +114,50 @@ def _get_call_name(node: ast.AST) -> str:
     raise ValueError("Unsupported Pine Script function call.")
 
 
+def _pine_timeframe(value: Any) -> str:
+    text = str(value).strip()
+    return normalize_timeframe(_PINE_TIMEFRAMES.get(text.upper(), text))
+
+
+def _is_own_symbol(node: ast.AST, symbol: Optional[str]) -> bool:
+    if isinstance(node, ast.Attribute):
+        try:
+            return _get_call_name(node) in _OWN_SYMBOL_NAMES
+        except ValueError:
+            return False
+    return isinstance(node, ast.Constant) and symbol is not None and node.value == symbol
+
+
+def _eval_security(node: ast.Call, env: Dict[str, Any], index: pd.Index) -> Any:
+    """
+    request.security(symbol, timeframe, expression): ``expression`` evaluated on the
+    strategy's own symbol at ``timeframe`` and forward-filled from each bar's close,
+    i.e. lookahead off. ``symbol`` must be ``syminfo.tickerid``/``syminfo.ticker`` or
+    the dataset id itself; other symbols are rejected rather than silently ignored.
+    """
+    source = env.get(_SECURITY_KEY)
+    if source is None:
+        raise ValueError("request.security cannot be nested.")
+    if len(node.args) < 3:
+        raise ValueError("request.security expects (symbol, timeframe, expression).")
+    timeframe = _pine_timeframe(_eval_node(node.args[1], env, index))
+
+    context = source.context
+    if not _is_own_symbol(node.args[0], context.symbol):
+        raise ValueError("request.security only supports the strategy's own symbol")
+    frame = context.frame(timeframe)
+    htf_index = frame.index
+    scope = _SecurityEnv({name: frame[name] for name in _PRICE_NAMES}, source.assignments, htf_index)
+    result = _eval_node(node.args[2], scope, htf_index)
+    if not isinstance(result, pd.Series):
+        return result
+    return pd.Series(context.align(timeframe, result.to_numpy()), index=index)
+
+
 def _eval_call(node: ast.Call, env: Dict[str, Any], index: pd.Index) -> Any:
     call_name = _get_call_name(node.func)
+    if call_name == "request.security":
+        return _eval_security(node, env, index)
     args = [_eval_node(arg, env, index) for arg in node.args]
 
     if call_name in {"input.int", "input.float"}:
@@ -374,7 +460,9 @@ def _build_indicators(env: Dict[str, Any], working: pd.DataFrame) -> Dict[str, L
     return indicators
 
 
-def run_pine_script_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+def run_pine_script_strategy(
+    df: pd.DataFrame, config: Dict[str, Any], context: Optional[TimeframeContext] = None,
+) -> Dict[str, Any]:
     pine_script = str(config.get("pine_script") or config.get("code_string") or "").strip()
     if not pine_script:
         return {
@@ -408,6 +496,7 @@ def run_pine_script_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[s
     index = _get_series_index(env)
 
     assignments, actions = _parse_script(pine_script)
+    env[_SECURITY_KEY] = _SecuritySource(working, context, assignments)
     for name, expression in assignments:
         env[name] = _eval_expression(expression, env, index)
 
@@ -507,6 +596,6 @@ def run_pine_script_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[s
         "buy_signals": buy_signals,
         "sell_signals": sell_signals,
         "trades": trades,
-        "metrics": compute_metrics(trades),
+        "metrics": compute_metrics(trades, working),
         "indicators": _build_indicators(env, working),
     }
@@ -98,5 +98,5 @@ def run_rsi_reversal(df: pd.DataFrame, params: dict) -> dict:
         "sell_signals": sell_signals,
         "trades":       trades,
         "indicators":   indicators,
-        "metrics":      compute_metrics(trades),
+        "metrics":      compute_metrics(trades, df),
     }
@@ -1,6 +1,10 @@
 import pandas as pd
 import numpy as np
 import re
+from typing import Optional
+
+from backend.backtesting.metrics import compute_metrics
+from backend.market_data.multi_timeframe import TimeframeContext, context_for
 
 def compute_indicator(df: pd.DataFrame, indicator: str, params: dict):
     """Dynamically computes an indicator based on its name and injects it into the dataframe"""
@@ -50,8 +54,36 @@ def evaluate_condition(df: pd.DataFrame, condition: dict) -> pd.Series:
     if op == "==": return lhs == rhs
     return pd.Series(False, index=df.index)
 
-def run_rule_engine(df: pd.DataFrame, config: dict) -> dict:
-    """Runs a fully custom strategy based on user-defined indicators and rules"""
+def ensure_indicator_exists(df: pd.DataFrame, name) -> None:
+    """Computes an implicitly referenced indicator such as "EMA200" or "rsi" into the dataframe"""
+    name = str(name).lower()
+    if name == "price" or name == "close": return
+    if name in df.columns: return
+    match = re.match(r"(ema|sma|ma)(\d+)", name)
+    if match:
+        ind_type, period = match.groups()
+        compute_indicator(df, ind_type, {"period": int(period)})
+        # Copy to raw name to match exactly
+        df[name] = df[f"{ind_type}_{period}"]
+    elif name == "rsi":
+        compute_indicator(df, "rsi", {"period": 14})
+
+def ensure_timeframe_indicator(df: pd.DataFrame, name: str, context: TimeframeContext) -> None:
+    """Adds a higher-timeframe reference such as "ema50@1h" as a column aligned to the base bars"""
+    base_name, timeframe = name.rsplit("@", 1)
+    column = "close" if base_name == "price" else base_name
+    htf = context.frame(timeframe).copy()
+    ensure_indicator_exists(htf, column)
+    if column not in htf.columns:
+        raise ValueError(f"Unknown indicator in {name}")
+    df[name] = context.align(timeframe, htf[column].to_numpy())
+
+def run_rule_engine(df: pd.DataFrame, config: dict, context: Optional[TimeframeContext] = None) -> dict:
+    """
+    Runs a fully custom strategy based on user-defined indicators and rules.
+    Rules may reference a higher timeframe as "<indicator>@<timeframe>" (e.g. "ema50@1h"),
+    computed on that timeframe's bars and forward-filled from its last closed bar.
+    """
     
     # 1. Compute required indicators
     indicators = config.get("indicators", {})
@@ -59,31 +91,27 @@ def run_rule_engine(df: pd.DataFrame, config: dict) -> dict:
         compute_indicator(df, ind, params)
         
     # Also support Mode 3 implicit indicator calculation if missed in 'indicators' dict
-    # We heuristically parse strings like "EMA200" from rules
-    def ensure_indicator_exists(name):
+    # We heuristically parse strings like "EMA200" or "EMA200@4h" from rules
+    def ensure_reference(name):
         name = str(name).lower()
-        if name == "price" or name == "close": return
-        if name in df.columns: return
-        match = re.match(r"(ema|sma|ma)(\d+)", name)
-        if match:
-            ind_type, period = match.groups()
-            compute_indicator(df, ind_type, {"period": int(period)})
-            # Copy to raw name to match exactly
-            df[name] = df[f"{ind_type}_{period}"]
-        elif name == "rsi":
-            compute_indicator(df, "rsi", {"period": 14})
-            
+        if "@" in name and name not in df.columns:
+            nonlocal context
+            context = context_for(df, context)
+            ensure_timeframe_indicator(df, name, context)
+        else:
+            ensure_indicator_exists(df, name)
+
     # 2. Parse and evaluate buy/sell rules
     buy_rules = config.get("buy_rules", [])
     sell_rules = config.get("sell_rules", [])
     
     for r in buy_rules:
-        ensure_indicator_exists(r.get("indicator"))
-        ensure_indicator_exists(r.get("value"))
+        ensure_reference(r.get("indicator"))
+        ensure_reference(r.get("value"))
         
     for r in sell_rules:
-        ensure_indicator_exists(r.get("indicator"))
-        ensure_indicator_exists(r.get("value"))
+        ensure_reference(r.get("indicator"))
+        ensure_reference(r.get("value"))
 
     # Initial condition arrays
     buy_cond = pd.Series(True, index=df.index)
@@ -109,6 +137,7 @@ def run_rule_engine(df: pd.DataFrame, config: dict) -> dict:
     
     in_trade = False
     entry_price = 0.0
+    entry_time = None
     trade_type = ""
 
     for i in range(1, len(df)):
@@ -119,6 +148,7 @@ def run_rule_engine(df: pd.DataFrame, config: dict) -> dict:
             if trade_type == "BUY" and (pl_pct <= -stop_loss or pl_pct >= take_profit):
                 in_trade = False
                 trades.append({
+                    "entry_time": entry_time,
                     "entry_price": entry_price,
                     "exit_price": current["close"],
                     "type": "BUY",
@@ -128,6 +158,7 @@ def run_rule_engine(df: pd.DataFrame, config: dict) -> dict:
             elif trade_type == "SELL" and (-pl_pct <= -stop_loss or -pl_pct >= take_profit):
                 in_trade = False
                 trades.append({
+                    "entry_time": entry_time,
                     "entry_price": entry_price,
                     "exit_price": current["close"],
                     "type": "SELL",
@@ -141,25 +172,18 @@ def run_rule_engine(df: pd.DataFrame, config: dict) -> dict:
                 buy_signals.append({"time": current["time"], "price": current["close"]})
                 in_trade = True
                 entry_price = current["close"]
+                entry_time = current["time"]
                 trade_type = "BUY"
             elif sell_cond.iloc[i]:
                 sell_signals.append({"time": current["time"], "price": current["close"]})
                 in_trade = True
                 entry_price = current["close"]
+                entry_time = current["time"]
                 trade_type = "SELL"
                 
-    # Calculate metrics
-    wins = [t for t in trades if t["pnl"] > 0]
-    win_rate = len(wins) / len(trades) if trades else 0.0
-    total_return = sum(t["pnl"] for t in trades)
-    
     return {
         "buy_signals": buy_signals,
         "sell_signals": sell_signals,
         "trades": trades,
-        "metrics": {
-            "win_rate": round(win_rate, 4),
-            "total_return": round(total_return, 4),
-            "max_drawdown": 0.0
-        }
+        "metrics": compute_metrics(trades, df),
     }
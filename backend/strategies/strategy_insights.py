@@ -14,18 +14,39 @@ import numpy as np
 import pandas as pd
 from typing import List, Dict, Any
 
-# Re-use RSI helper without importing the full trade_scoring module
-def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
-    delta = close.diff()
-    gain  = delta.clip(lower=0).rolling(period).mean()
-    loss  = (-delta.clip(upper=0)).rolling(period).mean()
-    rs    = gain / loss.replace(0, np.nan)
-    return 100 - (100 / (1 + rs))
+from backend.ml.feature_engineering import PRICE_COLUMNS, feature_store, nearest_bars, rsi
 
 
-def _nearest_index(times: np.ndarray, target: float) -> int:
-    diffs = np.abs(times - target)
-    return int(np.argmin(diffs))
+def _entry_rsi(df: pd.DataFrame) -> np.ndarray:
+    if set(PRICE_COLUMNS) <= set(df.columns):
+        # Same candles as the scoring/regime requests → served from the shared feature matrix.
+        return feature_store.get(df)["rsi"]
+    return rsi(df["close"], 14).to_numpy(dtype=float)
+
+
+def _trade_frame(df: pd.DataFrame, trades: List[Dict]) -> pd.DataFrame:
+    """One row per timed trade: pnl, type, regime, RSI at the nearest entry bar, duration, score."""
+    timed = [t for t in trades if (t.get("entry_time") or t.get("exit_time")) is not None]
+    entry_t = np.array([t.get("entry_time") or t.get("exit_time") for t in timed], dtype=float)
+    exit_t  = np.array([t.get("exit_time") or t.get("entry_time") for t in timed], dtype=float)
+
+    times = df["time"].to_numpy(dtype=float) if "time" in df.columns else np.arange(len(df), dtype=float)
+    rsi_at_entry = _entry_rsi(df)[nearest_bars(times, entry_t)] if len(timed) else np.empty(0)
+
+    return pd.DataFrame({
+        "pnl":      np.array([float(t.get("pnl", 0)) for t in timed], dtype=float),
+        "type":     [t.get("type", "BUY") for t in timed],
+        "regime":   [t.get("regime", "Unknown") for t in timed],
+        "rsi":      rsi_at_entry,
+        "duration": np.where((exit_t != 0) & (entry_t != 0), exit_t - entry_t, 0.0),
+        "score":    np.array([float(t.get("trade_score", 0.5)) for t in timed], dtype=float),
+    })
+
+
+def _max_consecutive(mask: np.ndarray) -> int:
+    """Length of the longest run of True values."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return int((edges[1::2] - edges[0::2]).max()) if len(edges) else 0
 
 
 def generate_insights(candles: List[Dict], trades: List[Dict]) -> List[str]:
@@ -44,29 +65,10 @@ def generate_insights(candles: List[Dict], trades: List[Dict]) -> List[str]:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
-    times = df["time"].values if "time" in df.columns else np.arange(len(df))
-    close = df["close"]
-    rsi   = _rsi(close, 14).values
+    tr = _trade_frame(df, trades)
+    if tr.empty:
+        return ["Not enough trades for statistical analysis (need ≥ 3)."]
 
-    trade_records = []
-    for t in trades:
-        entry_t = t.get("entry_time") or t.get("exit_time")
-        exit_t  = t.get("exit_time")  or t.get("entry_time")
-        if entry_t is None:
-            continue
-        idx     = _nearest_index(times, entry_t)
-        rsi_val = rsi[idx] if 0 <= idx < len(rsi) else np.nan
-        duration = (exit_t - entry_t) if (exit_t and entry_t) else 0
-        trade_records.append({
-            "pnl":       float(t.get("pnl", 0)),
-            "type":      t.get("type", "BUY"),
-            "regime":    t.get("regime", "Unknown"),
-            "rsi":       rsi_val,
-            "duration":  duration,
-            "score":     float(t.get("trade_score", 0.5)),
-        })
-
-    tr = pd.DataFrame(trade_records)
     wins   = tr[tr["pnl"] > 0]
     losses = tr[tr["pnl"] <= 0]
 
@@ -117,32 +119,21 @@ def generate_insights(candles: List[Dict], trades: List[Dict]) -> List[str]:
     # ── 4. Regime analysis (if regime data embedded in trades) ───────────────
     regimes = tr["regime"].unique()
     if len(regimes) > 1 or (len(regimes) == 1 and regimes[0] != "Unknown"):
-        best_regime = None
-        best_wr     = -1
-        for reg in regimes:
-            sub = tr[tr["regime"] == reg]
-            if len(sub) < 2:
-                continue
-            cur_wr = len(sub[sub["pnl"] > 0]) / len(sub) * 100
-            if cur_wr > best_wr:
-                best_wr     = cur_wr
-                best_regime = reg
-        worst_regime = None
-        worst_wr     = 101
-        for reg in regimes:
-            sub = tr[tr["regime"] == reg]
-            if len(sub) < 2:
-                continue
-            cur_wr = len(sub[sub["pnl"] > 0]) / len(sub) * 100
-            if cur_wr < worst_wr:
-                worst_wr     = cur_wr
-                worst_regime = reg
-        if best_regime and best_regime != worst_regime:
-            insights.append(
-                f"Best performance in {best_regime} market regime "
-                f"({best_wr:.0f}% win rate) vs weakest in {worst_regime} "
-                f"({worst_wr:.0f}% win rate)."
-            )
+        per_regime = tr.groupby("regime", sort=False, dropna=False)["pnl"].agg(
+            count="size", wins=lambda pnl: int((pnl > 0).sum()),
+        )
+        per_regime = per_regime[per_regime["count"] >= 2]
+        if len(per_regime):
+            rates = per_regime["wins"] / per_regime["count"] * 100
+            # idxmax/idxmin keep the first regime (in trade order) on ties.
+            best_regime,  best_wr  = rates.idxmax(), rates.max()
+            worst_regime, worst_wr = rates.idxmin(), rates.min()
+            if best_regime and best_regime != worst_regime:
+                insights.append(
+                    f"Best performance in {best_regime} market regime "
+                    f"({best_wr:.0f}% win rate) vs weakest in {worst_regime} "
+                    f"({worst_wr:.0f}% win rate)."
+                )
 
     # ── 5. Trade duration ────────────────────────────────────────────────────
     if tr["duration"].abs().sum() > 0:
@@ -171,14 +162,7 @@ def generate_insights(candles: List[Dict], trades: List[Dict]) -> List[str]:
             )
 
     # ── 7. Drawdown warning ───────────────────────────────────────────────────
-    consecutive_losses = 0
-    max_consec = 0
-    for pnl in tr["pnl"]:
-        if pnl <= 0:
-            consecutive_losses += 1
-            max_consec = max(max_consec, consecutive_losses)
-        else:
-            consecutive_losses = 0
+    max_consec = _max_consecutive((tr["pnl"] <= 0).to_numpy())
     if max_consec >= 3:
         insights.append(
             f"Maximum consecutive losing streak: {max_consec} trades — "
@@ -1,6 +1,8 @@
 import pandas as pd
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Union
 
+from backend.market_data.candle_array import CandleArray
+from backend.market_data.multi_timeframe import TimeframeContext
 from backend.strategies.ma_crossover import run_ma_crossover
 from backend.strategies.mean_reversion import run_mean_reversion
 from backend.strategies.rsi_reversal import run_rsi_reversal
@@ -9,7 +11,11 @@ from backend.strategies.rule_engine import run_rule_engine
 from backend.strategies.code_strategy import run_code_strategy
 from backend.strategies.pine_script_strategy import run_pine_script_strategy
 
-def run_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
+def run_strategy(
+    df: Union[pd.DataFrame, CandleArray],
+    config: Dict[str, Any],
+    context: Optional[TimeframeContext] = None,
+) -> Dict[str, Any]:
     """
     Central strategy router.
     Expects config format:
@@ -23,7 +29,13 @@ def run_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
        "stop_loss": 0.02,
        "take_profit": 0.04
     }
+    A CandleArray is accepted in place of the frame.
+
+    ``context`` supplies higher-timeframe bars for rule ("ema50@1h") and Pine
+    (request.security) references; without it they are resampled from ``df``.
     """
+    if isinstance(df, CandleArray):
+        df = df.to_dataframe()
     mode = config.get("mode", "template")
 
     # Minimal Strategy Lab path:
@@ -79,15 +91,15 @@ def run_strategy(df: pd.DataFrame, config: Dict[str, Any]) -> Dict[str, Any]:
         config["buy_rules"] = parse_rule_string(string_rules.get("buy", ""))
         config["sell_rules"] = parse_rule_string(string_rules.get("sell", ""))
         
-        return run_rule_engine(df, config)
+        return run_rule_engine(df, config, context)
         
     elif mode == "rules":
-        return run_rule_engine(df, config)
+        return run_rule_engine(df, config, context)
         
     elif mode == "code":
         return run_code_strategy(df, config)
     elif mode == "pine":
-        return run_pine_script_strategy(df, config)
+        return run_pine_script_strategy(df, config, context)
 
     else:
         raise ValueError(f"Unknown strategy mode: {mode}")
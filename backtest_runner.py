@@ -1,6 +1,8 @@
 import glob
 import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Any
 
 import pandas as pd
@@ -12,35 +14,102 @@ from bot.locked_strategy import LockedStreakPullbackStrategy
 load_dotenv()
 
 
+def symbol_from_path(csv_file: str) -> str:
+    base = os.path.splitext(os.path.basename(csv_file))[0].upper()
+    return base.replace("_5M", "") if base.endswith("_5M") else base
+
+
+def run_symbol(csv_file: str, chunk_dir: str) -> dict[str, Any]:
+    """
+    Backtest one CSV and write its trades to ``chunk_dir/<file name>``. Chunks are
+    named after the input file rather than the symbol, since two files (``eurusd.csv``
+    and ``EURUSD_5m.csv``) can map to the same symbol.
+    """
+    started = time.perf_counter()
+    symbol = symbol_from_path(csv_file)
+    df = pd.read_csv(csv_file)
+    candles = candles_from_dataframe(df, tz_name="UTC")
+    trades = run_backtest(candles, strategy=LockedStreakPullbackStrategy(allow_long=True, allow_short=True))
+
+    trades_path = os.path.join(chunk_dir, os.path.basename(csv_file))
+    trades_to_frame(trades, symbol=symbol).to_csv(trades_path, index=False)
+    return {
+        "source": csv_file,
+        "symbol": symbol,
+        "metrics": compute_metrics(trades),
+        "trades_path": trades_path,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _write_json(path: str, payload: dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _concat_trade_chunks(chunk_paths: list[str], out_path: str) -> None:
+    # Chunks share trades_to_frame's fixed header; keep the first and append the rows.
+    with open(out_path, "w", encoding="utf-8", newline="") as out:
+        for i, chunk_path in enumerate(chunk_paths):
+            with open(chunk_path, "r", encoding="utf-8", newline="") as chunk:
+                header = chunk.readline()
+                if i == 0:
+                    out.write(header)
+                out.writelines(chunk)
+
+
+def _worker_count(n_files: int) -> int:
+    workers = int(os.getenv("BACKTEST_WORKERS", "0")) or (os.cpu_count() or 1)
+    return max(1, min(workers, n_files))
+
+
 def main() -> None:
     data_dir = os.getenv("DATA_DIR", "data")
     output_dir = os.getenv("OUTPUT_DIR", "output")
-    os.makedirs(output_dir, exist_ok=True)
+    chunk_dir = os.path.join(output_dir, "trades")
+    os.makedirs(chunk_dir, exist_ok=True)
 
     csv_files = sorted(glob.glob(os.path.join(data_dir, "*.csv")))
+    metrics_path = os.path.join(output_dir, "metrics.json")
+    trades_path = os.path.join(output_dir, "trades.csv")
+
+    results: dict[str, dict[str, Any]] = {}
+
+    def summary() -> dict[str, Any]:
+        # Input order, so a symbol split over several files reports the last one, as before.
+        done = [results[csv_file] for csv_file in csv_files if csv_file in results]
+        return {
+            "symbols": {result["symbol"]: result["metrics"] for result in done},
+            "timing_seconds": {result["symbol"]: result["seconds"] for result in done},
+        }
+
+    def record(result: dict[str, Any]) -> None:
+        results[result["source"]] = result
+        _write_json(metrics_path, summary())
+        print(f"{result['symbol']}: {result['metrics']['trades']} trades in {result['seconds']:.2f}s "
+              f"({len(results)}/{len(csv_files)})")
+
+    started = time.perf_counter()
+    workers = _worker_count(len(csv_files))
+    if workers == 1:
+        for csv_file in csv_files:
+            record(run_symbol(csv_file, chunk_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_symbol, csv_file, chunk_dir) for csv_file in csv_files]
+            for future in as_completed(futures):
+                record(future.result())
+
+    ordered = [results[csv_file]["trades_path"] for csv_file in csv_files]
+    if ordered:
+        _concat_trade_chunks(ordered, trades_path)
+    else:
+        trades_to_frame([], symbol=None).to_csv(trades_path, index=False)
 
-    all_trade_frames: list[pd.DataFrame] = []
-    per_symbol: dict[str, Any] = {}
-
-    for csv_file in csv_files:
-        base = os.path.splitext(os.path.basename(csv_file))[0].upper()
-        symbol = base.replace("_5M", "") if base.endswith("_5M") else base
-        df = pd.read_csv(csv_file)
-        candles = candles_from_dataframe(df, tz_name="UTC")
-        trades = run_backtest(candles, strategy=LockedStreakPullbackStrategy(allow_long=True, allow_short=True))
-        all_trade_frames.append(trades_to_frame(trades, symbol=symbol))
-        per_symbol[symbol] = compute_metrics(trades)
-
-    trades_out = (
-        pd.concat(all_trade_frames, ignore_index=True)
-        if all_trade_frames
-        else trades_to_frame([], symbol=None)
-    )
-    trades_out.to_csv(os.path.join(output_dir, "trades.csv"), index=False)
-
-    metrics_out = {"symbols": per_symbol}
-    with open(os.path.join(output_dir, "metrics.json"), "w", encoding="utf-8") as f:
-        json.dump(metrics_out, f, indent=2, sort_keys=True)
+    _write_json(metrics_path, summary())
+    print(f"{len(csv_files)} symbols on {workers} worker(s) in {time.perf_counter() - started:.2f}s")
 
 
 if __name__ == "__main__":
@@ -7,14 +7,13 @@ from typing import Final
 import numpy as np
 import pandas as pd
 
+from backend.market_data.candle_store import candle_store, file_version
 from bot.backtest import candles_from_dataframe
 
 _ROOT: Final[str] = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 _FOREX_DIR: Final[str] = os.path.join(_ROOT, "data", "forex")
 _FOREX_SUFFIX: Final[str] = "_5m.csv"
 
-_CANDLE_CACHE: dict[str, pd.DataFrame] = {}
-
 
 def available_forex_pairs() -> list[str]:
     if not os.path.isdir(_FOREX_DIR):
@@ -37,18 +36,18 @@ def load_forex_candles(pair: str) -> pd.DataFrame:
     if not sym:
         raise ValueError("Missing pair")
 
-    if sym in _CANDLE_CACHE:
-        return _CANDLE_CACHE[sym]
-
     path = os.path.join(_FOREX_DIR, f"{sym}{_FOREX_SUFFIX}")
-    if not os.path.exists(path):
+    version = file_version(path)
+    if version is None:
         raise FileNotFoundError(f"No internal forex CSV found for {sym} at {_FOREX_DIR}")
 
+    return candle_store.get(("bot_forex", sym), version, lambda: _read_forex_candles(path, sym))
+
+
+def _read_forex_candles(path: str, symbol: str) -> pd.DataFrame:
     raw = pd.read_csv(path)
     candles = candles_from_dataframe(raw, tz_name="UTC")
-    _validate_5m_time_index(candles, symbol=sym)
-
-    _CANDLE_CACHE[sym] = candles
+    _validate_5m_time_index(candles, symbol=symbol)
     return candles
 
 
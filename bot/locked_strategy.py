@@ -7,6 +7,7 @@ import numpy as np
 import pandas as pd
 
 from bot.backtest import Trade
+from bot.targets import find_first_touch
 
 
 @dataclass(frozen=True)
@@ -18,7 +19,8 @@ class LockedStreakPullbackStrategy:
         if candles is None or candles.empty:
             return []
 
-        times = pd.to_datetime(candles["time"], utc=True, errors="coerce").to_numpy()
+        # Only entry/exit bars need a Timestamp; don't box every bar into an object array.
+        times = pd.to_datetime(candles["time"], utc=True, errors="coerce").reset_index(drop=True)
         open_ = candles["open"].to_numpy(dtype="float64")
         high = candles["high"].to_numpy(dtype="float64")
         low = candles["low"].to_numpy(dtype="float64")
@@ -118,15 +120,15 @@ class LockedStreakPullbackStrategy:
                 i = confirm_idx + 1
                 continue
 
-            entry_time = pd.Timestamp(times[confirm_idx]).tz_convert("UTC")
+            entry_time = pd.Timestamp(times.iloc[confirm_idx]).tz_convert("UTC")
             entry_price = float(close[confirm_idx])
             direction = "long" if streak_dir == 1 else "short"
 
-            exit_idx = _find_first_touch_after(low, high, target=target, start_idx=confirm_idx + 1)
+            exit_idx = find_first_touch(low, high, target, start_idx=confirm_idx + 1)
             if exit_idx is None:
                 break  # No overlap: an open trade blocks any further setups
 
-            exit_time = pd.Timestamp(times[exit_idx]).tz_convert("UTC")
+            exit_time = pd.Timestamp(times.iloc[exit_idx]).tz_convert("UTC")
             exit_price = float(target)
 
             explanation = _explain_trade(
@@ -162,13 +164,6 @@ class LockedStreakPullbackStrategy:
         return trades
 
 
-def _find_first_touch_after(low: np.ndarray, high: np.ndarray, target: float, start_idx: int) -> int | None:
-    for k in range(int(start_idx), int(len(low))):
-        if float(low[k]) <= target <= float(high[k]):
-            return int(k)
-    return None
-
-
 def _explain_trade(
     *,
     direction: str,
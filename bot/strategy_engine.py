@@ -1,289 +1,144 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import Enum
-from typing import Final, List, Literal
+from operator import itemgetter
+from typing import List, Literal, Union
 
+import numpy as np
 
-TradeDirection = Literal["BUY", "SELL"]
-SetupDirection = TradeDirection
-
+from backend.market_data.candle_array import CandleArray
+from bot.targets import find_first_touch
 
-class _State(str, Enum):
-    SEEK_STREAK = "SEEK_STREAK"
-    IN_STREAK = "IN_STREAK"
-    IN_PULLBACK = "IN_PULLBACK"
-    AWAIT_CONFIRMATION = "AWAIT_CONFIRMATION"
 
-
-@dataclass(frozen=True)
-class _PendingSetup:
-    streak_dir: int  # 1 bullish, -1 bearish
-    streak_length: int
-    pullback_start_idx: int
-    pullback_length: int
-    target: float
-    breaking_candle_time: int
+TradeDirection = Literal["BUY", "SELL"]
+SetupDirection = TradeDirection
+CandleInput = Union[List[dict], CandleArray]
 
 
-def generate_trades(candles: List[dict]) -> List[dict]:
+def generate_trades(candles: CandleInput) -> List[dict]:
     trades, _setups = generate_trades_and_setups(candles)
     return trades
 
 
-def generate_trades_and_setups(candles: List[dict]) -> tuple[List[dict], List[dict]]:
+def generate_trades_and_setups(candles: CandleInput) -> tuple[List[dict], List[dict]]:
     """
     Locked Forex 5-minute strategy engine.
 
     Input candles are assumed validated (time-sorted, continuous 300s steps, correct fields).
+    A list of candle dicts or a CandleArray is accepted.
 
     Returns:
       - executed/closed trades ONLY in the required normalized dict format
       - strategy setups for visualization (setups are not trades)
+
+    Rules (the original per-candle state machine, evaluated on direction runs):
+      - a streak is >= 4 consecutive candles of one direction; a doji ends it
+      - the pullback is 1-2 opposite candles; a 3rd opposite candle starts a new streak there
+      - the breaking candle is the next candle in the streak direction; the setup is discarded
+        when the pullback breaches the last streak candle's open (emitted only if it doesn't)
+        or the breaking close fails the target test
+      - the confirmation candle must be the very next candle, in the streak direction; entry is
+        at its close and the exit is the first later candle whose range touches the target
+      - trades never overlap: scanning resumes after the exit candle, possibly mid-run
+
+    Every streak therefore starts at a run boundary or at the resume point, so setups can be
+    enumerated from the run-length encoding and evaluated in bulk; only the resume point is
+    sequential.
     """
-    if not candles:
+    if len(candles) == 0:
         return [], []
 
-    trades: list[dict] = []
-    setups: list[dict] = []
-    n: Final[int] = len(candles)
-
-    state: _State = _State.SEEK_STREAK
-
-    streak_dir: int = 0
-    streak_start_idx: int = 0
-    streak_length: int = 0
-
-    lsc_idx: int | None = None
-    setup_streak_length: int | None = None
-    pullback_start_idx: int | None = None
-    pullback_length: int | None = None
-
-    pending: _PendingSetup | None = None
-
-    i = 0
-    while i < n:
-        candle = candles[i]
-        c_dir = _candle_dir(candle)
-
-        if state == _State.SEEK_STREAK:
-            if c_dir == 0:
-                i += 1
-                continue
-            streak_dir = c_dir
-            streak_start_idx = i
-            streak_length = 1
-            state = _State.IN_STREAK
-            i += 1
-            continue
-
-        if state == _State.IN_STREAK:
-            if c_dir == streak_dir:
-                streak_length += 1
-                i += 1
-                continue
-
-            if c_dir == 0:
-                state = _State.SEEK_STREAK
-                i += 1
-                continue
-
-            # Opposite candle encountered
-            if streak_length >= 4:
-                lsc_idx = i - 1
-                setup_streak_length = streak_length
-                pullback_start_idx = i
-                pullback_length = 1
-                state = _State.IN_PULLBACK
-                i += 1
-                continue
-
-            # Streak too short -> start a new streak from this candle
-            streak_dir = c_dir
-            streak_start_idx = i
-            streak_length = 1
-            i += 1
-            continue
-
-        if state == _State.IN_PULLBACK:
-            assert lsc_idx is not None
-            assert setup_streak_length is not None
-            assert pullback_start_idx is not None
-            assert pullback_length is not None
-
-            if c_dir == 0:
-                # Doji invalidates setup
-                state = _State.SEEK_STREAK
-                i += 1
-                continue
-
-            if c_dir == -streak_dir:
-                # Extend pullback (max 2)
-                if pullback_length == 1:
-                    pullback_length = 2
-                    i += 1
-                    continue
-
-                # 3rd opposite candle -> pullback too long; discard setup and roll into new streak from pullback start
-                streak_dir = c_dir
-                streak_start_idx = pullback_start_idx
-                streak_length = pullback_length + 1
-                state = _State.IN_STREAK
-                i += 1
-                continue
-
-            # Pullback ended; current candle is breaking candle (must be same direction as the original streak)
-            if c_dir != streak_dir:
-                # Defensive: should not happen with the candle_dir tri-state, but keep strict.
-                state = _State.SEEK_STREAK
-                i += 1
-                continue
-
-            pullback = candles[pullback_start_idx : pullback_start_idx + pullback_length]
-            lsc = candles[lsc_idx]
-
-            if _pullback_invalid(streak_dir=streak_dir, lsc_open=lsc["open"], pullback=pullback):
-                # Discard setup; start new streak from this candle
-                streak_dir = c_dir
-                streak_start_idx = i
-                streak_length = 1
-                state = _State.IN_STREAK
-                i += 1
-                continue
-
-            target = _compute_target(
-                streak_dir=streak_dir,
-                lsc_high=lsc["high"],
-                lsc_low=lsc["low"],
-                pullback=pullback,
-            )
-
-            setups.append(
-                {
-                    "time": int(candle["time"]),
-                    "direction": "BUY" if streak_dir == 1 else "SELL",
-                    "streak_length": int(setup_streak_length),
-                    "pullback_length": int(pullback_length),
-                    "target": float(target),
-                }
-            )
+    times, opens, highs, lows, closes = _candle_arrays(candles)
+    dirs = (closes > opens).astype("int8") - (closes < opens).astype("int8")
+    run_starts, run_lens, run_dirs = _runs(dirs)
+
+    # Candidate = streak run r, pullback run r + 1 (opposite, 1-2 candles), breaking run r + 2.
+    streak_dirs = run_dirs[:-2]
+    candidates = np.flatnonzero(
+        (streak_dirs != 0)
+        & (run_lens[:-2] >= 4)
+        & (run_dirs[1:-1] == -streak_dirs)
+        & (run_lens[1:-1] <= 2)
+        & (run_dirs[2:] == streak_dirs)
+    )
+    if candidates.size == 0:
+        return [], []
 
-            if not _breaking_condition(streak_dir=streak_dir, close_price=candle["close"], target=target):
-                # Discard setup; start new streak from this candle
-                streak_dir = c_dir
-                streak_start_idx = i
-                streak_length = 1
-                state = _State.IN_STREAK
-                i += 1
-                continue
+    bullish = run_dirs[candidates] == 1
+    streak_start = run_starts[candidates]
+    pb_start = run_starts[candidates + 1]
+    pb_length = run_lens[candidates + 1]
+    pb_last = pb_start + pb_length - 1
+    breaking = run_starts[candidates + 2]
+    lsc = pb_start - 1
+
+    pb_low = np.minimum(lows[pb_start], lows[pb_last])
+    pb_high = np.maximum(highs[pb_start], highs[pb_last])
+    invalid = np.where(bullish, pb_low < opens[lsc], pb_high > opens[lsc])
+
+    mid = (highs[lsc] + lows[lsc]) / 2.0
+    touched = ((lows[pb_start] <= mid) & (mid <= highs[pb_start])) | ((lows[pb_last] <= mid) & (mid <= highs[pb_last]))
+    targets = np.where(touched, np.where(bullish, lows[lsc], highs[lsc]), np.where(bullish, pb_low, pb_high))
+    breaks = np.where(bullish, closes[breaking] < targets, closes[breaking] > targets)
+    # The confirmation candle is in the streak direction iff the breaking run continues.
+    confirmed = run_lens[candidates + 2] >= 2
 
-            pending = _PendingSetup(
-                streak_dir=streak_dir,
-                streak_length=setup_streak_length,
-                pullback_start_idx=pullback_start_idx,
-                pullback_length=pullback_length,
-                target=target,
-                breaking_candle_time=int(candle["time"]),
-            )
-            state = _State.AWAIT_CONFIRMATION
-            i += 1
+    trades: list[dict] = []
+    setups: list[dict] = []
+    resume = 0
+    for k in range(len(candidates)):
+        streak_length = int(pb_start[k]) - max(int(streak_start[k]), resume)
+        if streak_length < 4 or invalid[k]:
             continue
 
-        if state == _State.AWAIT_CONFIRMATION:
-            assert pending is not None
-
-            # Confirmation candle must be NEXT candle only and must match original streak direction.
-            if c_dir != pending.streak_dir:
-                # Discard setup permanently; this candle may start a new streak.
-                if c_dir == 0:
-                    state = _State.SEEK_STREAK
-                    i += 1
-                    continue
-
-                streak_dir = c_dir
-                streak_start_idx = i
-                streak_length = 1
-                state = _State.IN_STREAK
-                i += 1
-                continue
-
-            # Entry at close of confirmation candle.
-            entry_time = int(candle["time"])
-            entry_price = float(candle["close"])
-            direction: TradeDirection = "BUY" if pending.streak_dir == 1 else "SELL"
-
-            exit_idx = _find_first_target_touch(candles, start_idx=i + 1, target=pending.target)
-            if exit_idx is None:
-                # Entry happened; exit never happens -> do not include the trade, and no overlap blocks further trades.
-                return trades, setups
-
-            exit_candle = candles[exit_idx]
-            trades.append(
-                {
-                    "direction": direction,
-                    "streak_length": int(pending.streak_length),
-                    "pullback_length": int(pending.pullback_length),
-                    "target": float(pending.target),
-                    "breaking_candle_time": int(pending.breaking_candle_time),
-                    "entry": {"time": entry_time, "price": entry_price},
-                    "exit": {"time": int(exit_candle["time"]), "price": float(pending.target)},
-                }
-            )
-
-            # No overlap: resume scanning after the exit candle.
-            pending = None
-            state = _State.SEEK_STREAK
-            i = exit_idx + 1
+        direction: TradeDirection = "BUY" if bullish[k] else "SELL"
+        target = float(targets[k])
+        breaking_time = int(times[breaking[k]])
+        setups.append(
+            {
+                "time": breaking_time,
+                "direction": direction,
+                "streak_length": streak_length,
+                "pullback_length": int(pb_length[k]),
+                "target": target,
+            }
+        )
+        if not (breaks[k] and confirmed[k]):
             continue
 
-        raise RuntimeError(f"Unknown state: {state}")
+        # Entry at close of confirmation candle.
+        entry_idx = int(breaking[k]) + 1
+        exit_idx = find_first_touch(lows, highs, target, start_idx=entry_idx + 1)
+        if exit_idx is None:
+            # Entry happened; exit never happens -> do not include the trade, and no overlap blocks further trades.
+            return trades, setups
+
+        trades.append(
+            {
+                "direction": direction,
+                "streak_length": streak_length,
+                "pullback_length": int(pb_length[k]),
+                "target": target,
+                "breaking_candle_time": breaking_time,
+                "entry": {"time": int(times[entry_idx]), "price": float(closes[entry_idx])},
+                "exit": {"time": int(times[exit_idx]), "price": target},
+            }
+        )
+        # No overlap: resume scanning after the exit candle.
+        resume = exit_idx + 1
 
     return trades, setups
 
 
-def _candle_dir(c: dict) -> int:
-    o = c["open"]
-    cl = c["close"]
-    if cl > o:
-        return 1
-    if cl < o:
-        return -1
-    return 0
-
-
-def _pullback_invalid(*, streak_dir: int, lsc_open: float, pullback: list[dict]) -> bool:
-    if streak_dir == 1:
-        pb_low = min(float(x["low"]) for x in pullback)
-        return pb_low < float(lsc_open)
-    pb_high = max(float(x["high"]) for x in pullback)
-    return pb_high > float(lsc_open)
-
-
-def _compute_target(*, streak_dir: int, lsc_high: float, lsc_low: float, pullback: list[dict]) -> float:
-    mid = (float(lsc_high) + float(lsc_low)) / 2.0
-    touched = any(float(pb["low"]) <= mid <= float(pb["high"]) for pb in pullback)
-
-    if touched:
-        return float(lsc_low) if streak_dir == 1 else float(lsc_high)
-
-    if streak_dir == 1:
-        return min(float(pb["low"]) for pb in pullback)
-    return max(float(pb["high"]) for pb in pullback)
-
-
-def _breaking_condition(*, streak_dir: int, close_price: float, target: float) -> bool:
-    close_val = float(close_price)
-    tgt = float(target)
-    if streak_dir == 1:
-        return close_val < tgt
-    return close_val > tgt
+def _candle_arrays(candles: CandleInput) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    if isinstance(candles, CandleArray):
+        return candles.time, candles.open, candles.high, candles.low, candles.close
+    times = np.fromiter(map(itemgetter("time"), candles), dtype="int64", count=len(candles))
+    prices = np.array(list(map(itemgetter("open", "high", "low", "close"), candles)), dtype="float64").T
+    return times, prices[0], prices[1], prices[2], prices[3]
 
 
-def _find_first_target_touch(candles: List[dict], *, start_idx: int, target: float) -> int | None:
-    tgt = float(target)
-    for k in range(int(start_idx), len(candles)):
-        low = float(candles[k]["low"])
-        high = float(candles[k]["high"])
-        if low <= tgt <= high:
-            return k
-    return None
+def _runs(dirs: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run-length encoding of ``dirs``: (start index, length, value) per run."""
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(dirs)) + 1))
+    lengths = np.diff(np.append(starts, len(dirs)))
+    return starts, lengths, dirs[starts]
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from typing import Final
+
+import numpy as np
+
+# First window of the touch search; it doubles after every miss.
+TOUCH_WINDOW: Final[int] = 64
+
+
+def find_first_touch(low: np.ndarray, high: np.ndarray, target: float, start_idx: int) -> int | None:
+    """
+    Index of the first bar at or after ``start_idx`` whose [low, high] range contains ``target``.
+
+    The series is scanned in NumPy blocks of doubling size (64, 128, 256, ...), so a touch
+    ``d`` bars away costs O(d) vectorized work and a target that is never hit costs one
+    vectorized pass over the remainder instead of a Python-level loop.
+    """
+    tgt = float(target)
+    n = int(len(low))
+    lo = max(0, int(start_idx))
+    width = TOUCH_WINDOW
+    while lo < n:
+        hi = min(n, lo + width)
+        hits = (low[lo:hi] <= tgt) & (high[lo:hi] >= tgt)
+        first = int(np.argmax(hits))
+        if hits[first]:
+            return lo + first
+        lo = hi
+        width *= 2
+    return None
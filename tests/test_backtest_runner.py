@@ -0,0 +1,57 @@
+import json
+import shutil
+from pathlib import Path
+import sys
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+import backtest_runner
+
+FOREX_DIR = ROOT / "data" / "forex"
+
+
+@pytest.mark.skipif(not FOREX_DIR.exists(), reason="bundled forex data not available")
+def test_parallel_runner_matches_sequential_output(tmp_path: Path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name in ("EURUSD_5m.csv", "GBPUSD_5m.csv", "USDCHF_5m.csv"):
+        shutil.copy(FOREX_DIR / name, data_dir / name)
+    monkeypatch.setenv("DATA_DIR", str(data_dir))
+
+    outputs = {}
+    for workers in ("1", "3"):
+        monkeypatch.setenv("BACKTEST_WORKERS", workers)
+        monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / f"out{workers}"))
+        backtest_runner.main()
+        outputs[workers] = tmp_path / f"out{workers}"
+
+    sequential, parallel = outputs["1"], outputs["3"]
+    assert (sequential / "trades.csv").read_bytes() == (parallel / "trades.csv").read_bytes()
+    metrics = json.loads((parallel / "metrics.json").read_text())
+    assert metrics["symbols"] == json.loads((sequential / "metrics.json").read_text())["symbols"]
+    assert set(metrics["timing_seconds"]) == {"EURUSD", "GBPUSD", "USDCHF"}
+    assert sorted(p.name for p in (parallel / "trades").iterdir()) == ["EURUSD_5m.csv", "GBPUSD_5m.csv", "USDCHF_5m.csv"]
+
+
+@pytest.mark.skipif(not FOREX_DIR.exists(), reason="bundled forex data not available")
+def test_files_sharing_a_symbol_keep_both_trade_sets(tmp_path: Path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    lines = (FOREX_DIR / "EURUSD_5m.csv").read_text().splitlines(keepends=True)
+    (data_dir / "EURUSD_5m.csv").write_text("".join(lines[:6001]))
+    (data_dir / "eurusd.csv").write_text("".join(lines[:1] + lines[6001:12001]))
+    monkeypatch.setenv("DATA_DIR", str(data_dir))
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path / "out"))
+    monkeypatch.setenv("BACKTEST_WORKERS", "2")
+
+    backtest_runner.main()
+
+    chunks = sorted((tmp_path / "out" / "trades").iterdir())
+    assert [p.name for p in chunks] == ["EURUSD_5m.csv", "eurusd.csv"]
+    chunk_rows = [len(p.read_text().splitlines()) - 1 for p in chunks]
+    assert all(rows > 0 for rows in chunk_rows)
+    trades = (tmp_path / "out" / "trades.csv").read_text().splitlines()
+    assert len(trades) - 1 == sum(chunk_rows)
@@ -0,0 +1,58 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.backtesting.batch import pool_context, run_batch_backtest
+from backend.data_providers.data_manager import DataManager
+from backend.server import app
+from backend.strategy_engine import run_strategy
+from backend.utils.helpers import clean_data
+
+CONFIG = {"strategy": "ma_crossover", "parameters": {"fast_period": 3, "slow_period": 8, "ma_type": "SMA"}}
+
+
+def _write_dataset(directory: Path, name: str, drift: float) -> None:
+    rows = []
+    for i in range(300):
+        price = 100 + drift * i + (5 if (i // 20) % 2 else -5)
+        rows.append(f"{1700000100 + 60 * i},{price},{price + 1},{price - 1},{price + 0.5},10")
+    (directory / f"{name}.csv").write_text("time,open,high,low,close,volume\n" + "\n".join(rows) + "\n")
+
+
+def test_batch_backtest_matches_single_runs_and_reports_failures(tmp_path: Path):
+    _write_dataset(tmp_path, "up", 0.1)
+    _write_dataset(tmp_path, "down", -0.1)
+    manager = DataManager()
+    manager.datasets_dir = tmp_path
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=pool_context()) as pool:
+        batch = run_batch_backtest(
+            CONFIG,
+            [("up", "5m"), ("down", "5m"), ("missing", "5m")],
+            share=manager.share_candles,
+            pool=pool,
+        )
+
+    results = {r["dataset_id"]: r for r in batch["results"]}
+    for name in ("up", "down"):
+        expected = clean_data(run_strategy(manager.load_candles(name, "5m"), CONFIG))["metrics"]
+        assert results[name]["status"] == "ok"
+        assert results[name]["metrics"] == expected
+        assert results[name]["bars"] == 60
+        assert "candles" not in results[name]
+    assert results["missing"]["status"] == "error"
+
+    aggregate = batch["aggregate"]
+    assert (aggregate["succeeded"], aggregate["failed"]) == (2, 1)
+    returns = [row["total_return"] for row in aggregate["table"]]
+    assert returns == sorted(returns, reverse=True)
+
+
+def test_batch_endpoint_rejects_empty_dataset_list():
+    response = TestClient(app).post("/run-backtest/batch", json={"dataset_ids": [], "config": CONFIG})
+
+    assert response.status_code == 400
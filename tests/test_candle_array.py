@@ -0,0 +1,71 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data.candle_array import CandleArray, as_candle_array
+from backend.market_data.candle_store import candle_store
+from backend.market_data.csv_dataset_loader import dataframe_to_candles, load_dataset_candles, load_dataset_frame
+from backend.market_data.downsampling import downsample_candles
+from backend.market_data.pagination import paginate_candles
+from backend.setups.trade_setup_store import build_trade_setups
+
+
+def _candles(n: int = 50) -> list[dict]:
+    return [
+        {"time": 60 * i, "open": 1.0 + i, "high": 2.0 + i, "low": 0.5 + i, "close": 1.5 + i, "volume": float(i)}
+        for i in range(n)
+    ]
+
+
+def test_candle_array_round_trips_dicts_and_matches_the_old_frame():
+    candles = _candles()
+    array = CandleArray.from_candles(candles)
+
+    assert len(array) == 50
+    assert array.to_candles() == candles
+    assert array[3] == candles[3]
+    assert array[-1] == candles[-1]
+    assert list(array[10:12]) == candles[10:12]
+    assert array.time.dtype == np.int64 and array.close.dtype == np.float64
+    assert array.nbytes == 50 * 48
+    pd.testing.assert_frame_equal(array.to_dataframe(), pd.DataFrame(candles))
+
+
+def test_candle_array_between_and_float32():
+    array = CandleArray.from_candles(_candles())
+
+    window = array.between(120, 300)
+    assert window.time.tolist() == [120, 180, 240, 300]
+    assert len(array.between(10_000, None)) == 0
+
+    compact = array.astype("float32")
+    assert compact.close.dtype == np.float32 and compact.time.dtype == np.int64
+    assert compact.nbytes < array.nbytes
+
+
+def test_dataset_loader_returns_arrays_equal_to_dict_path(tmp_path: Path):
+    rows = "\n".join(f"{1700000100 + 60 * i},{1 + i},{2 + i},{0.5 + i},{1.5 + i},{i}" for i in range(30))
+    (tmp_path / "demo.csv").write_text("time,open,high,low,close,volume\n" + rows + "\n")
+
+    array = load_dataset_candles("demo", tmp_path, "5m")
+
+    assert isinstance(array, CandleArray)
+    assert array.to_candles() == dataframe_to_candles(load_dataset_frame("demo", tmp_path, "5m"))
+    assert array[0]["open"] == 1.0 and array[0]["high"] == 6.0
+    candle_store.invalidate()
+
+
+def test_json_edge_helpers_accept_arrays_and_lists():
+    candles = _candles(100)
+    array = as_candle_array(candles)
+
+    assert paginate_candles(array, count=20) == paginate_candles(candles, count=20)
+    assert downsample_candles(array, 10) == downsample_candles(candles, 10)
+    assert downsample_candles(array, None) == candles
+
+    signals = [{"time": 125, "price": None}]
+    assert build_trade_setups(array, signals, []) == build_trade_setups(candles, signals, [])
@@ -0,0 +1,112 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data.pagination import page_bounds, paginate_candles, window_bounds
+from backend.server import app
+
+
+def _candles(n, step=60, start=1_000):
+    return [
+        {"time": start + i * step, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 0.0}
+        for i in range(n)
+    ]
+
+
+def test_page_bounds_walks_backwards_and_forwards():
+    times = np.arange(0, 100, dtype="int64") * 60
+
+    assert page_bounds(times, count=10) == (90, 100)
+    assert page_bounds(times, before=90 * 60, count=10) == (80, 90)
+    assert page_bounds(times, after=9 * 60, count=5) == (10, 15)
+    assert page_bounds(times, before=5 * 60, count=10) == (0, 5)
+
+
+def test_window_bounds_adds_prefetch_margin_on_both_sides():
+    times = np.arange(0, 100, dtype="int64") * 60
+
+    assert window_bounds(times, window_start=40 * 60, window_end=49 * 60, prefetch=5) == (35, 55)
+    assert window_bounds(times, window_start=0, window_end=60, prefetch=5) == (0, 7)
+
+
+def test_paginate_candles_returns_cursors_for_neighbouring_pages():
+    candles = _candles(50)
+
+    page = paginate_candles(candles, count=20)
+    assert [c["time"] for c in page["candles"]] == [c["time"] for c in candles[30:]]
+    assert page["has_more_before"] is True
+    assert page["has_more_after"] is False
+    assert page["next_before"] == candles[30]["time"]
+    assert page["next_after"] is None
+
+    older = paginate_candles(candles, before=page["next_before"], count=20)
+    assert [c["time"] for c in older["candles"]] == [c["time"] for c in candles[10:30]]
+    assert older["next_after"] == candles[29]["time"]
+
+
+def test_dataset_candles_endpoint_supports_cursor_pages(tmp_path, monkeypatch):
+    rows = ["time,open,high,low,close,volume"]
+    rows += [f"{1_700_000_000 + i * 60},1.0,1.1,0.9,1.05,10" for i in range(30)]
+    (tmp_path / "demo.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+    monkeypatch.setattr("backend.api.dataset_routes.DATASETS_DIR", str(tmp_path))
+
+    client = TestClient(app)
+
+    legacy = client.get("/dataset/demo/candles", params={"timeframe": "1m"})
+    assert legacy.status_code == 200
+    assert len(legacy.json()) == 30
+
+    response = client.get("/dataset/demo/candles", params={"timeframe": "1m", "count": 10})
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["candles"]) == 10
+    assert page["total"] == 30
+    assert page["candles"][0]["time"] == 1_700_000_000 + 20 * 60
+
+    previous = client.get(
+        "/dataset/demo/1m",
+        params={"before": page["next_before"], "count": 10},
+    ).json()
+    assert previous["candles"][-1]["time"] == page["candles"][0]["time"] - 60
+
+
+def test_market_data_rejects_invalid_page_size(tmp_path, monkeypatch):
+    rows = ["time,open,high,low,close,volume"]
+    rows += [f"{1_700_000_000 + i * 60},1.0,1.1,0.9,1.05,10" for i in range(30)]
+    (tmp_path / "bad-count.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+    from backend.data_providers.data_manager import data_manager
+    monkeypatch.setattr(data_manager, "datasets_dir", tmp_path)
+
+    client = TestClient(app)
+
+    response = client.get("/market-data", params={"symbol": "bad-count", "timeframe": "1m", "count": 0})
+    assert response.status_code == 400
+    assert client.get("/market-data", params={"symbol": "bad-count", "timeframe": "1m", "count": 5}).status_code == 200
+
+
+def test_downsampled_pages_walk_forward_without_overlap(tmp_path, monkeypatch):
+    rows = ["time,open,high,low,close,volume"]
+    rows += [f"{1_700_000_000 + i * 60},1.0,1.1,0.9,1.05,10" for i in range(95)]
+    (tmp_path / "walk.csv").write_text("\n".join(rows) + "\n", encoding="utf-8")
+    monkeypatch.setattr("backend.api.dataset_routes.DATASETS_DIR", str(tmp_path))
+
+    client = TestClient(app)
+
+    times, volume, cursor, pages = [], 0.0, 1_700_000_000 - 1, 0
+    while cursor is not None:
+        page = client.get("/dataset/walk/1m", params={"after": cursor, "count": 20, "max_points": 3}).json()
+        assert len(page["candles"]) <= 3
+        times += [candle["time"] for candle in page["candles"]]
+        volume += sum(candle["volume"] for candle in page["candles"])
+        cursor, pages = page["next_after"], pages + 1
+        if cursor is not None:
+            # The cursor is the last raw bar of the page, not the start of its last bucket.
+            assert (cursor - 1_700_000_000) % (20 * 60) == 19 * 60
+
+    assert pages == 5
+    assert times == sorted(set(times))
+    assert volume == 95 * 10
@@ -0,0 +1,55 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data.candle_store import CandleStore, candle_store
+from backend.market_data.csv_dataset_loader import load_dataset_frame
+
+
+def test_candle_store_evicts_least_recently_used_by_bytes():
+    store = CandleStore(max_bytes=2_000)
+    loads = []
+
+    def loader(name):
+        def load():
+            loads.append(name)
+            return np.zeros(100)  # 800 bytes
+        return load
+
+    store.get("a", 1, loader("a"))
+    store.get("b", 1, loader("b"))
+    store.get("a", 1, loader("a"))
+    store.get("c", 1, loader("c"))  # evicts "b", the least recently used
+
+    assert loads == ["a", "b", "c"]
+    assert store.peek("b", 1) is None
+    assert store.peek("a", 1) is not None
+    stats = store.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 1_600 and stats["evictions"] == 1
+
+
+def test_candle_store_reloads_on_new_version_and_skips_oversized_values():
+    store = CandleStore(max_bytes=1_000)
+
+    first = store.get("a", 1, lambda: np.zeros(10))
+    assert store.get("a", 1, lambda: np.ones(10)) is first
+    assert store.get("a", 2, lambda: np.ones(10))[0] == 1.0
+    assert store.stats()["invalidations"] == 1
+
+    store.get("big", 1, lambda: np.zeros(1_000))
+    assert store.peek("big", 1) is None
+
+
+def test_dataset_frames_are_shared_until_the_file_changes(tmp_path: Path):
+    csv_path = tmp_path / "demo.csv"
+    csv_path.write_text("time,open,high,low,close\n60,1,2,0.5,1.5\n120,1.5,2,1,1.8\n")
+
+    first = load_dataset_frame("demo", tmp_path, "1m")
+    assert load_dataset_frame("demo", tmp_path, "1m") is first
+
+    csv_path.write_text("time,open,high,low,close\n60,1,2,0.5,1.5\n")
+    assert len(load_dataset_frame("demo", tmp_path, "1m")) == 1
+    candle_store.invalidate()
@@ -0,0 +1,170 @@
+import hashlib
+import io
+from pathlib import Path
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from fastapi import HTTPException
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data import csv_dataset_loader, dataset_formats
+from backend.market_data.columnar_cache import get_cache_path, read_dataframe_cache, write_dataframe_cache
+from backend.market_data.csv_dataset_loader import load_dataset_summary
+from backend.market_data.dataset_ingest import CsvChunkIngestor, create_ingestor
+from backend.market_data.dataset_metadata import read_dataset_metadata, write_dataset_metadata
+from backend.market_data.dataset_normalizer import load_dataset_dataframe, normalize_dataset_dataframe
+
+
+def _csv_bytes(rows: int, shuffle: bool = False) -> bytes:
+    frame = pd.DataFrame({
+        "time": 1_700_000_000 + 300 * pd.RangeIndex(rows),
+        "open": 1.0,
+        "high": 2.0,
+        "low": 0.5,
+        "close": [1.0 + i / 1000 for i in range(rows)],
+        "Pattern Alert": "",
+        "Volume": 10.0,
+    })
+    if shuffle:
+        frame = pd.concat([frame, frame.iloc[[3]]]).sample(frac=1.0, random_state=7)
+    return frame.to_csv(index=False).encode()
+
+
+def _ingest(payload: bytes, tmp_path: Path, piece: int = 97) -> dict:
+    ingestor = CsvChunkIngestor("demo", tmp_path, chunk_bytes=256)
+    for offset in range(0, len(payload), piece):
+        ingestor.feed(payload[offset:offset + piece])
+    return ingestor.finish()
+
+
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_chunked_ingest_matches_full_normalization(tmp_path: Path, shuffle: bool):
+    payload = _csv_bytes(500, shuffle=shuffle)
+
+    summary = _ingest(payload, tmp_path)
+
+    expected = normalize_dataset_dataframe(pd.read_csv(tmp_path / "demo.csv"))
+    assert (tmp_path / "demo.csv").read_bytes() == payload
+    assert get_cache_path("demo", tmp_path).exists()
+    assert summary["rows"] == len(expected) == 500
+    assert summary["step_seconds"] == 300
+    assert summary["start"] == expected["timestamp"].iloc[0].isoformat()
+    pd.testing.assert_frame_equal(load_dataset_dataframe("demo", tmp_path), expected)
+
+
+def test_chunked_ingest_reports_invalid_rows_with_file_offsets(tmp_path: Path):
+    payload = _csv_bytes(200).replace(b",1.15,", b",oops,", 1)
+    ingestor = CsvChunkIngestor("demo", tmp_path, chunk_bytes=256)
+
+    with pytest.raises(HTTPException) as excinfo:
+        ingestor.feed(payload)
+        ingestor.finish()
+    ingestor.abort()
+
+    assert "[150]" in excinfo.value.detail
+    assert not (tmp_path / "demo.csv").exists()
+
+
+def test_chunked_ingest_rejects_missing_columns_from_header(tmp_path: Path):
+    ingestor = CsvChunkIngestor("demo", tmp_path)
+    with pytest.raises(HTTPException) as excinfo:
+        ingestor.feed(b"time,open,close\n")
+        ingestor.finish()
+    assert "Missing required columns" in excinfo.value.detail
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_columnar_upload_round_trips_and_filters_by_range(tmp_path: Path, suffix: str):
+    raw = pd.read_csv(io.BytesIO(_csv_bytes(300)))
+    raw["timestamp"] = pd.to_datetime(raw.pop("time"), unit="s", utc=True)
+    buffer = io.BytesIO()
+    if suffix == ".parquet":
+        raw.to_parquet(buffer, row_group_size=50)
+    else:
+        raw.to_feather(buffer)
+
+    ingestor = create_ingestor("demo", tmp_path, f"prices{suffix}")
+    ingestor.feed(buffer.getvalue())
+    summary = ingestor.finish()
+
+    assert summary["rows"] == 300
+    assert summary["step_seconds"] == 300
+    full = load_dataset_dataframe("demo", tmp_path)
+    assert list(full.columns) == ["timestamp", "open", "high", "low", "close", "volume"]
+
+    start, end = full["timestamp"].iloc[100], full["timestamp"].iloc[120]
+    sliced = load_dataset_dataframe("demo", tmp_path, start=start, end=end)
+    pd.testing.assert_frame_equal(sliced, full.iloc[100:120].reset_index(drop=True))
+
+
+def test_create_ingestor_rejects_unknown_formats(tmp_path: Path):
+    with pytest.raises(HTTPException):
+        create_ingestor("demo", tmp_path, "prices.xlsx")
+
+
+def test_summary_is_served_from_metadata_sidecar(tmp_path: Path, monkeypatch):
+    payload = _csv_bytes(100).replace(b"1700015000,", b"1700015150,", 1)
+    summary = _ingest(payload, tmp_path)
+
+    assert summary["gaps"] == 1
+    assert summary["price_range"] == {"min": 0.5, "max": 2.0}
+    assert summary["file_hash"] == hashlib.sha256(payload).hexdigest()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("summary must not read the dataset")
+
+    monkeypatch.setattr(csv_dataset_loader, "load_dataset_dataframe", fail)
+    assert load_dataset_summary("demo", tmp_path) == summary
+
+
+def test_stale_metadata_sidecar_is_rebuilt(tmp_path: Path):
+    _ingest(_csv_bytes(100), tmp_path)
+    (tmp_path / "demo.csv").write_bytes(_csv_bytes(40))
+
+    assert read_dataset_metadata("demo", tmp_path) is None
+    assert load_dataset_summary("demo", tmp_path)["rows"] == 40
+    assert read_dataset_metadata("demo", tmp_path)["rows"] == 40
+
+
+def test_concurrent_cache_writers_do_not_collide(tmp_path: Path):
+    frame = normalize_dataset_dataframe(pd.read_csv(io.BytesIO(_csv_bytes(2000))))
+    cache_path = get_cache_path("demo", tmp_path)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: write_dataframe_cache(frame, cache_path), range(12)))
+
+    np.testing.assert_array_equal(read_dataframe_cache(cache_path)["close"], frame["close"])
+    assert [p.name for p in cache_path.parent.iterdir()] == [cache_path.name]
+
+
+def test_timestamp_null_check_reads_the_leaf_column_after_nested_ones(tmp_path: Path):
+    table = pa.table({
+        "meta": pa.array([{"a": 1, "b": 2}] * 3),
+        "timestamp": pa.array([1, None, 3], pa.int64()),
+        "time": pa.array([1, 2, 3], pa.int64()),
+        "close": pa.array([1.0, 2.0, 3.0]),
+    })
+    pq.write_table(table, tmp_path / "nested.parquet")
+    namer = {"timestamp": "timestamp", "time": "timestamp"}.get
+
+    columns = dataset_formats._drop_redundant_timestamp_columns(
+        pq.ParquetFile(tmp_path / "nested.parquet"), ["timestamp", "time", "close"], lambda name: namer(name, name),
+    )
+
+    assert columns == ["timestamp", "time", "close"]   # "timestamp" has a null, so "time" is still needed
+
+
+def test_concurrent_metadata_writers_do_not_collide(tmp_path: Path):
+    metadata = _ingest(_csv_bytes(100), tmp_path)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        paths = list(pool.map(lambda _: write_dataset_metadata(metadata, tmp_path), range(12)))
+
+    assert read_dataset_metadata("demo", tmp_path) == metadata
+    assert not any(p.name.endswith(".tmp") for p in paths[0].parent.iterdir())
@@ -0,0 +1,63 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data.downsampling import (
+    aggregate_ohlc,
+    downsample_candles,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def test_aggregate_ohlc_preserves_extremes_and_endpoints():
+    n = 1_000
+    time = np.arange(n, dtype="int64") * 60
+    close = np.sin(np.linspace(0, 20, n))
+    open_ = np.roll(close, 1)
+    high = np.maximum(open_, close) + 0.01
+    low = np.minimum(open_, close) - 0.01
+    volume = np.ones(n)
+
+    t, o, h, l, c, v = aggregate_ohlc(time, open_, high, low, close, volume, 100)
+
+    assert len(t) == 100
+    assert t[0] == time[0]
+    assert o[0] == open_[0]
+    assert c[-1] == close[-1]
+    assert h.max() == high.max()
+    assert l.min() == low.min()
+    assert v.sum() == volume.sum()
+
+
+def test_downsample_candles_is_noop_below_limit():
+    candles = [{"time": i, "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 0.0} for i in range(10)]
+    assert downsample_candles(candles, 50) == candles
+    assert downsample_candles(candles, None) == candles
+
+
+def test_lttb_keeps_endpoints_and_spike():
+    x = np.arange(500, dtype="float64")
+    y = np.zeros(500)
+    y[250] = 10.0
+
+    idx = lttb_indices(x, y, 20)
+
+    assert len(idx) == 20
+    assert idx[0] == 0 and idx[-1] == 499
+    assert 250 in idx
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_minmax_keeps_bucket_extremes():
+    y = np.linspace(0, 1, 1_000)
+    y[123] = -5.0
+    y[777] = 5.0
+
+    idx = minmax_indices(y, 40)
+
+    assert len(idx) <= 40
+    assert 123 in idx and 777 in idx
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.backtesting.execution import build_equity_curve
+from backend.backtesting.metrics import SECONDS_PER_YEAR, compute_metrics, equity_metrics, rolling_metrics
+from backend.strategies.rule_engine import run_rule_engine
+
+
+def _frame(n: int = 400, step: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.002, n))
+    return pd.DataFrame({
+        "time": 1_700_000_100 + step * np.arange(n),
+        "open": close, "high": close * 1.001, "low": close * 0.999, "close": close,
+        "volume": np.full(n, 100.0),
+    })
+
+
+def _trades(df: pd.DataFrame, spans, kinds=None) -> list[dict]:
+    time, close = df["time"].to_numpy(), df["close"].to_numpy()
+    trades = []
+    for k, (i, j) in enumerate(spans):
+        kind = (kinds or ["BUY"] * len(spans))[k]
+        move = close[j] / close[i] - 1
+        trades.append({
+            "entry_time": int(time[i]), "exit_time": int(time[j]), "type": kind,
+            "pnl": float(move if kind == "BUY" else -move),
+        })
+    return trades
+
+
+def test_equity_curve_marks_to_market_and_books_reported_pnl():
+    df = _frame()
+    trades = _trades(df, [(10, 40), (50, 52), (60, 90)], ["BUY", "SELL", "BUY"])
+    trades[2]["pnl"] = 0.01   # filled at a target between closes
+
+    curve = build_equity_curve(df["time"].to_numpy(), df["close"].to_numpy(), trades)
+    bar_ret = df["close"].pct_change().fillna(0).to_numpy()
+
+    np.testing.assert_array_equal(curve.position[[10, 11, 40, 41, 51, 52, 53]], [0, 1, 1, 0, -1, -1, 0])
+    np.testing.assert_allclose(curve.returns[11:40], bar_ret[11:40])
+    np.testing.assert_allclose(curve.returns[51], -bar_ret[51])
+    np.testing.assert_allclose(np.prod(1 + curve.returns[61:91]), 1.01)
+    np.testing.assert_allclose(curve.equity[-1], np.prod([1 + t["pnl"] for t in trades]))
+
+
+def test_ratios_are_annualized_from_the_bar_interval():
+    trades_5m = _trades(_frame(), [(i, i + 5) for i in range(0, 390, 10)])
+    trades_1d = _trades(_frame(step=86_400), [(i, i + 5) for i in range(0, 390, 10)])
+
+    m_5m = compute_metrics(trades_5m, _frame())
+    m_1d = compute_metrics(trades_1d, _frame(step=86_400))
+
+    assert m_5m["periods_per_year"] == pytest.approx(SECONDS_PER_YEAR / 300, rel=1e-6)
+    assert m_5m["sharpe_ratio"] == pytest.approx(m_1d["sharpe_ratio"] * np.sqrt(288), rel=1e-3)
+    assert m_5m["exposure"] == pytest.approx(39 * 5 / 400, abs=1e-4)
+
+
+def test_equity_metrics_match_a_direct_computation():
+    df = _frame(seed=3)
+    curve = build_equity_curve(df["time"].to_numpy(), df["close"].to_numpy(), _trades(df, [(5, 395)]))
+    r = curve.returns[1:]
+    ppy = SECONDS_PER_YEAR / 300
+    equity = np.concatenate(([1.0], curve.equity))
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+
+    m = equity_metrics(curve)
+
+    assert m["sharpe_ratio"] == pytest.approx(r.mean() / r.std(ddof=1) * np.sqrt(ppy), abs=1e-4)
+    assert m["sortino_ratio"] == pytest.approx(r.mean() / np.sqrt(np.mean(np.minimum(r, 0) ** 2)) * np.sqrt(ppy), abs=1e-4)
+    assert m["max_drawdown"] == pytest.approx(drawdown.min(), abs=1e-6)
+    assert m["time_in_drawdown"] == pytest.approx(np.mean(drawdown[1:] < 0), abs=1e-4)
+    assert m["calmar_ratio"] == pytest.approx(m["cagr"] / -m["max_drawdown"], rel=1e-3)
+
+    rolling = rolling_metrics(curve, 50)
+    window = r[-50:]
+    assert np.isnan(rolling["sharpe"][:50]).all()
+    assert rolling["sharpe"][-1] == pytest.approx(window.mean() / window.std(ddof=1) * np.sqrt(ppy))
+    assert rolling["return"][-1] == pytest.approx(curve.equity[-1] / curve.equity[-51] - 1)
+
+
+def test_few_or_untimed_trades_report_no_ratios():
+    df = _frame()
+    few = compute_metrics(_trades(df, [(10, 20), (30, 40)]), df)
+    assert few["sharpe_ratio"] is None and few["sortino_ratio"] is None
+    assert few["max_drawdown"] <= 0
+
+    untimed = compute_metrics([{"pnl": p} for p in (0.01, -0.02, 0.03, 0.01, -0.01)])
+    assert untimed["sharpe_ratio"] is None
+    assert untimed["max_drawdown"] == pytest.approx(-0.02)
+
+
+def test_rule_engine_reports_curve_metrics():
+    df = _frame(seed=5)
+    config = {
+        "buy_rules": [{"indicator": "close", "operator": ">", "value": 0}],
+        "stop_loss": 0.002, "take_profit": 0.002,
+    }
+
+    result = run_rule_engine(df, config)
+
+    assert len(result["trades"]) >= 5
+    assert all("entry_time" in t for t in result["trades"])
+    assert result["metrics"]["max_drawdown"] < 0
+    assert result["metrics"]["sharpe_ratio"] is not None
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.ml import feature_engineering, regime_detection, trade_scoring
+from backend.ml.feature_engineering import FEATURE_NAMES, FeatureStore, compute_features
+from backend.strategies import strategy_insights
+
+
+def _frame(n: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return pd.DataFrame({
+        "time": 1_700_000_100 + 300 * np.arange(n),
+        "open": np.roll(close, 1),
+        "high": close + 0.3,
+        "low": close - 0.3,
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype("float64"),
+    })
+
+
+def test_feature_matrix_is_columnar_and_read_only():
+    features = compute_features(_frame())
+
+    assert features.names == FEATURE_NAMES
+    assert features.values.flags.f_contiguous
+    assert features["rsi"].flags.c_contiguous
+    with pytest.raises(ValueError):
+        features["rsi"][0] = 1.0
+
+
+def test_consumers_share_one_computation(monkeypatch):
+    df = _frame()
+    calls = []
+    store = FeatureStore(compute=lambda frame: calls.append(1) or compute_features(frame))
+    monkeypatch.setattr(feature_engineering, "feature_store", store)
+    monkeypatch.setattr(regime_detection, "feature_store", store)
+    monkeypatch.setattr(trade_scoring, "feature_store", store)
+    monkeypatch.setattr(strategy_insights, "feature_store", store)
+
+    trades = [
+        {"entry_time": int(t), "exit_time": int(t) + 900, "pnl": pnl, "type": "BUY"}
+        for t, pnl in zip(df["time"].iloc[100::50], [1.0, -1.0] * 6)
+    ]
+    trade_scoring.score_trades(df, trades)
+    regime_detection.detect_market_regime(df)
+    # Insights receive the candles as JSON records, as the API does.
+    strategy_insights.generate_insights(df.to_dict("records"), trades)
+
+    assert len(calls) == 1
+    assert store.stats()["misses"] == 1
+
+
+def test_projections_keep_the_consumer_columns():
+    df = _frame()
+    df.index += 10
+
+    regime = regime_detection.engineer_features(df)
+    scoring = trade_scoring.extract_features(df.drop(columns=["volume"]))
+
+    assert list(regime.columns) == list(regime_detection.REGIME_FEATURES)
+    assert regime.index[0] > df.index[0] and not regime.isna().any().any()
+    assert "vol_ratio" in scoring.columns and (scoring["volume_spike"] == 1.0).all()
+    assert scoring.index.equals(df.index)
@@ -0,0 +1,69 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backend.market_data.candle_array import CandleArray
+from backend.market_data.gap_handling import (
+    gap_segment_bounds,
+    generate_trades_and_setups_with_gap_resets,
+    split_candles_on_gaps,
+)
+from bot.strategy_engine import generate_trades_and_setups
+
+
+def _c(t, o, h, l, c):
+    return {"time": int(t), "open": float(o), "high": float(h), "low": float(l), "close": float(c), "volume": 0.0}
+
+
+# Bullish Case A setup from tests/test_strategy_engine.py: entry at 1800, exit at 2100.
+SETUP = [
+    (1.00, 1.01, 1.00, 1.01),
+    (1.01, 1.02, 1.01, 1.02),
+    (1.02, 1.03, 1.02, 1.03),
+    (1.03, 1.04, 1.03, 1.04),
+    (1.04, 1.04, 1.032, 1.035),
+    (1.020, 1.026, 1.018, 1.025),
+    (1.024, 1.029, 1.023, 1.028),
+    (1.028, 1.032, 1.027, 1.031),
+]
+
+
+def _sessions(count: int) -> list[dict]:
+    # ``count`` copies of the setup, each separated from the next by a weekend-sized gap.
+    candles = []
+    for session in range(count):
+        base = session * 86_400 * 3
+        candles.extend(_c(base + 300 * i, *prices) for i, prices in enumerate(SETUP))
+    return candles
+
+
+def test_gap_segment_bounds_splits_on_steps_larger_than_expected():
+    times = np.array([0, 300, 600, 1500, 1800, 9000])
+
+    assert gap_segment_bounds(times).tolist() == [[0, 3], [3, 5], [5, 6]]
+    assert gap_segment_bounds(np.array([], dtype="int64")).shape == (0, 2)
+    assert gap_segment_bounds(np.array([0.0, np.nan, 5000.0])).tolist() == [[0, 3]]
+
+
+def test_split_accepts_lists_and_candle_arrays():
+    candles = _sessions(3)
+
+    segments = split_candles_on_gaps(candles)
+    array_segments = split_candles_on_gaps(CandleArray.from_candles(candles))
+
+    assert [len(s) for s in segments] == [8, 8, 8]
+    assert [s.to_candles() for s in array_segments] == segments
+
+
+def test_gap_resets_match_per_segment_runs_serially_and_in_a_pool():
+    candles = _sessions(40)
+    expected_trades, expected_setups = [], []
+    for segment in split_candles_on_gaps(candles):
+        trades, setups = generate_trades_and_setups(segment)
+        expected_trades.extend(trades)
+        expected_setups.extend(setups)
+
+    assert len(expected_trades) == 40
+    assert generate_trades_and_setups_with_gap_resets(candles) == (expected_trades, expected_setups)
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        assert generate_trades_and_setups_with_gap_resets(candles, executor=pool) == (expected_trades, expected_setups)
@@ -0,0 +1,46 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.indicators.indicators import IndicatorCache, calculate_macd, parse_indicator_request
+
+
+def test_parse_indicator_request_defaults_and_aliases():
+    assert [alias for alias, _, _ in parse_indicator_request(None)] == ["sma", "ema", "rsi", "macd", "bbands"]
+
+    parsed = parse_indicator_request("fast=ema:12, slow=ema:26, sma:10, sma:30, bbands::3")
+    assert parsed == [
+        ("fast", "ema", (12,)),
+        ("slow", "ema", (26,)),
+        ("sma_10", "sma", (10,)),
+        ("sma_30", "sma", (30,)),
+        ("bbands", "bbands", (20, 3.0)),
+    ]
+
+
+@pytest.mark.parametrize("spec", ["foo:1", "sma:0", "sma:2.5", "ema:1:2"])
+def test_parse_indicator_request_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_indicator_request(spec)
+
+
+def test_indicator_cache_reuses_arrays_per_source_key():
+    close = pd.Series(np.linspace(1.0, 2.0, 100))
+    cache = IndicatorCache(max_entries=2)
+
+    first = cache.get(("demo", "1m", 1), "macd", (12, 26, 9), close)
+    second = cache.get(("demo", "1m", 1), "macd", (12, 26, 9), close)
+
+    assert first is second
+    macd, _, _ = calculate_macd(close, 12, 26, 9)
+    np.testing.assert_allclose(first["macd"], macd.to_numpy())
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    cache.get(("demo", "1m", 2), "macd", (12, 26, 9), close)
+    cache.get(("demo", "1m", 3), "macd", (12, 26, 9), close)
+    assert cache.stats()["entries"] == 2
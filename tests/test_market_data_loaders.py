@@ -0,0 +1,77 @@
+from pathlib import Path
+import sys
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data.loaders import (
+    CandleCSVError,
+    _load_candles_rowwise,
+    _load_candles_vectorized,
+    load_candles_from_csv_path,
+)
+
+HEADER = "time,open,high,low,close,Pattern Alert,Volume\n"
+
+
+def _write(tmp_path: Path, body: str, header: str = HEADER) -> Path:
+    csv_path = tmp_path / "FX_EURUSD.csv"
+    csv_path.write_text(header + body, encoding="utf-8")
+    return csv_path
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        "1700000000,1.1,1.2,1.0,1.15,0,10\n1700000300,1.15,1.25,1.1,1.2,,12\n",
+        "1700000000000,1.1,1.2,1.0,1.15,buy,10\n1700000300000,1.15,1.25,1.1,1.2,TRUE,12\n",
+        "2024-01-01T00:00:00Z,1.1,1.2,1.0,1.15,0,10\n2024-01-01T00:05:00+00:00,1.15,1.25,1.1,1.2,1,12\n",
+    ],
+)
+def test_vectorized_loader_matches_row_parser(tmp_path: Path, body: str):
+    csv_path = _write(tmp_path, body)
+
+    fast = _load_candles_vectorized(csv_path)
+
+    assert fast is not None
+    assert fast == _load_candles_rowwise(csv_path)
+    assert [type(c["pattern_alert"]) for c in fast] == [type(c["pattern_alert"]) for c in _load_candles_rowwise(csv_path)]
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ("1700000300,1,1,1,1,0,1\n1700000000,1,1,1,1,0,1\n", "strictly increasing"),
+        ("1700000000,1,1,1,1,0,1\n1700000300,abc,1,1,1,0,1\n", "Invalid OHLCV number"),
+        ("1700000000,1,1,1,1,0,1\n1700000300,1,inf,1,1,0,1\n", "Non-finite OHLCV value"),
+        ("1700000000,1,1,1,1,0,1\nnot-a-time,1,1,1,1,0,1\n", "Invalid timestamp"),
+        ("1700000000,1,1,1,1,0,1\n1700000300,1,1\n", "Missing required column values"),
+        ("", "CSV has no data rows"),
+    ],
+)
+def test_invalid_rows_fall_back_to_row_parser_errors(tmp_path: Path, body: str, message: str):
+    csv_path = _write(tmp_path, body)
+
+    assert _load_candles_vectorized(csv_path) is None
+    with pytest.raises(CandleCSVError) as fast_error:
+        load_candles_from_csv_path(csv_path)
+    with pytest.raises(CandleCSVError) as row_error:
+        _load_candles_rowwise(csv_path)
+
+    assert message in str(fast_error.value)
+    assert str(fast_error.value) == str(row_error.value)
+
+
+def test_blank_lines_are_skipped_like_the_row_parser(tmp_path: Path):
+    csv_path = _write(tmp_path, "1700000000,1,1,1,1,0,1\n\n,,,,,,\n1700000300,1,1,1,1,0,1\n")
+
+    assert load_candles_from_csv_path(csv_path) == _load_candles_rowwise(csv_path)
+    assert len(load_candles_from_csv_path(csv_path)) == 2
+
+
+def test_integers_beyond_float_precision_fall_back_to_row_parser(tmp_path: Path):
+    csv_path = _write(tmp_path, "1700000000,1,1,1,1,0,9007199254740993\n1700000300,1,1,1,1,0,1\n")
+
+    assert _load_candles_vectorized(csv_path) is None
+    assert load_candles_from_csv_path(csv_path) == _load_candles_rowwise(csv_path)
@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.backtesting import monte_carlo
+from backend.backtesting.batch import pool_context
+from backend.backtesting.monte_carlo import run_monte_carlo
+from backend.server import app
+
+PNLS = np.random.default_rng(7).normal(0.002, 0.02, 300)
+
+
+def _reference(pnls: np.ndarray, order: np.ndarray, ruin_level: float):
+    """One path, computed the obvious way."""
+    equity = np.concatenate(([1.0], np.cumprod(1 + pnls[order])))
+    drawdown = (equity / np.maximum.accumulate(equity) - 1).min()
+    return equity[-1], drawdown, equity.min() <= ruin_level
+
+
+def test_chunks_match_a_per_path_computation():
+    rng = np.random.default_rng(np.random.SeedSequence(3))
+    orders = monte_carlo._sample_indices(rng, 50, len(PNLS), "block", 7)
+    final, drawdown, ruined = monte_carlo.simulate_chunk(PNLS, 50, "block", 7, 0.9, np.random.SeedSequence(3))
+
+    for k, order in enumerate(orders):
+        expected = _reference(PNLS, order, 0.9)
+        assert final[k] == pytest.approx(expected[0])
+        assert drawdown[k] == pytest.approx(expected[1])
+        assert ruined[k] == expected[2]
+
+
+def test_block_bootstrap_draws_contiguous_circular_blocks():
+    rng = np.random.default_rng(0)
+    orders = monte_carlo._sample_indices(rng, 20, 10, "block", 4)
+
+    assert orders.shape == (20, 10)
+    steps = np.diff(orders, axis=1)[:, [0, 1, 2, 4, 5, 6]]   # within-block steps
+    assert np.all((steps == 1) | (steps == -9))
+
+
+def test_shuffle_keeps_final_equity_and_varies_drawdown():
+    result = run_monte_carlo(PNLS, simulations=500, method="shuffle", seed=1)
+
+    assert result["final_equity"]["p5"] == pytest.approx(result["final_equity"]["p95"])
+    assert result["final_equity"]["p50"] == pytest.approx(np.prod(1 + PNLS), rel=1e-6)
+    assert result["max_drawdown"]["p5"] < result["max_drawdown"]["p95"] <= 0
+
+
+def test_pool_does_not_change_results(monkeypatch):
+    monkeypatch.setattr(monte_carlo, "CHUNK_ELEMENTS", 300 * 250)   # four chunks
+    serial = run_monte_carlo(PNLS, simulations=900, seed=11)
+    with ProcessPoolExecutor(max_workers=2, mp_context=pool_context()) as pool:
+        pooled = run_monte_carlo(PNLS, simulations=900, seed=11, pool=pool)
+
+    assert pooled == serial
+    assert run_monte_carlo(PNLS, simulations=900, seed=12) != serial
+
+
+def test_endpoint_validates_and_reports_ruin():
+    client = TestClient(app)
+    trades = [{"pnl": p} for p in (0.2, -0.3, 0.1, -0.25, 0.15)]
+
+    response = client.post("/monte-carlo", json={"trades": trades, "simulations": 2000, "seed": 5})
+    assert response.status_code == 200
+    body = response.json()
+    assert 0 < body["probability_of_ruin"] < 1
+    assert set(body["final_equity"]) == {"p5", "p25", "p50", "p75", "p95", "mean"}
+
+    assert client.post("/monte-carlo", json={"trades": trades, "method": "jackknife"}).status_code == 400
+    assert client.post("/monte-carlo", json={"trades": trades, "simulations": 0}).status_code == 400
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.market_data.multi_timeframe import TimeframeContext
+from backend.strategies.pine_script_strategy import run_pine_script_strategy
+from backend.strategies.rule_engine import run_rule_engine
+
+T0 = 1_700_006_400   # a 4h (and hour) boundary
+
+
+def _frame(n: int = 600, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.3, n))
+    return pd.DataFrame({
+        "time": T0 + 300 * np.arange(n),
+        "open": np.roll(close, 1), "high": close + 0.2, "low": close - 0.2, "close": close,
+        "volume": np.full(n, 10.0),
+    })
+
+
+def test_higher_timeframe_bar_is_visible_only_once_closed():
+    df = _frame()
+    context = TimeframeContext.from_frame(df)
+
+    hourly = context.frame("1h")
+    aligned = context.series("1h", "close")
+
+    assert hourly["close"].iloc[0] == df["close"].iloc[11]
+    assert np.isnan(aligned[:11]).all()                     # 10:00 bar closes with the 10:55 bar
+    assert aligned[11] == aligned[22] == hourly["close"].iloc[0]
+    assert aligned[23] == hourly["close"].iloc[1]
+    assert context.series("4h", "high")[47] == df["high"].iloc[:48].max()
+
+
+def test_dataset_context_reads_the_resample_cache(tmp_path: Path):
+    df = _frame()
+    (tmp_path / "fx.csv").write_text(df.to_csv(index=False))
+
+    from_dataset = TimeframeContext.for_dataset(df["time"].to_numpy(), "fx", tmp_path)
+    from_frame = TimeframeContext.from_frame(df)
+
+    np.testing.assert_allclose(from_dataset.series("1h", "close"), from_frame.series("1h", "close"))
+    with pytest.raises(ValueError):
+        TimeframeContext.from_frame(_frame().iloc[::12]).positions("5m")   # 1h bars, 5m reference
+
+
+def test_rules_reference_indicators_computed_on_the_higher_timeframe():
+    df = _frame(seed=1)
+    context = TimeframeContext.from_frame(df)
+    config = {
+        "buy_rules": [{"indicator": "close", "operator": ">", "value": "ema3@1h"}],
+        "sell_rules": [{"indicator": "price", "operator": "<", "value": "ema3@1h"}],
+    }
+
+    result = run_rule_engine(df, config, context)
+
+    hourly_ema = context.frame("1h")["close"].ewm(span=3, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(df["ema3@1h"].to_numpy(), context.align("1h", hourly_ema))
+    assert result["trades"]
+
+
+def test_pine_request_security_evaluates_script_variables_on_the_higher_timeframe():
+    df = _frame(seed=2)
+    script = """
+fast = ta.ema(close, 3)
+trend = request.security(syminfo.tickerid, "60", fast)
+if close > trend
+    strategy.entry("L", strategy.long)
+if close < trend
+    strategy.close("L")
+"""
+    context = TimeframeContext.from_frame(df)
+
+    result = run_pine_script_strategy(df, {"pine_script": script}, context)
+
+    hourly_fast = context.frame("1h")["close"].ewm(span=3, adjust=False).mean().to_numpy()
+    trend = context.align("1h", hourly_fast)
+    points = {p["time"]: p["value"] for p in result["indicators"]["trend"]}
+    expected = {int(t): v for t, v in zip(df["time"], trend) if not np.isnan(v)}
+    assert points == pytest.approx(expected)
+    assert result["trades"]
+    first_entry = result["trades"][0]["entry_time"]
+    assert first_entry >= df["time"].iloc[11]   # nothing before the first hourly close
+
+
+def test_pine_request_security_rejects_other_symbols(tmp_path: Path):
+    df = _frame(seed=3)
+    (tmp_path / "fx.csv").write_text(df.to_csv(index=False))
+    context = TimeframeContext.for_dataset(df["time"].to_numpy(), "fx", tmp_path)
+    script = """
+trend = request.security({symbol}, "60", close)
+if close > trend
+    strategy.entry("L", strategy.long)
+"""
+
+    by_ticker = run_pine_script_strategy(df, {"pine_script": script.format(symbol="syminfo.tickerid")}, context)
+    by_id = run_pine_script_strategy(df, {"pine_script": script.format(symbol='"fx"')}, context)
+    assert by_id["trades"] == by_ticker["trades"]
+
+    for symbol in ('"OTHER:SYMBOL"', "syminfo.prefix"):
+        with pytest.raises(ValueError, match="strategy's own symbol"):
+            run_pine_script_strategy(df, {"pine_script": script.format(symbol=symbol)}, context)
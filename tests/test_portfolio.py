@@ -0,0 +1,119 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.backtesting.batch import pool_context
+from backend.backtesting.portfolio import PortfolioLeg, align_closes, run_portfolio_backtest, simulate_portfolio
+from backend.data_providers.data_manager import DataManager
+from backend.server import app
+from backend.strategy_engine import run_strategy
+from backend.utils.helpers import clean_data
+
+CONFIG = {"strategy": "ma_crossover", "parameters": {"fast_period": 3, "slow_period": 8, "ma_type": "SMA"}}
+T0 = 1_700_000_100
+
+
+def _trade(times, closes, i, j, kind="BUY"):
+    move = closes[j] / closes[i] - 1
+    return {"entry_time": int(times[i]), "exit_time": int(times[j]), "type": kind,
+            "pnl": float(move if kind == "BUY" else -move)}
+
+
+def test_align_closes_forward_fills_without_look_ahead():
+    grid, closes = align_closes(
+        [np.array([T0, T0 + 600]), np.array([T0 + 300, T0 + 600, T0 + 900])],
+        [np.array([1.0, 2.0]), np.array([10.0, 20.0, 30.0])],
+    )
+
+    np.testing.assert_array_equal(grid, T0 + 300 * np.arange(4))
+    np.testing.assert_array_equal(closes[:, 0], [1.0, 1.0, 2.0, 2.0])
+    np.testing.assert_array_equal(closes[:, 1], [np.nan, 10.0, 20.0, 30.0])
+
+
+def test_single_leg_fully_invested_compounds_trade_pnls():
+    times = T0 + 300 * np.arange(50)
+    closes = 100 + np.sin(np.arange(50) / 3) * 5
+    trades = [_trade(times, closes, 2, 10), _trade(times, closes, 12, 20, "SELL"), _trade(times, closes, 20, 30)]
+
+    sim = simulate_portfolio(times, closes[:, None], [trades], 1000.0, "fraction", 1.0, 1)
+
+    assert sim["equity"][-1] == pytest.approx(1000 * np.prod([1 + t["pnl"] for t in trades]))
+    # Marked to market inside the first trade.
+    assert sim["equity"][6] == pytest.approx(1000 * closes[6] / closes[2])
+    assert sim["open_positions"][[1, 2, 9, 10, 11]].tolist() == [0, 1, 1, 0, 0]
+
+
+def test_shared_cash_limits_concurrent_positions_and_sizes_from_equity():
+    times = T0 + 300 * np.arange(40)
+    closes = np.column_stack([np.linspace(100, 80, 40), np.linspace(50, 40, 40), np.full(40, 10.0)])
+    legs = [
+        [_trade(times, closes[:, 0], 0, 20)],
+        [_trade(times, closes[:, 1], 5, 25, "SELL")],
+        [_trade(times, closes[:, 2], 10, 30)],   # both slots taken → skipped
+    ]
+
+    sim = simulate_portfolio(times, closes, legs, 10_000.0, "equal", None, 2)
+
+    assert sim["skipped_max_positions"] == 1
+    assert sim["candidates"]["leg"][sim["taken"]].tolist() == [0, 1]
+    first_open = 5_000 * closes[5, 0] / closes[0, 0]   # a loss, so the target stays below cash
+    assert sim["allocation"].tolist() == pytest.approx([5_000.0, (5_000 + first_open) / 2])
+    realized = sum(a * legs[k][0]["pnl"] for k, a in zip((0, 1), sim["allocation"]))
+    assert sim["equity"][-1] == pytest.approx(10_000 + realized)
+
+
+def test_fixed_sizing_skips_entries_that_cash_cannot_cover():
+    times = T0 + 300 * np.arange(40)
+    closes = np.full((40, 3), 10.0)
+    legs = [[_trade(times, closes[:, k], 5 + k, 30)] for k in range(3)]
+
+    sim = simulate_portfolio(times, closes, legs, 10_000.0, "fixed", 4_500.0, 5)
+
+    # The third entry would only get the 1,000 left over: skipped rather than opened as dust.
+    assert sim["allocation"].tolist() == [4_500.0, 4_500.0]
+    assert sim["skipped_cash"] == 1
+    assert sim["skipped_max_positions"] == 0
+
+
+def _write_dataset(directory: Path, name: str, drift: float) -> None:
+    rows = []
+    for i in range(300):
+        price = 100 + drift * i + (5 if (i // 20) % 2 else -5)
+        rows.append(f"{T0 + 60 * i},{price},{price + 1},{price - 1},{price + 0.5},10")
+    (directory / f"{name}.csv").write_text("time,open,high,low,close,volume\n" + "\n".join(rows) + "\n")
+
+
+def test_portfolio_backtest_runs_each_leg_and_reports_failures(tmp_path: Path):
+    _write_dataset(tmp_path, "up", 0.1)
+    _write_dataset(tmp_path, "down", -0.1)
+    manager = DataManager()
+    manager.datasets_dir = tmp_path
+    legs = [PortfolioLeg("up", "5m", CONFIG), PortfolioLeg("down", "5m", CONFIG), PortfolioLeg("missing", "5m", CONFIG)]
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=pool_context()) as pool:
+        result = run_portfolio_backtest(legs, manager.share_candles, 1000.0, "fraction", 0.5, 2, pool=pool)
+
+    rows = {row["dataset_id"]: row for row in result["legs"]}
+    assert rows["missing"]["status"] == "error"
+    for name in ("up", "down"):
+        trades = clean_data(run_strategy(manager.load_candles(name, "5m"), CONFIG))["trades"]
+        assert rows[name]["status"] == "ok"
+        assert rows[name]["signalled_trades"] == rows[name]["taken_trades"] == len(trades)
+
+    metrics = result["metrics"]
+    assert metrics["total_trades"] == len(result["trades"])
+    assert metrics["final_equity"] == pytest.approx(1000 + sum(t["pnl_amount"] for t in result["trades"]), abs=0.05)
+    assert result["equity_curve"][-1]["value"] == pytest.approx(metrics["final_equity"], abs=0.01)
+
+
+def test_portfolio_endpoint_validates_settings():
+    client = TestClient(app)
+
+    assert client.post("/run-backtest/portfolio", json={"config": CONFIG}).status_code == 400
+    response = client.post(
+        "/run-backtest/portfolio", json={"dataset_ids": ["x"], "config": CONFIG, "sizing": "fixed"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,132 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.data_providers.data_manager import DataManager
+from backend.ml import prediction_models, trade_scoring
+from backend.ml.prediction_models import ModelNotTrainedError, OfflineModels, train_models
+from backend.ml.regime_detection import detect_market_regime
+from backend.server import app
+
+CONFIG = {"strategy": "ma_crossover", "parameters": {"fast_period": 3, "slow_period": 8, "ma_type": "SMA"}}
+
+
+def _write_dataset(directory: Path, name: str, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 400))
+    rows = [
+        f"{1700000100 + 300 * i},{close[i - 1] if i else close[0]},{c + 0.4},{c - 0.4},{c},{int(rng.integers(10, 99))}"
+        for i, c in enumerate(close)
+    ]
+    (directory / f"{name}.csv").write_text("time,open,high,low,close,volume\n" + "\n".join(rows) + "\n")
+
+
+@pytest.fixture
+def trained(tmp_path: Path):
+    datasets = tmp_path / "datasets"
+    datasets.mkdir()
+    _write_dataset(datasets, "alpha", 1)
+    _write_dataset(datasets, "beta", 2)
+    manager = DataManager()
+    manager.datasets_dir = datasets
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        manifest = train_models(
+            ["alpha", "beta", "missing"], ["5m"], CONFIG, manager=manager, root=tmp_path / "models", pool=pool,
+        )
+    return manager, manifest, OfflineModels(tmp_path / "models")
+
+
+def test_training_run_is_versioned_and_reports_failures(trained):
+    _manager, manifest, models = trained
+    jobs = {job["dataset_id"]: job for job in manifest["jobs"]}
+
+    assert manifest["version"] == 1
+    assert jobs["alpha"]["status"] == jobs["beta"]["status"] == "ok"
+    assert jobs["missing"]["status"] == "error"
+    assert set(manifest["regime"]) == {"alpha@5m", "beta@5m"}
+    assert next(iter(manifest["trade_quality"].values()))["trained"]
+    assert models.manifest()["version"] == 1
+
+
+def test_predictions_only_run_inference(trained, monkeypatch):
+    manager, _manifest, models = trained
+    df = manager.load_candles("alpha", "5m").to_dataframe()
+    trades = prediction_models.run_strategy(df, dict(CONFIG))["trades"]
+    assert trades
+
+    for module, name in ((trade_scoring, "fit_trade_scorer"), (prediction_models, "fit_trade_scorer"),
+                         (prediction_models, "fit_regime_model")):
+        monkeypatch.setattr(module, name, lambda *a, **k: pytest.fail("fitted on request"))
+    regime = prediction_models.predict_regime(df, "alpha", "5m", models=models)
+    scored = prediction_models.predict_trade_scores(df, trades, CONFIG, models=models)
+
+    assert regime == detect_market_regime(df)
+    assert len(scored) == len(trades)
+    assert all(0.0 <= t["trade_score"] <= 1.0 for t in scored)
+    assert models.regime_dataset_version("alpha", "5m") == manager.dataset_version("alpha")
+
+    with pytest.raises(ModelNotTrainedError):
+        models.regime_model("missing", "5m")
+    with pytest.raises(ModelNotTrainedError):
+        models.trade_scorer({"strategy": "breakout"})
+
+
+def test_old_versions_are_pruned(trained, tmp_path: Path, monkeypatch):
+    manager, _manifest, models = trained
+    monkeypatch.setattr(prediction_models, "KEEP_VERSIONS", 1)
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        manifest = train_models(["alpha"], ["5m"], CONFIG, manager=manager, root=tmp_path / "models", pool=pool)
+
+    assert manifest["version"] == 2
+    assert sorted(p.name for p in (tmp_path / "models").glob("v*")) == ["v0002"]
+    assert models.manifest()["version"] == 2
+    with pytest.raises(ModelNotTrainedError):
+        models.regime_model("beta", "5m")
+
+
+def test_an_older_run_finishing_last_does_not_replace_the_current_version(trained, tmp_path: Path):
+    manager, _manifest, models = trained
+    root = tmp_path / "models"
+    older, newer = prediction_models.reserve_version(root), prediction_models.reserve_version(root)
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        train_models(["alpha"], ["5m"], CONFIG, manager=manager, root=root, pool=pool, version=newer)
+        stale = train_models(["beta"], ["5m"], CONFIG, manager=manager, root=root, pool=pool, version=older)
+
+    assert (older, newer) == (2, 3)
+    assert stale["version"] == older and (root / "v0002" / "manifest.json").exists()
+    assert models.manifest()["version"] == newer
+
+
+def test_train_endpoint_runs_in_the_background_one_at_a_time(tmp_path: Path, monkeypatch):
+    from backend.api import strategy_routes
+    from backend.data_providers.data_manager import data_manager
+
+    datasets = tmp_path / "datasets"
+    datasets.mkdir()
+    _write_dataset(datasets, "alpha", 1)
+    monkeypatch.setattr(data_manager, "datasets_dir", datasets)
+    monkeypatch.setattr(prediction_models, "OFFLINE_DIR", tmp_path / "models")
+    client = TestClient(app)
+    body = {"dataset_ids": ["alpha"], "timeframes": ["5m"], "trade_config": CONFIG}
+
+    assert prediction_models.reserve_version(tmp_path / "models") == 1   # e.g. a CLI run in progress
+    response = client.post("/ml/train", json=body)
+    assert response.status_code == 202
+    assert response.json()["version"] == 2
+
+    status = client.get("/ml/train").json()   # TestClient finishes background tasks before returning
+    assert status["running"] is None
+    assert status["last"]["version"] == 2 and status["last"]["status"] == "ok"
+    assert OfflineModels(tmp_path / "models").manifest()["version"] == 2
+
+    assert strategy_routes._training_lock.acquire(blocking=False)
+    try:
+        assert client.post("/ml/train", json=body).status_code == 409
+    finally:
+        strategy_routes._training_lock.release()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from backend.ml import regime_detection
+from backend.ml.regime_detection import REGIME_LABELS, engineer_features, generate_labels
+from backend.ml.regime_performance import compute_regime_performance
+
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n) * (1 + (np.arange(n) // 80) % 3))
+    return pd.DataFrame({
+        "time": 1_700_000_100 + 300 * np.arange(n),
+        "open": np.roll(close, 1),
+        "high": close + 0.3,
+        "low": close - 0.3,
+        "close": close,
+    })
+
+
+def _reference_breakdown(df: pd.DataFrame, trades: list[dict]) -> dict:
+    feat = engineer_features(df)
+    labels = generate_labels(feat)
+    bar_times = df["time"].to_numpy(dtype=float)[feat.index]
+    breakdown = {}
+    for code, name in REGIME_LABELS.items():
+        pnls = [
+            t["pnl"] for t in trades
+            if labels.iloc[int(np.argmin(np.abs(bar_times - t["entry_time"])))] == code
+        ]
+        if pnls:
+            breakdown[name] = {
+                "trades": len(pnls),
+                "avg_return": round(float(np.mean(pnls)), 6),
+                "win_rate": round(sum(p > 0 for p in pnls) / len(pnls), 4),
+            }
+    return breakdown
+
+
+def test_breakdown_matches_a_nearest_bar_scan():
+    df = _frame(600)
+    rng = np.random.default_rng(1)
+    trades = [
+        {"entry_time": float(t), "pnl": float(rng.normal())}
+        for t in rng.integers(df["time"].iloc[0] - 900, df["time"].iloc[-1] + 900, 400)
+    ]
+
+    result = compute_regime_performance(df, trades)
+
+    assert result["breakdown"] == _reference_breakdown(df, trades)
+    assert sum(row["trades"] for row in result["breakdown"].values()) == len(trades)
+
+
+def test_labels_are_shared_with_the_regime_model(monkeypatch):
+    df = _frame(500, seed=3)
+    calls = []
+    label = regime_detection.generate_labels
+    monkeypatch.setattr(regime_detection, "generate_labels", lambda feat: calls.append(1) or label(feat))
+    trades = [{"entry_time": float(df["time"].iloc[-1]), "pnl": 1.0}]
+
+    compute_regime_performance(df, trades)
+    compute_regime_performance(df, trades + [{"entry_time": float(df["time"].iloc[200]), "pnl": -1.0}])
+    regime_detection.fit_regime_model(df)
+
+    assert len(calls) == 1
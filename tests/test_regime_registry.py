@@ -0,0 +1,94 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backend.ml import regime_detection
+from backend.ml.model_registry import ModelRegistry
+
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n) * (1 + (np.arange(n) // 100) % 3))
+    spread = np.abs(rng.normal(0, 0.4, n)) + 0.05
+    return pd.DataFrame({
+        "time": 1_700_000_100 + 300 * np.arange(n),
+        "open": np.roll(close, 1),
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype("float64"),
+    })
+
+
+def _count_fits(monkeypatch) -> list:
+    fits = []
+    build = regime_detection._build_model
+
+    def counting_build(*args, **kwargs):
+        fits.append(1)
+        return build(*args, **kwargs)
+
+    monkeypatch.setattr(regime_detection, "_build_model", counting_build)
+    return fits
+
+
+def test_cached_regime_matches_uncached_and_skips_refits(tmp_path, monkeypatch):
+    df = _frame(400)
+    expected = regime_detection.detect_market_regime(df)
+    fits = _count_fits(monkeypatch)
+    registry = ModelRegistry(tmp_path)
+
+    first = regime_detection.detect_market_regime(df, cache_key="ds@5m", version=1, registry=registry)
+    again = regime_detection.detect_market_regime(df, cache_key="ds@5m", version=1, registry=registry)
+    reloaded = regime_detection.detect_market_regime(df, cache_key="ds@5m", version=1, registry=ModelRegistry(tmp_path))
+
+    assert first == again == reloaded == expected
+    assert len(fits) == 1
+    assert registry.path_for("regime/ds@5m").exists()
+
+
+def test_appended_bars_are_scored_without_refitting(tmp_path, monkeypatch):
+    full = _frame(460, seed=1)
+    fits = _count_fits(monkeypatch)
+    registry = ModelRegistry(tmp_path)
+
+    regime_detection.detect_market_regime(full.iloc[:400], cache_key="ds@5m", version=1, registry=registry)
+    grown = regime_detection.detect_market_regime(full, cache_key="ds@5m", version=2, registry=registry)
+    assert len(fits) == 1
+
+    entry = registry.get("regime/ds@5m")
+    feat = regime_detection.engineer_features(full)
+    preds = entry.model.predict(entry.scaler.transform(feat.values[-regime_detection.HISTORY_BARS:]))
+    assert grown["regime_history"] == [regime_detection.REGIME_LABELS[int(p)] for p in preds]
+    assert entry.bars == 460 and entry.trained_rows == 400
+
+
+def test_rewritten_or_much_longer_history_refits(tmp_path, monkeypatch):
+    fits = _count_fits(monkeypatch)
+    registry = ModelRegistry(tmp_path)
+
+    regime_detection.detect_market_regime(_frame(400), cache_key="ds@5m", version=1, registry=registry)
+    regime_detection.detect_market_regime(_frame(400, seed=2), cache_key="ds@5m", version=2, registry=registry)
+    assert len(fits) == 2
+
+    regime_detection.detect_market_regime(_frame(600, seed=2), cache_key="ds@5m", version=3, registry=registry)
+    assert len(fits) == 3
+
+
+def test_short_series_is_not_cached(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    result = regime_detection.detect_market_regime(_frame(50), cache_key="ds@5m", version=1, registry=registry)
+
+    assert result["regime"] == "Insufficient Data"
+    assert registry.get("regime/ds@5m") is None
+
+
+def test_concurrent_puts_of_one_model_do_not_collide(tmp_path):
+    registry = ModelRegistry(tmp_path)
+    model = {"weights": np.arange(50_000, dtype="float64")}
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: registry.put("regime/demo", model), range(12)))
+
+    np.testing.assert_array_equal(ModelRegistry(tmp_path).get("regime/demo")["weights"], model["weights"])
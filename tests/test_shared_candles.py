@@ -0,0 +1,45 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from backend.market_data.shared_candles import SharedCandles, share_dataframe
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=rows, freq="5min", tz="UTC", unit="ns"),
+        "open": np.arange(rows, dtype="float64"),
+        "high": np.arange(rows, dtype="float64") + 1,
+        "low": np.arange(rows, dtype="float64") - 1,
+        "close": np.arange(rows, dtype="float64") + 0.5,
+        "volume": np.ones(rows),
+    })
+
+
+def _close_sum(handle: SharedCandles) -> float:
+    return float(handle.columns()["close"].sum())
+
+
+def test_shared_candles_round_trip_as_read_only_views(tmp_path: Path):
+    frame = _frame(1_000)
+    handle = share_dataframe(frame, tmp_path / "demo@5m.npy")
+
+    pd.testing.assert_frame_equal(handle.frame(), frame, check_freq=False)
+    close = handle.columns()["close"]
+    assert not close.flags.writeable
+    assert np.shares_memory(close, handle.records())
+
+
+def test_shared_handle_pickle_size_is_independent_of_rows(tmp_path: Path):
+    small = share_dataframe(_frame(10), tmp_path / "small.npy")
+    large = share_dataframe(_frame(100_000), tmp_path / "large.npy")
+
+    assert abs(len(pickle.dumps(large)) - len(pickle.dumps(small))) < 16
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(_close_sum, large).result() == float(_frame(100_000)["close"].sum())
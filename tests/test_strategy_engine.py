@@ -1,4 +1,5 @@
-from bot.strategy_engine import generate_trades
+from backend.market_data.candle_array import CandleArray
+from bot.strategy_engine import generate_trades, generate_trades_and_setups
 
 
 def _c(t, o, h, l, c, v=0.0):
@@ -82,3 +83,28 @@ def test_entry_without_exit_is_not_included_and_blocks_further_trades():
     trades = generate_trades(candles)
     assert trades == []
 
+
+
+def test_streak_after_exit_is_counted_from_the_resume_candle():
+    candles = [
+        _c(0, 1.00, 1.01, 1.00, 1.01),
+        _c(300, 1.01, 1.02, 1.01, 1.02),
+        _c(600, 1.02, 1.03, 1.02, 1.03),
+        _c(900, 1.03, 1.04, 1.03, 1.04),  # LSC (target=1.03)
+        _c(1200, 1.04, 1.04, 1.032, 1.035),  # pullback touches mid -> Case A
+        _c(1500, 1.020, 1.026, 1.018, 1.025),  # breaking close < target
+        _c(1800, 1.024, 1.029, 1.023, 1.028),  # confirmation -> entry
+        _c(2100, 1.028, 1.032, 1.027, 1.031),  # exit; bullish run continues past it
+        _c(2400, 1.031, 1.033, 1.030, 1.032),
+        _c(2700, 1.032, 1.034, 1.031, 1.033),
+        _c(3000, 1.033, 1.035, 1.032, 1.034),
+        _c(3300, 1.034, 1.036, 1.034, 1.035),  # LSC of the second setup
+        _c(3600, 1.035, 1.035, 1.0342, 1.0345),  # pullback
+        _c(3900, 1.0345, 1.037, 1.0344, 1.036),  # breaking
+    ]
+
+    trades, setups = generate_trades_and_setups(candles)
+
+    assert [t["exit"]["time"] for t in trades] == [2100]
+    assert [(s["time"], s["streak_length"]) for s in setups] == [(1500, 4), (3900, 4)]
+    assert generate_trades_and_setups(CandleArray.from_candles(candles)) == (trades, setups)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from backend.ml.feature_engineering import rsi
+from backend.strategies.strategy_insights import _max_consecutive, _trade_frame, generate_insights
+
+
+def _candles(n: int = 200) -> list[dict]:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return [
+        {"time": 1_700_000_100 + 300 * i, "open": c, "high": c + 0.3, "low": c - 0.3, "close": c}
+        for i, c in enumerate(close.tolist())
+    ]
+
+
+def test_max_consecutive_counts_the_longest_run():
+    assert _max_consecutive(np.array([], dtype=bool)) == 0
+    assert _max_consecutive(np.array([False, False])) == 0
+    assert _max_consecutive(np.array([True, False, True, True, True, False, True, True])) == 3
+
+
+def test_trade_frame_aligns_rsi_to_the_nearest_bar():
+    candles = _candles()
+    df = pd.DataFrame(candles)
+    trades = [
+        {"entry_time": candles[50]["time"] + 140, "exit_time": candles[60]["time"], "pnl": 1.0},
+        {"entry_time": candles[80]["time"] + 150, "pnl": -1.0},   # tie → earlier bar
+        {"pnl": 2.0},                                              # untimed trades are skipped
+    ]
+
+    tr = _trade_frame(df, trades)
+    expected = rsi(df["close"]).to_numpy()
+
+    assert len(tr) == 2
+    np.testing.assert_array_equal(tr["rsi"].to_numpy(), expected[[50, 80]])
+    assert tr["duration"].tolist() == [3000 - 140, 0]
+
+
+def test_regime_insight_picks_best_and_worst_in_trade_order():
+    trades = (
+        [{"entry_time": 1_700_000_100, "pnl": p, "regime": "Sideways"} for p in (1, -1, -1)]
+        + [{"entry_time": 1_700_000_100, "pnl": p, "regime": "Trending"} for p in (1, 1, -1)]
+        + [{"entry_time": 1_700_000_100, "pnl": p, "regime": "Low Volatility"} for p in (1, 1, -1)]
+        + [{"entry_time": 1_700_000_100, "pnl": 5, "regime": "High Volatility"}]  # < 2 trades: ignored
+    )
+
+    insights = generate_insights(_candles(), trades)
+
+    assert (
+        "Best performance in Trending market regime (67% win rate) vs weakest in Sideways (33% win rate)."
+        in insights
+    )
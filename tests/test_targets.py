@@ -0,0 +1,28 @@
+import numpy as np
+
+from bot.targets import TOUCH_WINDOW, find_first_touch
+
+
+def _scan(low, high, target, start_idx):
+    return next((k for k in range(start_idx, len(low)) if low[k] <= target <= high[k]), None)
+
+
+def test_find_first_touch_matches_a_linear_scan():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        n = int(rng.integers(0, 5 * TOUCH_WINDOW))
+        low = rng.integers(0, 20, n).astype("float64")
+        high = low + rng.integers(0, 4, n)
+        target = float(rng.integers(0, 25))
+        start = int(rng.integers(0, n + 2))
+        assert find_first_touch(low, high, target, start) == _scan(low, high, target, start)
+
+
+def test_find_first_touch_far_and_missing_targets():
+    low = np.full(10_000, 1.0)
+    high = np.full(10_000, 1.1)
+    low[9_000] = 0.4
+
+    assert find_first_touch(low, high, 0.5, 0) == 9_000
+    assert find_first_touch(low, high, 0.5, 9_001) is None
+    assert find_first_touch(low, high, 1.05, 10_000) is None
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from backend.ml import trade_scoring
+from backend.ml.feature_engineering import nearest_bars
+from backend.ml.model_registry import ModelRegistry
+
+
+def _frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    return pd.DataFrame({
+        "time": 1_700_000_100 + 300 * np.arange(n),
+        "open": np.roll(close, 1),
+        "high": close + 0.3,
+        "low": close - 0.3,
+        "close": close,
+        "volume": rng.integers(100, 1000, n).astype("float64"),
+    })
+
+
+def _trades(df: pd.DataFrame, n: int) -> list[dict]:
+    rng = np.random.default_rng(1)
+    bars = rng.integers(0, len(df), n)
+    return [
+        {"id": k, "entry_time": int(df["time"].iloc[i]) + int(rng.integers(-140, 140)), "pnl": float(rng.normal())}
+        for k, i in enumerate(bars)
+    ]
+
+
+def test_nearest_bars_matches_argmin_scan():
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        times = rng.integers(0, 30, int(rng.integers(1, 50))).astype("float64")
+        if rng.random() < 0.5:
+            times = np.sort(times)
+        targets = rng.integers(-5, 35, 20).astype("float64")
+        expected = [int(np.argmin(np.abs(times - t))) for t in targets]
+        assert nearest_bars(times, targets).tolist() == expected
+
+
+def test_scorer_is_reused_for_the_same_backtest(tmp_path, monkeypatch):
+    df = _frame(2_000)
+    trades = _trades(df, 120)
+    registry = ModelRegistry(tmp_path)
+    fits = []
+    fit = trade_scoring.fit_trade_scorer
+    monkeypatch.setattr(trade_scoring, "fit_trade_scorer", lambda X, y: fits.append(1) or fit(X, y))
+
+    first = trade_scoring.score_trades(df, trades, registry=registry)
+    again = trade_scoring.score_trades(df, trades, registry=registry)
+
+    assert first == again
+    assert len(fits) == 1
+    assert not list(tmp_path.iterdir())  # scorers are cached in memory only
+    assert [t["trade_score"] for t in first] == sorted((t["trade_score"] for t in first), reverse=True)
+    assert {t["id"] for t in first} == {t["id"] for t in trades}
+
+
+def test_trades_without_time_keep_a_neutral_score(tmp_path):
+    df = _frame(2_000)
+    trades = _trades(df, 60) + [{"id": "untimed", "pnl": 1.0}]
+
+    scored = trade_scoring.score_trades(df, trades, registry=ModelRegistry(tmp_path))
+
+    untimed = next(t for t in scored if t["id"] == "untimed")
+    assert untimed["trade_score"] == 0.5 and untimed["risk_level"] == "High"
+    assert len(scored) == len(trades)
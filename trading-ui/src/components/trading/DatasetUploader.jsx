@@ -12,6 +12,7 @@ import { previewCsvHeaders } from "../../lib/candleData";
 
 const UPLOAD_TIMEOUT_MS = 15000;
 const DATASET_LOAD_TIMEOUT_MS = 30000;
+const DATASET_EXTENSIONS = [".csv", ".parquet", ".feather"];
 
 export default function DatasetUploader({
     onUploadSuccess,
@@ -44,7 +45,7 @@ export default function DatasetUploader({
 
         onUploadSuccess({
             id: datasetId,
-            symbol: fileName.replace(/\.csv$/i, "").toUpperCase(),
+            symbol: fileName.replace(/\.(csv|parquet|feather)$/i, "").toUpperCase(),
             market: "Custom Dataset",
             broker: "local",
             rows,
@@ -81,12 +82,15 @@ export default function DatasetUploader({
         setErrorState(null);
 
         try {
-            if (!file.name.toLowerCase().endsWith(".csv")) {
-                throw new Error("Only CSV files are allowed.");
+            const lowerName = file.name.toLowerCase();
+            if (!DATASET_EXTENSIONS.some((extension) => lowerName.endsWith(extension))) {
+                throw new Error("Only CSV, Parquet or Feather files are allowed.");
             }
 
-            const headerPreview = await file.slice(0, 64 * 1024).text();
-            previewCsvHeaders(headerPreview);
+            if (lowerName.endsWith(".csv")) {
+                const headerPreview = await file.slice(0, 64 * 1024).text();
+                previewCsvHeaders(headerPreview);
+            }
 
             setUploading(true);
             const formData = new FormData();
@@ -248,7 +252,7 @@ export default function DatasetUploader({
             >
                 <input
                     type="file"
-                    accept=".csv"
+                    accept={DATASET_EXTENSIONS.join(",")}
                     className="hidden"
                     id="dataset-upload"
                     onChange={(event) => {
@@ -269,7 +273,7 @@ export default function DatasetUploader({
                     </div>
 
                     <h4 className="mb-2 text-sm font-bold text-white">
-                        {uploading ? "Uploading Dataset..." : "Upload CSV Dataset"}
+                        {uploading ? "Uploading Dataset..." : "Upload Dataset"}
                     </h4>
 
                     <p className={`mb-4 max-w-[220px] text-[11px] ${isMonochrome ? "text-white/55" : "text-textSecondary"}`}>